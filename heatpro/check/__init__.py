@@ -1,2 +1,3 @@
 from .check_data_format import *
-from .check_weight_format import *
\ No newline at end of file
+from .check_weight_format import *
+from .validation import *
\ No newline at end of file
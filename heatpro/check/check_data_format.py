@@ -1,5 +1,8 @@
+import numpy as np
 import pandas as pd
 
+from ..period_codes import YEAR, MONTH, DAY, HOUR, period_codes, period_starts, duplicate_period_codes, unique_period_codes
+
 ENERGY_FEATURE_NAME = "thermal_energy_kWh"
 
 def check_datetime_index(dataframe: pd.DataFrame) -> bool:
@@ -26,7 +29,16 @@ def check_energy_feature(dataframe: pd.DataFrame) -> bool:
         return ENERGY_FEATURE_NAME in dataframe.columns
 
 def find_duplicate_years(datetime_index: pd.DatetimeIndex) -> list:
-        return list(datetime_index.year.value_counts()[datetime_index.year.value_counts()>1].index)
+    """
+    Find and return the years that appear more than once in the given DatetimeIndex.
+
+    Parameters:
+        datetime_index: pd.DatetimeIndex
+
+    Returns:
+        list of years with multiple appearances.
+    """
+    return list(period_starts(duplicate_period_codes(period_codes(datetime_index, YEAR)), YEAR).year)
 
 def find_duplicate_months(datetime_index: pd.DatetimeIndex):
     """
@@ -38,13 +50,10 @@ def find_duplicate_months(datetime_index: pd.DatetimeIndex):
     Returns:
         DataFrame with columns 'Year', 'Month' representing (year, month) tuples with multiple appearances.
     """
-    # Create a DataFrame with Year and Month columns
-    df = pd.DataFrame({'Year': datetime_index.year, 'Month': datetime_index.month})
+    # One integer code per month, duplicates are found without building a DataFrame of the index
+    duplicates = period_starts(duplicate_period_codes(period_codes(datetime_index, MONTH)), MONTH)
 
-    # Group by Year and Month, count occurrences, and filter duplicates
-    duplicates_df = df[df.duplicated(subset=['Year', 'Month'], keep=False)].drop_duplicates(keep='first')
-
-    return duplicates_df[['Year', 'Month']]
+    return pd.DataFrame({'Year': duplicates.year, 'Month': duplicates.month})
 
 def find_duplicate_days(datetime_index: pd.DatetimeIndex):
     """
@@ -56,13 +65,10 @@ def find_duplicate_days(datetime_index: pd.DatetimeIndex):
     Returns:
         DataFrame with columns 'Year', 'Month', 'Day' representing (year, month, day) tuples with multiple appearances.
     """
-    # Create a DataFrame with Year and Month columns
-    df = pd.DataFrame({'Year': datetime_index.year, 'Month': datetime_index.month, 'Day': datetime_index.day})
-
-    # Group by Year and Month, count occurrences, and filter duplicates
-    duplicates_df = df[df.duplicated(subset=['Year', 'Month', 'Day'], keep=False)].drop_duplicates(keep='first')
+    # One integer code per day, duplicates are found without building a DataFrame of the index
+    duplicates = period_starts(duplicate_period_codes(period_codes(datetime_index, DAY)), DAY)
 
-    return duplicates_df[['Year', 'Month', 'Day']]
+    return pd.DataFrame({'Year': duplicates.year, 'Month': duplicates.month, 'Day': duplicates.day})
 
 def find_duplicate_hours(datetime_index: pd.DatetimeIndex):
     """
@@ -74,13 +80,65 @@ def find_duplicate_hours(datetime_index: pd.DatetimeIndex):
     Returns:
         DataFrame with columns 'Year', 'Month', 'Day', 'Hour' representing (year, month, day, hour) tuples with multiple appearances.
     """
-    # Create a DataFrame with Year and Month columns
-    df = pd.DataFrame({'Year': datetime_index.year, 'Month': datetime_index.month, 'Day': datetime_index.day, 'Hour':datetime_index.hour})
+    # One integer code per hour, duplicates are found without building a DataFrame of the index
+    duplicates = period_starts(duplicate_period_codes(period_codes(datetime_index, HOUR)), HOUR)
+
+    return pd.DataFrame({'Year': duplicates.year, 'Month': duplicates.month, 'Day': duplicates.day, 'Hour': duplicates.hour})
+
+def find_duplicate_sub_hours(datetime_index: pd.DatetimeIndex, freq: str):
+    """
+    Find and return a DataFrame containing time steps of length freq that appear more than once in the given DatetimeIndex.
+
+    Parameters:
+        datetime_index: pd.DatetimeIndex
+        freq: fixed sub-hourly frequency (for instance '15min')
+
+    Returns:
+        DataFrame with columns 'Year', 'Month', 'Day', 'Hour', 'Minute' representing time steps with multiple appearances.
+    """
+    # One integer code per time step, duplicates are found without building a DataFrame of the index
+    duplicates = period_starts(duplicate_period_codes(period_codes(datetime_index, freq)), freq)
+
+    return pd.DataFrame({'Year': duplicates.year, 'Month': duplicates.month, 'Day': duplicates.day,
+                         'Hour': duplicates.hour, 'Minute': duplicates.minute})
+
+# Columns describing a period of each level in xor results
+_XOR_COLUMNS = {
+    YEAR: lambda starts: {'Year': starts.year},
+    MONTH: lambda starts: {'Year': starts.year, 'Month': starts.month},
+    DAY: lambda starts: {'Date': starts.date},
+    HOUR: lambda starts: {'Date': starts.date, 'Hour': starts.hour},
+}
+
+def find_xor_periods(df_left: pd.DataFrame, df_right: pd.DataFrame, level: str) -> pd.DataFrame:
+    """Find periods of level that are not in both index
+
+    Periods are compared as sorted unique integer period codes, so only the two key arrays
+    are allocated and the result has one row per mismatching period.
+
+    Args:
+        df_left (pd.DataFrame): left DataFrame
+        df_right (pd.DataFrame): right DataFrame
+        level (str): Period level, one of YEAR, MONTH, DAY, HOUR
+
+    Returns:
+        pd.DataFrame: Dataframe showing periods that are not in both index, with a '_merge' column
+        equal to 'left_only' or 'right_only'
+    """
+    left_codes = unique_period_codes(period_codes(df_left.index, level))
+    right_codes = unique_period_codes(period_codes(df_right.index, level))
 
-    # Group by Year and Month, count occurrences, and filter duplicates
-    duplicates_df = df[df.duplicated(subset=['Year', 'Month', 'Day', 'Hour'], keep=False)].drop_duplicates(keep='first')
+    left_only = np.setdiff1d(left_codes, right_codes, assume_unique=True)
+    right_only = np.setdiff1d(right_codes, left_codes, assume_unique=True)
 
-    return duplicates_df[['Year', 'Month', 'Day', 'Hour']]
+    # Mismatching periods sorted in time
+    codes = np.concatenate([left_only, right_only])
+    sides = np.repeat(['left_only', 'right_only'], [len(left_only), len(right_only)])
+    order = np.argsort(codes, kind='stable')
+
+    df = pd.DataFrame(_XOR_COLUMNS[level](period_starts(codes[order], level)))
+    df['_merge'] = pd.Categorical(sides[order], categories=['left_only', 'right_only', 'both'])
+    return df
 
 def find_xor_months(df_left: pd.DataFrame, df_right: pd.DataFrame) -> pd.DataFrame:
     """Find month that are not in both index
@@ -92,14 +150,7 @@ def find_xor_months(df_left: pd.DataFrame, df_right: pd.DataFrame) -> pd.DataFra
     Returns:
         pd.DataFrame: Dataframe showing of month that are not in both index
     """
-    df = pd.merge(
-    pd.DataFrame({'Year':df_left.index.year,'Month':df_left.index.month}), 
-    pd.DataFrame({'Year':df_right.index.year,'Month':df_right.index.month}), 
-    on=['Year','Month'], 
-    how='outer', 
-    indicator=True)
-    df.index = df.reset_index(drop=True).index
-    return df[df['_merge']!='both']
+    return find_xor_periods(df_left, df_right, MONTH)
 
 def find_xor_dates(df_left: pd.DataFrame, df_right: pd.DataFrame) -> pd.DataFrame:
     """Find dates that are not in both index
@@ -111,14 +162,7 @@ def find_xor_dates(df_left: pd.DataFrame, df_right: pd.DataFrame) -> pd.DataFram
     Returns:
         pd.DataFrame: Dataframe showing of dates that are not in both index
     """
-    df = pd.merge(
-    pd.DataFrame({'Date':df_left.index.date}), 
-    pd.DataFrame({'Date':df_right.index.date}), 
-    on=['Date'], 
-    how='outer', 
-    indicator=True)
-    df.index = df.reset_index(drop=True).index
-    return df[df['_merge']!='both']
+    return find_xor_periods(df_left, df_right, DAY)
 
 def find_xor_hour(df_left: pd.DataFrame, df_right: pd.DataFrame) -> pd.DataFrame:
     """Find hours that are not in both index
@@ -130,12 +174,4 @@ def find_xor_hour(df_left: pd.DataFrame, df_right: pd.DataFrame) -> pd.DataFrame
     Returns:
         pd.DataFrame: Dataframe showing of hours that are not in both index
     """
-    df = pd.merge(
-    pd.DataFrame({'Date':df_left.index.date,'Hour':df_left.index.hour}), 
-    pd.DataFrame({'Date':df_right.index.date,'Hour':df_right.index.hour}), 
-    on=['Date'], 
-    how='outer', 
-    indicator=True)
-    df.index = df.reset_index(drop=True).index
-    return df[df['_merge']!='both']
-
+    return find_xor_periods(df_left, df_right, HOUR)
@@ -1,6 +1,8 @@
+import numpy as np
 import pandas as pd
 
 from . import check_datetime_index
+from ..period_codes import period_codes
 
 WEIGHT_NAME_REQUIRED = "weight"
 
@@ -19,3 +21,58 @@ def check_weight_format(weights: pd.DataFrame) -> None:
     
     if not WEIGHT_NAME_REQUIRED in weights.columns:
         raise ValueError(f"Months weights must be contained in a column named {WEIGHT_NAME_REQUIRED} of weights")
+
+
+def check_weight_normalisation(weights: pd.DataFrame, level: str, renormalise: bool = False,
+                               tolerance: float = 1e-6) -> None:
+    """Verify that weights sum to 1 over each period of level, in a single pass.
+
+    Weights are summed per period with one bincount on integer period codes, so the check
+    costs about as much as reading the weights once.
+
+    Args:
+        weights (pd.DataFrame): DataFrame with correct weight format
+        level (str): Period over which weights should sum to 1 (see heatpro.period_codes), for instance DAY
+            for hourly weights of a daily disaggregation
+        renormalise (bool, optional): If True, weights of periods not summing to 1 are divided by their sum
+            in place instead of raising. Defaults to False.
+        tolerance (float, optional): Accepted absolute difference between a period sum and 1. Defaults to 1e-6.
+
+    Raises:
+        ValueError: Should have correct weight format
+        ValueError: Should not contain NaN weights
+        ValueError: Should not contain negative weights
+        ValueError: Weights of each period should sum to 1 (if renormalise is False)
+        ValueError: Weights of each period should not sum to 0 (if renormalise is True)
+    """
+    check_weight_format(weights)
+
+    values = weights[WEIGHT_NAME_REQUIRED].to_numpy(dtype=float)
+    if np.isnan(values).any():
+        raise ValueError(f"weights contain NaN at {', '.join(map(str, weights.index[np.isnan(values)][:5]))}")
+    if (values < 0).any():
+        raise ValueError(f"weights contain negative values at {', '.join(map(str, weights.index[values < 0][:5]))}")
+    if len(values) == 0:
+        return
+
+    # Sum of the weights of each period (periods are dense offsets from the first one)
+    codes = period_codes(weights.index, level)
+    offsets = codes - codes.min()
+    sums = np.bincount(offsets, weights=values)
+    row_sums = sums[offsets]
+
+    wrong_rows = np.abs(row_sums - 1) > tolerance
+    if not wrong_rows.any():
+        return
+
+    if not renormalise:
+        # First datetime of the first wrong periods
+        wrong_offsets, first_rows = np.unique(offsets[wrong_rows], return_index=True)
+        wrong_periods = ', '.join(f"{start} (sum {sums[offset]:.6g})" for start, offset in
+                                  zip(weights.index[wrong_rows][first_rows[:5]], wrong_offsets[:5]))
+        raise ValueError(f"weights do not sum to 1 on {len(wrong_offsets)} {level}s : {wrong_periods}")
+    if (row_sums[wrong_rows] == 0).any():
+        raise ValueError(f"weights sum to 0 on some {level}s and cannot be renormalised")
+
+    values[wrong_rows] /= row_sums[wrong_rows]
+    weights[WEIGHT_NAME_REQUIRED] = values
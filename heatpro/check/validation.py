@@ -0,0 +1,104 @@
+from contextlib import contextmanager
+from typing import Hashable, Iterator
+import weakref
+
+STRICT = 'strict'
+ONCE = 'once'
+OFF = 'off'
+VALIDATION_POLICIES = (STRICT, ONCE, OFF)
+
+_policy = STRICT
+
+# Validated checks as (check, id of each object) -> weak references to the objects
+_validated: dict[tuple, tuple[weakref.ref, ...]] = {}
+
+def get_validation_policy() -> str:
+    """Return the current validation policy.
+
+    Returns:
+        str: One of STRICT, ONCE, OFF
+    """
+    return _policy
+
+def set_validation_policy(policy: str) -> None:
+    """Set the validation policy of the package.
+
+    - STRICT (default): every check is run.
+    - ONCE: a check already passed by the same objects (for instance the same index) is skipped.
+    - OFF: data checks are skipped, inputs are trusted.
+
+    Args:
+        policy (str): One of STRICT, ONCE, OFF
+
+    Raises:
+        ValueError: If policy is not one of VALIDATION_POLICIES
+    """
+    global _policy
+    if policy not in VALIDATION_POLICIES:
+        raise ValueError(f"policy should be one of {', '.join(VALIDATION_POLICIES)}, got {policy}")
+    _policy = policy
+
+@contextmanager
+def validation_policy(policy: str) -> Iterator[None]:
+    """Context manager setting the validation policy inside a block.
+
+    Example:
+        >>> with validation_policy(ONCE):
+        ...     demands = [HourlyHeatDemand(name, data) for name, data in frames.items()]
+
+    Args:
+        policy (str): One of STRICT, ONCE, OFF
+
+    Raises:
+        ValueError: If policy is not one of VALIDATION_POLICIES
+    """
+    previous_policy = get_validation_policy()
+    set_validation_policy(policy)
+    try:
+        yield
+    finally:
+        set_validation_policy(previous_policy)
+
+def is_validated(check: Hashable, *objects: object) -> bool:
+    """Tell if check can be skipped for objects under the current validation policy.
+
+    Args:
+        check (Hashable): Name of the check (for instance ('duplicates', HOUR))
+        *objects (object): Objects the check is about (for instance an index, or two indexes for an alignment check)
+
+    Returns:
+        bool: False if the check has to be run
+    """
+    if _policy == STRICT:
+        return False
+    if _policy == OFF:
+        return True
+
+    references = _validated.get((check,) + tuple(id(obj) for obj in objects))
+    # Identities are compared as an id can be reused once an object is freed
+    return references is not None and all(reference() is obj for reference, obj in zip(references, objects))
+
+def mark_validated(check: Hashable, *objects: object) -> None:
+    """Record that objects passed check (only under ONCE policy).
+
+    The record is dropped as soon as one of the objects is freed.
+
+    Args:
+        check (Hashable): Name of the check
+        *objects (object): Objects the check is about, they must support weak references
+    """
+    if _policy != ONCE:
+        return
+
+    key = (check,) + tuple(id(obj) for obj in objects)
+
+    def forget(_: weakref.ref) -> None:
+        if _validated.get(key) is references:
+            del _validated[key]
+
+    references = tuple(weakref.ref(obj, forget) for obj in objects)
+    _validated[key] = references
+
+def clear_validation_memo() -> None:
+    """Forget every check recorded under ONCE policy."""
+    _validated.clear()
@@ -0,0 +1,66 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# Default number of points drawn by plot methods (about the width in pixels of a figure)
+DEFAULT_MAX_POINTS = 2000
+
+def min_max_positions(values: np.ndarray, max_points: int) -> np.ndarray:
+    """Select the rows to draw so that the peaks of a long series are kept.
+
+    Rows are split into max_points // 2 buckets of consecutive rows and the position of the
+    minimum and of the maximum of each bucket are kept, so that a plot of the selected rows
+    has the same envelope as a plot of every row. With several columns, positions kept for
+    any column are kept.
+
+    Args:
+        values (np.ndarray): Values of the rows, of shape (n,) or (n, columns)
+        max_points (int): Number of points to keep per column (at least 2)
+
+    Raises:
+        ValueError: If max_points is lower than 2
+
+    Returns:
+        np.ndarray: Sorted positions of the kept rows (every row if there are at most max_points rows)
+    """
+    if max_points < 2:
+        raise ValueError(f"max_points should be at least 2, got {max_points}")
+
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        values = values[:, np.newaxis]
+    n_rows = len(values)
+    if n_rows <= max_points:
+        return np.arange(n_rows)
+
+    bucket_size = -(-n_rows // (max_points // 2))
+    n_buckets = -(-n_rows // bucket_size)
+    first_rows = np.arange(n_buckets) * bucket_size
+
+    # Rows are padded to complete buckets, NaN (and padding) are never selected unless a bucket is only NaN
+    padding = n_buckets * bucket_size - n_rows
+    missing = np.isnan(values)
+    lows = np.pad(np.where(missing, np.inf, values), ((0, padding), (0, 0)), constant_values=np.inf)
+    highs = np.pad(np.where(missing, -np.inf, values), ((0, padding), (0, 0)), constant_values=-np.inf)
+
+    n_columns = values.shape[1]
+    lows = lows.reshape(n_buckets, bucket_size, n_columns).argmin(axis=1)
+    highs = highs.reshape(n_buckets, bucket_size, n_columns).argmax(axis=1)
+
+    positions = np.concatenate([(lows + first_rows[:, np.newaxis]).ravel(), (highs + first_rows[:, np.newaxis]).ravel()])
+    return np.unique(np.minimum(positions, n_rows - 1))
+
+def decimate(data: pd.DataFrame, max_points: Optional[int] = DEFAULT_MAX_POINTS) -> pd.DataFrame:
+    """Keep the rows of data needed to draw its peaks (see min_max_positions).
+
+    Args:
+        data (pd.DataFrame): Data to draw
+        max_points (int, optional): Number of points to keep per column, None keeps every row. Defaults to DEFAULT_MAX_POINTS.
+
+    Returns:
+        pd.DataFrame: Selected rows of data
+    """
+    if max_points is None or len(data) <= max_points:
+        return data
+    return data.iloc[min_max_positions(data.to_numpy(dtype=np.float64), max_points)]
@@ -1,11 +1,15 @@
+from typing import Union
+
 import numpy as np
 import pandas as pd
 
 from ..check import WEIGHT_NAME_REQUIRED
+from ..dtype_policy import cast_float
 
 from .building_heating_profile import *
 from .hot_water_profile import *
 from .loss_profile import *
+from .template_weights import *
 
 def month_length_proportionnal_weight(dates: pd.DatetimeIndex) -> pd.DataFrame:
     """Create a Dataframe attributing a weight to each datetime of the index
@@ -18,11 +22,11 @@ def month_length_proportionnal_weight(dates: pd.DatetimeIndex) -> pd.DataFrame:
     Returns:
         pd.DataFrame: DataFrame with correct format to be used as weight
     """
-    return pd.DataFrame(
+    return cast_float(pd.DataFrame(
                             dates.daysinmonth / (365 + dates.is_leap_year),
                             index = dates,
                             columns = [WEIGHT_NAME_REQUIRED]
-                        )
+                        ))
     
 def day_length_proportionnal_weight(dates: pd.DatetimeIndex) -> pd.DataFrame:
     """Create a Dataframe attributing a weight to each datetime of the index
@@ -35,40 +39,57 @@ def day_length_proportionnal_weight(dates: pd.DatetimeIndex) -> pd.DataFrame:
     Returns:
         pd.DataFrame: DataFrame with correct format to be used as weight
     """
-    return pd.DataFrame(
+    return cast_float(pd.DataFrame(
                             1 / (dates.daysinmonth),
                             index = dates,
                             columns = [WEIGHT_NAME_REQUIRED]
-                        )
+                        ))
     
-def apply_hourly_pattern(hourly_index: pd.DatetimeIndex, hourly_mapping: dict[int,float]) -> pd.DataFrame:
+def apply_hourly_pattern(hourly_index: pd.DatetimeIndex, hourly_mapping: dict[int,float],
+                         compressed: bool = False) -> Union[pd.DataFrame, TemplateWeights]:
     """Provide a DataFrame with correct weight format to disaggregate daily load into hourly load with a daily pattern.
 
     Args:
         hourly_index (pd.DatetimeIndex): Index
         hourly_mapping (dict[int,float]): assiossate to each hour (int between 1 and 24) a weight (sum should equals one)
+        compressed (bool, optional): If True, return TemplateWeights storing the pattern once instead of a DataFrame
+            (hourly_index must be regular and made of complete days). Defaults to False.
 
     Returns:
-        pd.DataFrame: DataFrame weight correct format
+        Union[pd.DataFrame, TemplateWeights]: DataFrame weight correct format (TemplateWeights if compressed)
     """
-    return pd.DataFrame(
+    if compressed:
+        return TemplateWeights.from_pattern(hourly_index,
+                                            template=[[hourly_mapping.get(hour, np.nan) for hour in range(24)]],
+                                            day_types=np.zeros(len(hourly_index) // 24, dtype=np.int64))
+
+    return cast_float(pd.DataFrame(
                             hourly_index.hour.map(hourly_mapping),
                             index = hourly_index,
                             columns = [WEIGHT_NAME_REQUIRED],
-                        )
+                        ))
     
-def apply_weekly_hourly_pattern(hourly_index: pd.DatetimeIndex, hourly_mapping: dict[tuple[int,int],float]) -> pd.DataFrame:
+def apply_weekly_hourly_pattern(hourly_index: pd.DatetimeIndex, hourly_mapping: dict[tuple[int,int],float],
+                                compressed: bool = False) -> Union[pd.DataFrame, TemplateWeights]:
     """Provide a DataFrame with correct weight format to disaggregate daily load into hourly load with a hourlt weekly pattern.
     It is better to have weight sum on 24 hours equals to 1 instead of weight sum equals to 1 over a week because week are note always complete in a month. This can lead to false disaggregation.
 
     Args:
         hourly_index (pd.DatetimeIndex): Index
         hourly_mapping (dict[tuple[int,int],float]): assiossate to each hour and each day of week (int between 1 and 7, int between 1 and 24) a weight (sum should equals one over each day)
+        compressed (bool, optional): If True, return TemplateWeights storing the 7x24 pattern once instead of a DataFrame
+            (hourly_index must be regular and made of complete days). Defaults to False.
 
     Returns:
-        pd.DataFrame: DataFrame weight correct format
+        Union[pd.DataFrame, TemplateWeights]: DataFrame weight correct format (TemplateWeights if compressed)
     """
-    return pd.DataFrame(
+    if compressed:
+        days = pd.date_range(hourly_index[0] if len(hourly_index) else 0, periods=len(hourly_index) // 24, freq='D')
+        return TemplateWeights.from_pattern(hourly_index,
+                                            template=[[hourly_mapping.get((dayofweek, hour), 1) for hour in range(24)] for dayofweek in range(7)],
+                                            day_types=days.dayofweek)
+
+    return cast_float(pd.DataFrame(
                             pd.Series(hourly_index,index = hourly_index,).apply(lambda x: hourly_mapping.get((x.dayofweek, x.hour), 1))\
                                 .rename(WEIGHT_NAME_REQUIRED)
-                        )
\ No newline at end of file
+                        ))
\ No newline at end of file
@@ -1,10 +1,17 @@
+from typing import Optional, Sequence, Union
+
+import numpy as np
 import pandas as pd
 
 from ..check import WEIGHT_NAME_REQUIRED
 from ..check import find_xor_hour
+from ..dtype_policy import cast_float
 
 BUILDING_FELT_TEMPERATURE_NAME = 'felt_temperature'
 
+# Number of datetimes of a block, the recursion runs over the blocks at once and the state is carried between blocks
+_FILTER_BLOCK_SIZE = 64
+
 def basic_building_heating_profile(felt_temperature: pd.DataFrame, non_heating_temperature: float,
                                    hourly_weight: pd.DataFrame) -> pd.DataFrame:
     r"""Create an hourly heating building consumption hourly profile adjusted to felt temperature. With sum over a month equals to 1.
@@ -40,8 +47,9 @@ def basic_building_heating_profile(felt_temperature: pd.DataFrame, non_heating_t
     :math:`t` is an instant (datetime) representing an hour, :math:`t.month` is month associated to instant :math:`t`
     
     """
-    if not find_xor_hour(felt_temperature,hourly_weight).empty:
-        raise ValueError(f"felt_temperature and hourly_weight hours are not match\n Difference (head(10)\n {find_xor_hour(felt_temperature,hourly_weight).head(10)}")
+    xor_hours = find_xor_hour(felt_temperature,hourly_weight)
+    if not xor_hours.empty:
+        raise ValueError(f"felt_temperature and hourly_weight hours are not match\n Difference (head(10)\n {xor_hours.head(10)}")
     
     felt_temperature.set_index(felt_temperature.index.to_period('h').start_time, inplace = True)
     hourly_weight.set_index(hourly_weight.index.to_period('h').start_time, inplace = True)
@@ -55,4 +63,141 @@ def basic_building_heating_profile(felt_temperature: pd.DataFrame, non_heating_t
                                                 
     hourly_heating_profile[WEIGHT_NAME_REQUIRED] = hourly_heating_profile[WEIGHT_NAME_REQUIRED].fillna(0)
                                                 
-    return hourly_heating_profile
+    return cast_float(hourly_heating_profile)
+
+
+def _recursive_sums(values: np.ndarray, decay: np.ndarray, state: np.ndarray) -> np.ndarray:
+    """Compute the sums of decay ** (t - i) * values_i over i <= t (plus decay ** (t + 1) * state) for each decay.
+
+    The recursion runs over the datetimes of a block for every block and decay at once, then the sum entering
+    each block is carried from the previous block.
+
+    Args:
+        values (np.ndarray): Values padded to whole blocks, of shape (blocks, _FILTER_BLOCK_SIZE, 1)
+        decay (np.ndarray): Decay of each filter
+        state (np.ndarray): Sum of each filter before the first value
+
+    Returns:
+        np.ndarray: Sums of shape (blocks * _FILTER_BLOCK_SIZE, len(decay))
+    """
+    n_blocks, block, _ = values.shape
+    sums = np.empty((n_blocks, block, len(decay)))
+    sums[:] = values
+    scratch = np.empty((n_blocks, len(decay)))
+    for position in range(1, block):
+        sums[:, position] += np.multiply(sums[:, position - 1], decay, out=scratch)
+
+    carried = np.empty((n_blocks, len(decay)))
+    powers = decay ** np.arange(1, block + 1)[:, np.newaxis]
+    for position in range(n_blocks):
+        carried[position] = state
+        state = powers[-1] * state + sums[position, -1]
+    for position in range(block):
+        sums[:, position] += np.multiply(carried, powers[position], out=scratch)
+    return sums.reshape(-1, len(decay))
+
+class FeltTemperatureFilter:
+    def __init__(self, time_constants: Sequence[float], names: Optional[Sequence[str]] = None) -> None:
+        r"""
+        Initialize an instance of FeltTemperatureFilter, first-order recursive filters of the external temperature,
+        one per building inertia, carrying their state from one chunk of data to the next.
+
+        Each filter gives the felt temperature of pandas ``external_temperature.ewm(time_constant).mean()``
+        (center of mass, adjust=True, NaN skipped): with :math:`\beta = \frac{\tau}{1 + \tau}`
+
+        .. math::
+
+            T^{(\text{felt})}_t = \frac{\sum_{i \leq t} \beta^{t-i} T^{(\text{External})}_i}{\sum_{i \leq t} \beta^{t-i}}
+
+        Every time constant is filtered in one pass: the recursion runs over the datetimes of blocks of the series
+        for every block at once, the state is carried from block to block and from call to call, so that filtering
+        chunks one after the other (for instance rows appended to ExternalFactors) gives the felt temperature of the whole series.
+
+        Parameters:
+            time_constants (Sequence[float]): Time constant (center of mass, in datetimes) of each building.
+            names (Sequence[str], optional): Name of each building. Defaults to the time constants.
+
+        Raises:
+            ValueError: If a time constant is negative.
+            ValueError: If there is not one name per time constant.
+        """
+        time_constants = np.atleast_1d(np.asarray(time_constants, dtype=np.float64))
+        if (time_constants < 0).any():
+            raise ValueError("time_constants should be non-negative")
+        if names is not None and len(names) != len(time_constants):
+            raise ValueError(f"names should give one name per time constant ({len(time_constants)}), got {len(names)}")
+
+        self.time_constants = time_constants
+        self.names = list(time_constants) if names is None else list(names)
+        self.decay = time_constants / (1 + time_constants)
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the filtered data, the next chunk is filtered as the start of a series."""
+        self.weighted_sum = np.zeros(len(self.time_constants))
+        self.weight = np.zeros(len(self.time_constants))
+        self.last_value = np.full(len(self.time_constants), np.nan)
+
+    def filter(self, external_temperature: Union[pd.Series, np.ndarray]) -> Union[pd.DataFrame, np.ndarray]:
+        """
+        Filter the next chunk of the external temperature and update the state.
+
+        Parameters:
+            external_temperature (Union[pd.Series, np.ndarray]): External temperature following the previous chunk.
+
+        Returns:
+            Union[pd.DataFrame, np.ndarray]: Felt temperature (time x building), a DataFrame with one column per building
+            for a Series.
+        """
+        values = np.asarray(external_temperature, dtype=np.float64)
+        n_rows, block = len(values), _FILTER_BLOCK_SIZE
+        n_blocks = -(-n_rows // block)
+
+        # Temperatures and observation flags padded to whole blocks
+        observed = ~np.isnan(values)
+        valid = np.zeros(n_blocks * block)
+        valid[:n_rows] = observed
+        valid = valid.reshape(n_blocks, block, 1)
+        temperature = np.zeros(n_blocks * block)
+        temperature[:n_rows] = np.where(observed, values, 0)
+        temperature = temperature.reshape(n_blocks, block, 1)
+
+        weighted_sum = _recursive_sums(temperature, self.decay, self.weighted_sum)[:n_rows]
+        weight = _recursive_sums(valid, self.decay, self.weight)[:n_rows]
+        if n_rows:
+            self.weighted_sum, self.weight = weighted_sum[-1].copy(), weight[-1].copy()
+
+        # Datetimes without temperature keep the felt temperature of the last observation (NaN before the first one)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if observed.all():
+                felt_temperature = np.divide(weighted_sum, weight, out=weighted_sum)
+            else:
+                last_rows = np.maximum.accumulate(np.where(observed, np.arange(n_rows), -1))
+                felt_temperature = weighted_sum[np.maximum(last_rows, 0)] / weight[np.maximum(last_rows, 0)]
+                felt_temperature[last_rows < 0] = self.last_value
+        if n_rows:
+            self.last_value = felt_temperature[-1].copy()
+
+        if isinstance(external_temperature, pd.Series):
+            return cast_float(pd.DataFrame(felt_temperature, index=external_temperature.index, columns=self.names))
+        return cast_float(felt_temperature)
+
+def felt_temperature(external_temperature: pd.Series, time_constants: Sequence[float],
+                     names: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Compute the felt temperature of buildings of several inertias in one pass (see FeltTemperatureFilter).
+
+    Example:
+        >>> felt = felt_temperature(external_factors.data[EXTERNAL_TEMPERATURE_NAME], [10, 24, 48], ['light', 'medium', 'heavy'])
+        >>> basic_building_heating_profile(felt[['medium']].set_axis([BUILDING_FELT_TEMPERATURE_NAME], axis=1), 15, hourly_weight)
+
+    Parameters:
+        external_temperature (pd.Series): External temperature.
+        time_constants (Sequence[float]): Time constant (center of mass, in datetimes) of each building, as in
+            external_temperature.ewm(time_constant).mean().
+        names (Sequence[str], optional): Name of each building. Defaults to the time constants.
+
+    Returns:
+        pd.DataFrame: Felt temperature with one column per building.
+    """
+    return FeltTemperatureFilter(time_constants, names).filter(external_temperature)
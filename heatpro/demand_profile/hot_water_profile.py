@@ -4,6 +4,7 @@ import pandas as pd
 from ..external_factors.process.temperature_cold_water import COLD_WATER_TEMPERATURE_NAME
 from ..check import WEIGHT_NAME_REQUIRED, check_weight_format
 from ..check import find_xor_months
+from ..dtype_policy import cast_float
 
 def basic_hot_water_monthly_profile(cold_water_temperature: pd.DataFrame,T_prod: float,
                             monthly_HW_weight: pd.DataFrame) -> pd.DataFrame:
@@ -37,8 +38,9 @@ def basic_hot_water_monthly_profile(cold_water_temperature: pd.DataFrame,T_prod:
     """
     monthly_cold_water = cold_water_temperature[[COLD_WATER_TEMPERATURE_NAME]].resample('MS').mean()
     
-    if not find_xor_months(cold_water_temperature,monthly_HW_weight).empty:
-        raise ValueError(f"cold_water_temperature and monthly_HW_weight index do not match \n not matching month: \n {find_xor_months(cold_water_temperature,monthly_HW_weight)}")
+    xor_months = find_xor_months(cold_water_temperature,monthly_HW_weight)
+    if not xor_months.empty:
+        raise ValueError(f"cold_water_temperature and monthly_HW_weight index do not match \n not matching month: \n {xor_months}")
     
     monthly_cold_water.set_index(monthly_cold_water.index.to_period('M').start_time, inplace = True)
     monthly_HW_weight.set_index(monthly_HW_weight.index.to_period('M').start_time, inplace = True)
@@ -52,7 +54,7 @@ def basic_hot_water_monthly_profile(cold_water_temperature: pd.DataFrame,T_prod:
     monthly_hot_water_profil[WEIGHT_NAME_REQUIRED] = df[intermediary_name] /\
                                                     df.groupby(df.index.year)[intermediary_name].transform('sum')
                                                     
-    return monthly_hot_water_profil
+    return cast_float(monthly_hot_water_profil)
 
 def basic_hot_water_hourly_profile(raw_hourly_hotwater_profile: pd.DataFrame, simultaneity: float,
                                    sanitary_loop_coef: float) -> pd.DataFrame:
@@ -100,7 +102,7 @@ def basic_hot_water_hourly_profile(raw_hourly_hotwater_profile: pd.DataFrame, si
     
     ajusted_hourly_hotwater_profile[WEIGHT_NAME_REQUIRED] = sanitary_loop_coef/24 + (1-sanitary_loop_coef)*ajusted_hourly_hotwater_profile[WEIGHT_NAME_REQUIRED]
     
-    return ajusted_hourly_hotwater_profile
+    return cast_float(ajusted_hourly_hotwater_profile)
     
                                                         
     
@@ -1,6 +1,7 @@
 import pandas as pd
 
 from ..check import WEIGHT_NAME_REQUIRED
+from ..dtype_policy import cast_float
 
 from ..external_factors.process.temperature_return import RETURN_TEMPERATURE_NAME
 from ..external_factors.process.temperature_departure import DEPARTURE_TEMPERATURE_NAME
@@ -42,5 +43,5 @@ def Y_to_H_thermal_loss_profile(temperatures: pd.DataFrame) -> pd.DataFrame:
     weights[WEIGHT_NAME_REQUIRED] = temperature_delta[DELTA_TEMPERATURE_NAME] /\
                                     temperature_delta[DELTA_TEMPERATURE_NAME].groupby(temperature_delta.index.year).transform('sum')
                                     
-    return weights
+    return cast_float(weights)
     
\ No newline at end of file
@@ -0,0 +1,184 @@
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from ..check import WEIGHT_NAME_REQUIRED
+
+class TemplateWeights:
+    # pandas and numpy defer to TemplateWeights, so that frame * weights and array * weights call __rmul__
+    __pandas_priority__ = 5000
+    __array_ufunc__ = None
+
+    def __init__(self, start: pd.Timestamp, template: np.ndarray, day_types: np.ndarray,
+                 day_scale: Optional[np.ndarray] = None) -> None:
+        """
+        Initialize an instance of TemplateWeights, a compressed representation of weights repeating a daily pattern.
+
+        The weight of step s of day d equals template[day_types[d], s] * day_scale[d]. Only the template
+        (a few day types) and one code and one scale factor per day are stored. Weighted disaggregation functions
+        consume it directly, weights are only expanded by to_frame or to_numpy.
+
+        Parameters:
+            start (pd.Timestamp): First datetime, must be a midnight.
+            template (np.ndarray): Daily patterns, one row per day type and one column per step of the day (24 for hourly weights).
+            day_types (np.ndarray): Row of template used by each day.
+            day_scale (np.ndarray, optional): Scale factor of each day. Defaults to 1 for every day.
+
+        Raises:
+            ValueError: If start is not a midnight.
+            ValueError: If day_types refer to rows absent from template.
+            ValueError: If day_scale and day_types lengths differ.
+        """
+        start = pd.Timestamp(start)
+        if start != start.normalize():
+            raise ValueError("start should be a midnight")
+
+        template = np.atleast_2d(np.asarray(template, dtype=float))
+        day_types = np.asarray(day_types, dtype=np.int64)
+        if len(day_types) and (day_types.min() < 0 or day_types.max() >= len(template)):
+            raise ValueError(f"day_types should be between 0 and {len(template) - 1}")
+
+        day_scale = np.ones(len(day_types)) if day_scale is None else np.asarray(day_scale, dtype=float)
+        if len(day_scale) != len(day_types):
+            raise ValueError("day_scale and day_types should have the same length")
+
+        self.start = start
+        self.template = template
+        self.day_types = day_types
+        self.day_scale = day_scale
+        self._index = None
+
+    @property
+    def steps_per_day(self) -> int:
+        """Number of weights in a day."""
+        return self.template.shape[1]
+
+    @property
+    def columns(self) -> list[str]:
+        """Columns of the expanded weights (same format as weight DataFrames)."""
+        return [WEIGHT_NAME_REQUIRED]
+
+    @property
+    def day_index(self) -> pd.DatetimeIndex:
+        """Midnight of each day."""
+        return pd.date_range(self.start, periods=len(self.day_types), freq='D')
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        """Datetime of each weight (built once)."""
+        if self._index is None:
+            self._index = pd.date_range(self.start, periods=len(self.day_types) * self.steps_per_day,
+                                        freq=pd.Timedelta(days=1) / self.steps_per_day)
+        return self._index
+
+    def __len__(self) -> int:
+        return len(self.day_types) * self.steps_per_day
+
+    def apply(self, day_values: np.ndarray) -> np.ndarray:
+        """
+        Multiply the weights of each day by a value of this day, without expanding the weights first.
+
+        Parameters:
+            day_values (np.ndarray): One value per day.
+
+        Returns:
+            np.ndarray: day_values[d] * weight of each step of day d, same length as index.
+        """
+        return ((np.asarray(day_values) * self.day_scale)[:, np.newaxis] * self.template[self.day_types]).ravel()
+
+    def to_numpy(self) -> np.ndarray:
+        """
+        Expand the weights.
+
+        Returns:
+            np.ndarray: Weight of each datetime of index.
+        """
+        return self.apply(np.ones(len(self.day_types)))
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Expand the weights into the usual weight format.
+
+        Returns:
+            pd.DataFrame: DataFrame with correct weight format.
+        """
+        return pd.DataFrame({WEIGHT_NAME_REQUIRED: self.to_numpy()}, index=self.index)
+
+    def select_days(self, days: slice) -> 'TemplateWeights':
+        """
+        Select a range of days, the template is shared.
+
+        Parameters:
+            days (slice): Positions of the selected days (step must be 1).
+
+        Returns:
+            TemplateWeights: Weights of the selected days.
+        """
+        first_day, _, _ = days.indices(len(self.day_types))
+        return TemplateWeights(self.start + pd.Timedelta(days=first_day), self.template,
+                               self.day_types[days], self.day_scale[days])
+
+    def scale_days(self, factors: Union[float, np.ndarray]) -> 'TemplateWeights':
+        """
+        Multiply the weights of each day by a factor.
+
+        Parameters:
+            factors (Union[float, np.ndarray]): One factor for all days or one factor per day.
+
+        Returns:
+            TemplateWeights: Scaled weights sharing the same template.
+        """
+        return TemplateWeights(self.start, self.template, self.day_types, self.day_scale * np.asarray(factors, dtype=float))
+
+    def __mul__(self, other: Union[float, np.ndarray, pd.DataFrame]) -> Union['TemplateWeights', pd.DataFrame]:
+        """
+        Multiply the weights by a scalar, a per-day array or weights in DataFrame format.
+
+        Weights in DataFrame format constant over each day (such as day_length_proportionnal_weight) keep
+        the compressed representation, other DataFrames are multiplied with the expanded weights.
+
+        Parameters:
+            other (Union[float, np.ndarray, pd.DataFrame]): Factor.
+
+        Returns:
+            Union[TemplateWeights, pd.DataFrame]: Product of the weights.
+        """
+        if not isinstance(other, pd.DataFrame):
+            return self.scale_days(other)
+
+        if len(other) == len(self) and other.index.equals(self.index):
+            values = other[WEIGHT_NAME_REQUIRED].to_numpy(dtype=float).reshape(len(self.day_types), self.steps_per_day)
+            if (values == values[:, :1]).all():
+                return self.scale_days(values[:, 0])
+        return self.to_frame() * other
+
+    __rmul__ = __mul__
+
+    @classmethod
+    def from_pattern(cls, index: pd.DatetimeIndex, template: np.ndarray, day_types: np.ndarray) -> 'TemplateWeights':
+        """
+        Build template weights on a regular index made of complete days.
+
+        Parameters:
+            index (pd.DatetimeIndex): Regular index starting at midnight and made of complete days.
+            template (np.ndarray): Daily patterns, one row per day type.
+            day_types (np.ndarray): Row of template used by each day of index.
+
+        Raises:
+            ValueError: If index is timezone aware, not regular or not made of complete days of template steps.
+
+        Returns:
+            TemplateWeights: Compressed weights on index.
+        """
+        template = np.atleast_2d(np.asarray(template, dtype=float))
+        steps_per_day = template.shape[1]
+        step = pd.Timedelta(days=1) / steps_per_day
+
+        if index.tz is not None or len(index) % steps_per_day or (len(index) and index[0] != index[0].normalize())\
+                or (len(index) > 1 and not (np.diff(index.values) == step.to_timedelta64()).all()):
+            raise ValueError(f"index should be timezone naive, regular with {steps_per_day} steps per day, start at midnight and be made of complete days")
+
+        weights = cls(index[0] if len(index) else pd.Timestamp(0), template, day_types)
+        weights._index = index
+        return weights
@@ -1,2 +1,3 @@
 from .pipeline import *
-from .weighted_disaggregation import *
\ No newline at end of file
+from .weighted_disaggregation import *
+from .batch_disaggregation import *
\ No newline at end of file
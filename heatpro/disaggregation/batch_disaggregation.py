@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from ..check import check_datetime_index, find_xor_periods, WEIGHT_NAME_REQUIRED
+from ..dtype_policy import cast_float
+from ..period_codes import YEAR, MONTH, DAY, period_codes, match_period_codes
+
+def batch_weighted_disaggregate(aggregate_demands: pd.DataFrame, weights: pd.DataFrame,
+                                level: str = MONTH) -> pd.DataFrame:
+    """Disaggregate many demands sharing the same index at once using weights.
+
+    The inputs are validated once for all demands, then every demand is disaggregated
+    in a single 2-D gather, which is much faster than one weekly_weighted_disaggregate call per demand.
+
+    Args:
+        aggregate_demands (pd.DataFrame): Wide table of aggregated demands, one column per demand
+            and one row per period of level.
+        weights (pd.DataFrame): Either a single WEIGHT_NAME_REQUIRED column shared by all demands
+            or one weight column per demand (same column names as aggregate_demands), not both.
+        level (str, optional): Period level of aggregate_demands (YEAR, MONTH or DAY). Defaults to MONTH.
+
+    Raises:
+        ValueError: If aggregate_demands or weights index is not in datetime format.
+        ValueError: If level is not YEAR, MONTH or DAY.
+        ValueError: If a period has multiple occurrences in aggregate_demands.
+        ValueError: If weights has neither WEIGHT_NAME_REQUIRED column nor the columns of aggregate_demands.
+        ValueError: If weights has both WEIGHT_NAME_REQUIRED column and columns of aggregate_demands.
+        ValueError: If aggregate_demands and weights do not match the same periods.
+
+    Returns:
+        pd.DataFrame: Disaggregated demands on weights index, one column per demand (backed by a single 2-D array).
+    """
+    # Check the format of the inputs
+    if not check_datetime_index(aggregate_demands):
+        raise ValueError("aggregate_demands index should be in datetime format")
+    if not check_datetime_index(weights):
+        raise ValueError("weights index should be in datetime format")
+    if level not in (YEAR, MONTH, DAY):
+        raise ValueError(f"level should be one of {YEAR}, {MONTH}, {DAY}")
+
+    # Check that each period appears once in aggregate_demands
+    aggregate_codes = period_codes(aggregate_demands.index, level)
+    if len(np.unique(aggregate_codes)) != len(aggregate_codes):
+        raise ValueError(f"Some {level}s have multiple occurrences in aggregate_demands")
+
+    # Select the shared weight column or the weight matrix, weights providing both are ambiguous
+    per_demand_columns = weights.columns.intersection(aggregate_demands.columns)
+    if WEIGHT_NAME_REQUIRED in weights.columns and not per_demand_columns.empty:
+        raise ValueError(f"weights should contain either a column named {WEIGHT_NAME_REQUIRED} or columns per demand, "
+                         f"not both (got {', '.join(map(str, per_demand_columns[:5]))})")
+    if WEIGHT_NAME_REQUIRED in weights.columns:
+        weight_values = weights[WEIGHT_NAME_REQUIRED].to_numpy(dtype=float)[:, np.newaxis]
+    elif set(aggregate_demands.columns).issubset(weights.columns):
+        weight_values = weights[aggregate_demands.columns].to_numpy(dtype=float)
+    else:
+        raise ValueError(f"weights must contain a column named {WEIGHT_NAME_REQUIRED} or one column per demand of aggregate_demands")
+
+    # Check if weights and aggregate_demands match the same periods
+    xor_periods = find_xor_periods(aggregate_demands, weights, level)
+    if not xor_periods.empty:
+        raise ValueError(f"weights and aggregate_demands are not matching the same {level}\n Difference :\n {xor_periods}")
+
+    # Gather the aggregate row of each weight row for every demand at once
+    positions = match_period_codes(period_codes(weights.index, level), aggregate_codes)
+    demand_values = np.vstack([aggregate_demands.to_numpy(dtype=float), np.zeros((1, aggregate_demands.shape[1]))])
+
+    return pd.DataFrame(cast_float(demand_values[positions] * weight_values),
+                        index=weights.index,
+                        columns=aggregate_demands.columns)
@@ -1,7 +1,27 @@
 from functools import reduce
-from typing import Callable
+from itertools import zip_longest
+from typing import Callable, Iterable, Iterator, Union
 
-from ..temporal_demand import TemporalHeatDemand
+import numpy as np
+import pandas as pd
+
+from ..check import check_weight_format, WEIGHT_NAME_REQUIRED
+from ..demand_profile import TemplateWeights
+from ..dtype_policy import cast_float
+from ..period_codes import YEAR, MONTH, DAY, HOUR, period_codes, match_period_codes, broadcast_period_values
+from ..temporal_demand import LazyContext, TemporalHeatDemand, YearlyHeatDemand, MonthlyHeatDemand, DailyHeatDemand, HourlyHeatDemand, SubHourlyHeatDemand
+from .weighted_disaggregation import (monthly_weighted_disaggregate, weekly_weighted_disaggregate,
+                                      daily_weighted_dissagregate, hourly_weighted_dissagregate,
+                                      sub_hourly_weighted_disaggregate)
+
+# Input class, period level of the input and output class of each weighted disaggregation
+_STAGE_TYPES = {
+    monthly_weighted_disaggregate: (YearlyHeatDemand, YEAR, MonthlyHeatDemand),
+    weekly_weighted_disaggregate: (MonthlyHeatDemand, MONTH, HourlyHeatDemand),
+    daily_weighted_dissagregate: (MonthlyHeatDemand, MONTH, DailyHeatDemand),
+    hourly_weighted_dissagregate: (DailyHeatDemand, DAY, HourlyHeatDemand),
+    sub_hourly_weighted_disaggregate: (HourlyHeatDemand, HOUR, SubHourlyHeatDemand),
+}
 
 def compose(functions: list[Callable]) -> Callable:
     """Compose a list of functions into a single function.
@@ -44,3 +64,269 @@ def disaggregate_temporal_demand(input_aggregate_demand: TemporalHeatDemand,
     else:
         # If no functions are provided, return the input demand unchanged
         return input_aggregate_demand
+
+def _period_slices(codes: np.ndarray) -> list[slice]:
+    """Slices of consecutive rows sharing the same code (codes must be sorted)."""
+    if len(codes) == 0:
+        return []
+    if (np.diff(codes) < 0).any():
+        raise ValueError("weights index should be sorted to be split in chunks")
+    bounds = np.concatenate([[0], np.flatnonzero(np.diff(codes)) + 1, [len(codes)]])
+    return [slice(start, stop) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+def split_weights(weights: Union[pd.DataFrame, TemplateWeights], chunk_level: str = YEAR) -> Iterator[Union[pd.DataFrame, TemplateWeights]]:
+    """Split weights into one chunk per period of chunk_level.
+
+    Chunks are slices of weights, nothing is copied before a chunk is consumed.
+
+    Args:
+        weights (Union[pd.DataFrame, TemplateWeights]): Weights with a sorted index.
+        chunk_level (str, optional): Period level of the chunks (YEAR, MONTH or DAY). Defaults to YEAR.
+
+    Raises:
+        ValueError: If chunk_level is not YEAR, MONTH or DAY.
+        ValueError: If weights index is not sorted.
+
+    Yields:
+        Union[pd.DataFrame, TemplateWeights]: Weights of one period of chunk_level.
+    """
+    if chunk_level not in (YEAR, MONTH, DAY):
+        raise ValueError(f"chunk_level should be one of {YEAR}, {MONTH}, {DAY}")
+
+    if isinstance(weights, TemplateWeights):
+        # Compressed weights are split by days, the template is shared by all chunks
+        for days in _period_slices(period_codes(weights.day_index, chunk_level)):
+            yield weights.select_days(days)
+    else:
+        for rows in _period_slices(period_codes(weights.index, chunk_level)):
+            yield weights.iloc[rows]
+
+def _weight_chunks(weights: Union[pd.DataFrame, TemplateWeights, Iterable], chunk_level: str) -> Iterator:
+    """Chunks of a weight source, either whole weights to split or an iterable of chunks consumed lazily."""
+    if isinstance(weights, (pd.DataFrame, TemplateWeights)):
+        return split_weights(weights, chunk_level)
+    return iter(weights)
+
+def _chunk_bounds(weights_chunk: Union[pd.DataFrame, TemplateWeights], level: str) -> tuple:
+    """First and last period of level covered by a weight chunk (with a sorted index)."""
+    index = weights_chunk.index
+    return tuple(period_codes(index[[0, -1]], level)) if len(index) else ()
+
+def _restrict_demand(demand: TemporalHeatDemand, index: pd.DatetimeIndex, level: str) -> TemporalHeatDemand:
+    """Keep the rows of demand in the periods of level covered by index."""
+    return demand[np.isin(period_codes(demand.index, level), period_codes(index, level))]
+
+def iter_weighted_disaggregate(aggregate_demand: TemporalHeatDemand,
+                               weights: Union[pd.DataFrame, TemplateWeights, Iterable[Union[pd.DataFrame, TemplateWeights]]],
+                               function: Callable[..., TemporalHeatDemand], chunk_level: str = YEAR,
+                               **kwargs) -> Iterator[TemporalHeatDemand]:
+    """Disaggregate a demand chunk by chunk with a weighted disaggregation function.
+
+    Each chunk of weights is disaggregated as soon as it is read, with the part of aggregate_demand
+    it covers, so memory is bounded by one chunk whatever the horizon.
+
+    Args:
+        aggregate_demand (TemporalHeatDemand): The input demand of function.
+        weights (Union[pd.DataFrame, TemplateWeights, Iterable[Union[pd.DataFrame, TemplateWeights]]]): Weights split
+            by chunk_level, or an iterable (for instance a generator reading files) of weight chunks
+            each covering whole periods of aggregate_demand.
+        function (Callable[..., TemporalHeatDemand]): Weighted disaggregation function of heatpro.disaggregation.
+        chunk_level (str, optional): Period level of the chunks when weights are split. Defaults to YEAR.
+        **kwargs: Additional keyword arguments of function.
+
+    Raises:
+        ValueError: If function is not a weighted disaggregation function.
+
+    Yields:
+        TemporalHeatDemand: Disaggregated demand of one chunk.
+    """
+    if function not in _STAGE_TYPES:
+        raise ValueError(f"{getattr(function, '__name__', function)} is not a weighted disaggregation function")
+    level = _STAGE_TYPES[function][1]
+
+    for weights_chunk in _weight_chunks(weights, chunk_level):
+        yield function(_restrict_demand(aggregate_demand, weights_chunk.index, level), weights_chunk, **kwargs)
+
+def iter_disaggregate_temporal_demand(input_aggregate_demand: TemporalHeatDemand,
+                                      stages: list[tuple[Callable, Union[pd.DataFrame, TemplateWeights, Iterable]]],
+                                      chunk_level: str = YEAR) -> Iterator[TemporalHeatDemand]:
+    """Disaggregate temporal heat demand through several weighted disaggregations, chunk by chunk.
+
+    Generator counterpart of disaggregate_temporal_demand: every stage is applied to one chunk
+    before the next chunk is read, so only one chunk of each intermediate demand is held in memory.
+
+    Args:
+        input_aggregate_demand (TemporalHeatDemand): The input aggregate demand to be disaggregated.
+        stages (list[tuple[Callable, Union[pd.DataFrame, TemplateWeights, Iterable]]]): Pairs
+            (weighted disaggregation function, weights) ordered from the coarsest to the finest level.
+            Weights are either split by chunk_level or iterables of chunks, the k-th chunks of all stages
+            must cover the same periods.
+        chunk_level (str, optional): Period level of the chunks when weights are split. Defaults to YEAR.
+
+    Raises:
+        ValueError: If no stage is given.
+        ValueError: If a function is not a weighted disaggregation function.
+        ValueError: If weights of the stages do not have the same number of chunks.
+        ValueError: If the k-th chunks of the stages do not cover the same first and last periods.
+
+    Yields:
+        TemporalHeatDemand: Disaggregated demand of one chunk.
+    """
+    if not stages:
+        raise ValueError("stages should contain at least one (function, weights) pair")
+    for function, _ in stages:
+        if function not in _STAGE_TYPES:
+            raise ValueError(f"{getattr(function, '__name__', function)} is not a weighted disaggregation function")
+    level = _STAGE_TYPES[stages[0][0]][1]
+    # Chunks are compared on the periods of the first output level, the coarsest one shared by all weights
+    bounds_level = _STAGE_TYPES[stages[1][0]][1] if len(stages) > 1 else level
+
+    missing = object()
+    chunks = zip_longest(*(_weight_chunks(weights, chunk_level) for _, weights in stages), fillvalue=missing)
+    for position, weights_chunks in enumerate(chunks):
+        if any(weights_chunk is missing for weights_chunk in weights_chunks):
+            raise ValueError("weights of all stages should have the same number of chunks")
+        bounds = [_chunk_bounds(weights_chunk, bounds_level) for weights_chunk in weights_chunks]
+        if any(chunk_bounds != bounds[0] for chunk_bounds in bounds[1:]):
+            raise ValueError(f"chunk {position} of the weights of each stage should cover the same periods of {bounds_level}")
+        demand = _restrict_demand(input_aggregate_demand, weights_chunks[0].index, level)
+        for (function, _), weights_chunk in zip(stages, weights_chunks):
+            demand = function(demand, weights_chunk)
+        yield demand
+
+class DisaggregationPlan:
+    def __init__(self, stages: list[tuple[Callable, Union[pd.DataFrame, TemplateWeights]]]) -> None:
+        """
+        Initialize a disaggregation plan chaining weighted disaggregations from the coarsest to the finest level.
+
+        Unlike disaggregate_temporal_demand, the plan knows the type of each stage. The weights of all stages
+        are multiplied into one composite weight on the finest index, so disaggregating a demand applies its
+        values once without building intermediate demands.
+
+        Parameters:
+            stages (list[tuple[Callable, Union[pd.DataFrame, TemplateWeights]]]): Pairs (disaggregation function, weights) ordered from
+                the coarsest to the finest level, for instance
+                [(monthly_weighted_disaggregate, monthly_weights), (weekly_weighted_disaggregate, hourly_weights)].
+                Functions must be weighted disaggregation functions of heatpro.disaggregation.
+
+        Raises:
+            ValueError: If no stage is given.
+            ValueError: If a function is not a weighted disaggregation function.
+            ValueError: If a stage does not take as input the output of the previous stage.
+            ValueError: If a weight format is not valid.
+            ValueError: If weights of a stage have multiple occurrences of the same period.
+            ValueError: If weights of consecutive stages do not match the same periods.
+        """
+        if not stages:
+            raise ValueError("stages should contain at least one (function, weights) pair")
+
+        for function, weights in stages:
+            if function not in _STAGE_TYPES:
+                raise ValueError(f"{getattr(function, '__name__', function)} is not a weighted disaggregation function")
+            check_weight_format(weights)
+
+        # Check that each stage disaggregates the output of the previous one
+        for (previous_function, previous_weights), (function, weights) in zip(stages[:-1], stages[1:]):
+            previous_output_class = _STAGE_TYPES[previous_function][2]
+            input_class, level, _ = _STAGE_TYPES[function]
+            if previous_output_class is not input_class:
+                raise ValueError(f"{function.__name__} expects a {input_class.__name__}, previous stage gives a {previous_output_class.__name__}")
+            previous_codes = period_codes(previous_weights.index, level)
+            if len(np.unique(previous_codes)) != len(previous_codes):
+                raise ValueError(f"weights of {previous_function.__name__} have multiple occurrences of the same {level}")
+            if len(np.setxor1d(previous_codes, period_codes(weights.index, level))):
+                raise ValueError(f"weights of {previous_function.__name__} and {function.__name__} are not matching the same {level}s")
+
+        self.stages = stages
+        self._composite_weight = None
+
+    @property
+    def input_class(self) -> type:
+        """Class of the demand disaggregated by the plan."""
+        return _STAGE_TYPES[self.stages[0][0]][0]
+
+    @property
+    def output_class(self) -> type:
+        """Class of the demand produced by the plan."""
+        return _STAGE_TYPES[self.stages[-1][0]][2]
+
+    @property
+    def composite_weight(self) -> np.ndarray:
+        """
+        Product of the weights of every stage on the finest index (computed once and cached).
+
+        Returns:
+            np.ndarray: Composite weight, same length as the weights of the last stage.
+        """
+        if self._composite_weight is None:
+            finest_weights = self.stages[-1][1]
+            finest_index = finest_weights.index
+            if isinstance(finest_weights, TemplateWeights):
+                composite_weight = finest_weights.to_numpy()
+            else:
+                composite_weight = finest_weights[WEIGHT_NAME_REQUIRED].to_numpy(dtype=float)
+
+            # Weights of stage k are brought to the finest index through the level of stage k+1
+            for (_, weights), (function, _) in zip(self.stages[:-1], self.stages[1:]):
+                level = _STAGE_TYPES[function][1]
+                positions = match_period_codes(period_codes(finest_index, level), period_codes(weights.index, level))
+                weight_values = weights.to_numpy() if isinstance(weights, TemplateWeights) else weights[WEIGHT_NAME_REQUIRED].to_numpy(dtype=float)
+                composite_weight = composite_weight * broadcast_period_values(weight_values, positions)
+
+            self._composite_weight = composite_weight
+        return self._composite_weight
+
+    def disaggregate(self, demand: TemporalHeatDemand) -> TemporalHeatDemand:
+        """
+        Disaggregate a demand through all stages at once.
+
+        The result equals chaining the stage functions without keeping aggregated data
+        (keep_year_data=False or keep_month_data=False).
+
+        Parameters:
+            demand (TemporalHeatDemand): Demand of the input class of the first stage.
+
+        Raises:
+            ValueError: If demand is not an instance of the input class of the first stage.
+            ValueError: If demand and the weights of the first stage do not match the same periods.
+
+        Returns:
+            TemporalHeatDemand: Disaggregated demand of the output class of the last stage.
+        """
+        if not isinstance(demand, self.input_class):
+            raise ValueError(f"demand should be an instance of {self.input_class.__name__}")
+
+        first_weights = self.stages[0][1]
+        level = _STAGE_TYPES[self.stages[0][0]][1]
+        demand_codes = period_codes(demand.index, level)
+        if len(np.setxor1d(demand_codes, period_codes(first_weights.index, level))):
+            raise ValueError(f"demand and weights of {self.stages[0][0].__name__} are not matching the same {level}s")
+
+        # Apply the demand once on the composite weight
+        finest_weights = self.stages[-1][1]
+        positions = match_period_codes(period_codes(finest_weights.index, level), demand_codes)
+
+        energy = cast_float(broadcast_period_values(demand.energy, positions) * self.composite_weight)
+
+        # Weights of the last stage are served as context, as in the stage functions
+        context = LazyContext(finest_weights.index)
+        if not isinstance(finest_weights, TemplateWeights):
+            context.sources.update({feature: (None, None, finest_weights[feature].to_numpy()) for feature in finest_weights.columns})
+
+        return self.output_class.from_arrays(demand.name, finest_weights.index, energy, context)
+
+    def intermediates(self, demand: TemporalHeatDemand) -> list[TemporalHeatDemand]:
+        """
+        Materialise the output of every stage by applying the stage functions one after the other.
+
+        Parameters:
+            demand (TemporalHeatDemand): Demand of the input class of the first stage.
+
+        Returns:
+            list[TemporalHeatDemand]: Output of each stage, from the coarsest to the finest.
+        """
+        outputs = []
+        for function, weights in self.stages:
+            demand = function(demand, weights)
+            outputs.append(demand)
+        return outputs
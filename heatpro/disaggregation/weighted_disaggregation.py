@@ -1,11 +1,64 @@
-from datetime import datetime
+from typing import Union
 
+import numpy as np
 import pandas as pd
 
-from ..check import find_duplicate_months, find_xor_months, ENERGY_FEATURE_NAME
-from ..check import check_weight_format, WEIGHT_NAME_REQUIRED
+from ..check import find_duplicate_months, find_xor_months, find_xor_dates, find_xor_hour, ENERGY_FEATURE_NAME
+from ..check import check_weight_format, is_validated, mark_validated, WEIGHT_NAME_REQUIRED
+from ..demand_profile import TemplateWeights
+from ..dtype_policy import cast_float
+from ..period_codes import YEAR, MONTH, DAY, HOUR, period_codes, duplicate_period_codes, match_period_codes, broadcast_period_values
 
-from ..temporal_demand import YearlyHeatDemand, MonthlyHeatDemand, DailyHeatDemand, HourlyHeatDemand
+from ..temporal_demand import LazyContext, TemporalHeatDemand, YearlyHeatDemand, MonthlyHeatDemand, DailyHeatDemand, HourlyHeatDemand, SubHourlyHeatDemand
+
+def _weighted_disaggregate(aggregate_demand: TemporalHeatDemand, weights: Union[pd.DataFrame, TemplateWeights], level: str,
+                           keep_aggregate_data: bool, context_prefix: str,
+                           kept_prefixes: tuple[str, ...]) -> tuple[np.ndarray, LazyContext]:
+    """Disaggregate a demand onto the index of weights (engine shared by all weighted disaggregations).
+
+    Each row of weights is matched to the row of aggregate_demand in the same period
+    through integer period codes, then aggregate energy is broadcast with a single gather.
+    Rows without matching period get 0.
+
+    Weights columns and, if keep_aggregate_data, aggregate columns are not copied in the output:
+    they are served lazily as context columns of the disaggregated demand.
+
+    Args:
+        aggregate_demand (TemporalHeatDemand): Coarser demand, one row per period.
+        weights (Union[pd.DataFrame, TemplateWeights]): Weights on the finer index.
+        level (str): Period level of aggregate_demand (see heatpro.period_codes).
+        keep_aggregate_data (bool): If True, aggregate columns are available as context columns.
+        context_prefix (str): Prefix given to aggregate context columns.
+        kept_prefixes (tuple[str, ...]): Aggregate columns starting with one of these prefixes keep their name.
+
+    Returns:
+        tuple[np.ndarray, LazyContext]: Disaggregated energy on the index of weights and context columns.
+    """
+    aggregate_codes = period_codes(aggregate_demand.index, level)
+    aggregate_energy = aggregate_demand.energy
+
+    if isinstance(weights, TemplateWeights) and level in (YEAR, MONTH, DAY):
+        # Compressed weights: the aggregate energy is gathered once per day and applied on the daily template
+        day_positions = match_period_codes(period_codes(weights.day_index, level), aggregate_codes)
+        energy = weights.apply(broadcast_period_values(aggregate_energy, day_positions))
+    else:
+        # Position of the aggregate period of each weight row (-1 if absent)
+        positions = match_period_codes(period_codes(weights.index, level), aggregate_codes)
+        weight_values = weights.to_numpy() if isinstance(weights, TemplateWeights) else weights[WEIGHT_NAME_REQUIRED].to_numpy()
+        energy = broadcast_period_values(aggregate_energy, positions) * weight_values
+
+    if keep_aggregate_data:
+        context = LazyContext.from_aggregate(weights.index, aggregate_demand.data, aggregate_demand.context,
+                                             level, context_prefix, kept_prefixes)
+    else:
+        context = LazyContext(weights.index)
+
+    # Weights are referenced, not copied (compressed weights are not expanded)
+    if not isinstance(weights, TemplateWeights):
+        for feature in weights.columns:
+            context.sources.setdefault(feature, (None, None, weights[feature].to_numpy()))
+
+    return cast_float(energy), context
 
 def monthly_weighted_disaggregate(yearly_demand: YearlyHeatDemand, weights: pd.DataFrame,
                                   keep_year_data: bool = True) -> MonthlyHeatDemand:
@@ -14,7 +67,7 @@ def monthly_weighted_disaggregate(yearly_demand: YearlyHeatDemand, weights: pd.D
     Args:
         yearly_demand (YearlyHeatDemand): The input yearly heat demand to be disaggregated.
         weights (pd.DataFrame): DataFrame containing weights for each month.
-        keep_year_data (bool, optional): If True, include yearly data in the output.
+        keep_year_data (bool, optional): If True, yearly data is available in the output context.
             Defaults to True.
 
     Raises:
@@ -33,45 +86,36 @@ def monthly_weighted_disaggregate(yearly_demand: YearlyHeatDemand, weights: pd.D
     # Check the format of the weights DataFrame
     check_weight_format(weights)
 
-    # Check for duplicate months in the weights index
-    duplicate_months = find_duplicate_months(weights.index)
-    if not duplicate_months.empty:
-        duplicate_month_str = ', '.join([f'{month.Month}-{month.Year}' for _, month in duplicate_months.iterrows()])
-        raise ValueError(f"Months {duplicate_month_str} have multiple occurrences in weights")
-
-    # Check if yearly_demand and weights overlap on the same year
-    if not yearly_demand.data.index.year.equals(weights.index.year.unique()):
-        raise ValueError("yearly_demand and weights do not overlap on the same year")
-
-    # Initialize the DataFrame for monthly demand
-    monthly_demand_df = weights.copy()
-
-    # Include yearly data in the output if keep_year_data is True
-    if keep_year_data:
-        for feature in yearly_demand.data.columns:
-            monthly_demand_df[f"yearly_{feature}"] = sum(
-                (weights.index.year == index.year) * row[feature]
-                for index, row in yearly_demand.data.iterrows()
-            )
-
-    # Disaggregate the yearly heat demand into monthly values
-    monthly_demand_df[ENERGY_FEATURE_NAME] = sum(
-        (weights.index.year == index.year) * row[ENERGY_FEATURE_NAME] *
-        weights[WEIGHT_NAME_REQUIRED]
-        for index, row in yearly_demand.data.iterrows()
-    )
+    if not is_validated(('monthly_weights', YEAR), yearly_demand.index, weights.index):
+        # Check for duplicate months in the weights index
+        if len(duplicate_period_codes(period_codes(weights.index, MONTH))):
+            duplicate_months = find_duplicate_months(weights.index)
+            duplicate_month_str = ', '.join([f'{month.Month}-{month.Year}' for _, month in duplicate_months.iterrows()])
+            raise ValueError(f"Months {duplicate_month_str} have multiple occurrences in weights")
+
+        # Check if yearly_demand and weights overlap on the same year
+        if not yearly_demand.index.year.equals(weights.index.year.unique()):
+            raise ValueError("yearly_demand and weights do not overlap on the same year")
+        mark_validated(('monthly_weights', YEAR), yearly_demand.index, weights.index)
+
+    # Disaggregate the yearly heat demand into monthly values (yearly data as context if keep_year_data is True)
+    monthly_energy, context = _weighted_disaggregate(yearly_demand, weights, YEAR,
+                                               keep_aggregate_data=keep_year_data,
+                                               context_prefix='yearly',
+                                               kept_prefixes=())
 
     # Create a MonthlyHeatDemand object with the disaggregated data
-    return MonthlyHeatDemand(yearly_demand.name, monthly_demand_df)
+    return MonthlyHeatDemand.from_arrays(yearly_demand.name, weights.index, monthly_energy, context)
 
-def weekly_weighted_disaggregate(monthly_demand: MonthlyHeatDemand, weights: pd.DataFrame,
+def weekly_weighted_disaggregate(monthly_demand: MonthlyHeatDemand, weights: Union[pd.DataFrame, TemplateWeights],
                                  keep_year_data: bool = True) -> HourlyHeatDemand:
     """Disaggregate monthly heat demand into hourly values using weights.
 
     Args:
         monthly_demand (MonthlyHeatDemand): The input monthly heat demand to be disaggregated.
-        weights (pd.DataFrame): DataFrame containing weights for each week.
-        keep_year_data (bool, optional): If True, include yearly data in the output.
+        weights (Union[pd.DataFrame, TemplateWeights]): DataFrame containing weights for each week
+            (or compressed TemplateWeights, consumed without being expanded).
+        keep_year_data (bool, optional): If True, monthly data is available in the output context.
             Defaults to True.
 
     Raises:
@@ -90,43 +134,21 @@ def weekly_weighted_disaggregate(monthly_demand: MonthlyHeatDemand, weights: pd.
     check_weight_format(weights)
 
     # Check if weights and monthly_demand match the same months
-    xor_months = find_xor_months(monthly_demand.data, weights)
-    if not xor_months.empty:
-        diff_str = f"weights and monthly_demand are not matching the same month\n Difference :\n {xor_months}"
-        raise ValueError(diff_str)
-
-    # Initialize the DataFrame for hourly demand
-    hourly_demand_df = weights.copy()
-
-    # Include yearly data in the output if keep_year_data is True
-    if keep_year_data:
-        for feature in monthly_demand.data.columns:
-            if not feature.startswith('yearly_'):
-                hourly_demand_df[f'monthly_{feature}'] = sum(
-                    (weights.index.year == index.year) *
-                    (weights.index.month == index.month) *
-                    row[feature]
-                    for index, row in monthly_demand.data.iterrows()
-                )
-            else:
-                hourly_demand_df[feature] = sum(
-                    (weights.index.year == index.year) *
-                    (weights.index.month == index.month) *
-                    row[feature]
-                    for index, row in monthly_demand.data.iterrows()
-                )
-
-    # Disaggregate the monthly heat demand into hourly values
-    hourly_demand_df[ENERGY_FEATURE_NAME] = sum(
-        (weights.index.year == index.year) *
-        (weights.index.month == index.month) *
-        row[ENERGY_FEATURE_NAME] *
-        weights[WEIGHT_NAME_REQUIRED]
-        for index, row in monthly_demand.data.iterrows()
-    )
+    if not is_validated(('xor', MONTH), monthly_demand.index, weights.index):
+        xor_months = find_xor_months(pd.DataFrame(index=monthly_demand.index), weights)
+        if not xor_months.empty:
+            diff_str = f"weights and monthly_demand are not matching the same month\n Difference :\n {xor_months}"
+            raise ValueError(diff_str)
+        mark_validated(('xor', MONTH), monthly_demand.index, weights.index)
+
+    # Disaggregate the monthly heat demand into hourly values (monthly data as context if keep_year_data is True)
+    hourly_energy, context = _weighted_disaggregate(monthly_demand, weights, MONTH,
+                                              keep_aggregate_data=keep_year_data,
+                                              context_prefix='monthly',
+                                              kept_prefixes=('yearly_',))
 
     # Create an HourlyHeatDemand object with the disaggregated data
-    return HourlyHeatDemand(monthly_demand.name, hourly_demand_df)
+    return HourlyHeatDemand.from_arrays(monthly_demand.name, weights.index, hourly_energy, context)
  
 def daily_weighted_dissagregate(monthly_demand: MonthlyHeatDemand, weights: pd.DataFrame,
                                 keep_month_data: bool = True) -> DailyHeatDemand:
@@ -135,7 +157,7 @@ def daily_weighted_dissagregate(monthly_demand: MonthlyHeatDemand, weights: pd.D
     Args:
         monthly_demand (MonthlyHeatDemand): The input monthly heat demand to be disaggregated.
         weights (pd.DataFrame): DataFrame containing weights for each day.
-        keep_month_data (bool, optional): If True, include monthly data in the output.
+        keep_month_data (bool, optional): If True, monthly data is available in the output context.
             Defaults to True.
 
     Raises:
@@ -154,58 +176,37 @@ def daily_weighted_dissagregate(monthly_demand: MonthlyHeatDemand, weights: pd.D
     check_weight_format(weights)
 
     # Check if weights and monthly_demand match the same months
-    xor_months = find_xor_months(monthly_demand.data, weights)
-    if not xor_months.empty:
-        diff_str = f"weights and monthly_demand are not matching the same month\n Difference :\n {xor_months}"
-        raise ValueError(diff_str)
-
-    # Initialize the DataFrame for daily demand
-    daily_demand_df = weights.copy()
-
-    # Include monthly data in the output if keep_month_data is True
-    if keep_month_data:
-        for feature in monthly_demand.data.columns:
-            if not feature.startswith('yearly_'):
-                daily_demand_df[f'monthly_{feature}'] = sum(
-                    (weights.index.year == index.year) *
-                    (weights.index.month == index.month) *
-                    row[feature]
-                    for index, row in monthly_demand.data.iterrows()
-                )
-            else:
-                daily_demand_df[feature] = sum(
-                    (weights.index.year == index.year) *
-                    (weights.index.month == index.month) *
-                    row[feature]
-                    for index, row in monthly_demand.data.iterrows()
-                )
-
-    # Disaggregate the monthly heat demand into daily values
-    daily_demand_df[ENERGY_FEATURE_NAME] = sum(
-        (weights.index.year == index.year) *
-        (weights.index.month == index.month) *
-        row[ENERGY_FEATURE_NAME] *
-        weights[WEIGHT_NAME_REQUIRED]
-        for index, row in monthly_demand.data.iterrows()
-    )
+    if not is_validated(('xor', MONTH), monthly_demand.index, weights.index):
+        xor_months = find_xor_months(pd.DataFrame(index=monthly_demand.index), weights)
+        if not xor_months.empty:
+            diff_str = f"weights and monthly_demand are not matching the same month\n Difference :\n {xor_months}"
+            raise ValueError(diff_str)
+        mark_validated(('xor', MONTH), monthly_demand.index, weights.index)
+
+    # Disaggregate the monthly heat demand into daily values (monthly data as context if keep_month_data is True)
+    daily_energy, context = _weighted_disaggregate(monthly_demand, weights, MONTH,
+                                             keep_aggregate_data=keep_month_data,
+                                             context_prefix='monthly',
+                                             kept_prefixes=('yearly_',))
 
     # Create a DailyHeatDemand object with the disaggregated data
-    return DailyHeatDemand(monthly_demand.name, daily_demand_df)
+    return DailyHeatDemand.from_arrays(monthly_demand.name, weights.index, daily_energy, context)
 
-def hourly_weighted_dissagregate(daily_demand: DailyHeatDemand, weights: pd.DataFrame,
+def hourly_weighted_dissagregate(daily_demand: DailyHeatDemand, weights: Union[pd.DataFrame, TemplateWeights],
                                 keep_month_data: bool = True) -> HourlyHeatDemand:
     """Disaggregate daily heat demand into hourly values using weights.
 
     Args:
         daily_demand (DailyHeatDemand): The input daily heat demand to be disaggregated.
-        weights (pd.DataFrame): DataFrame containing weights for each hour.
-        keep_month_data (bool, optional): If True, include monthly data in the output.
+        weights (Union[pd.DataFrame, TemplateWeights]): DataFrame containing weights for each hour
+            (or compressed TemplateWeights, consumed without being expanded).
+        keep_month_data (bool, optional): If True, daily data is available in the output context.
             Defaults to True.
 
     Raises:
         ValueError: If daily_demand is not an instance of DailyHeatDemand.
         ValueError: If the weight format is not valid.
-        ValueError: If weights and daily_demand do not match the same months.
+        ValueError: If weights and daily_demand do not match the same days.
 
     Returns:
         HourlyHeatDemand: The disaggregated hourly heat demand.
@@ -217,53 +218,62 @@ def hourly_weighted_dissagregate(daily_demand: DailyHeatDemand, weights: pd.Data
     # Check the format of the weights DataFrame
     check_weight_format(weights)
 
-    # Check if weights and daily_demand match the same months
-    xor_months = find_xor_months(daily_demand.data, weights)
-    if not xor_months.empty:
-        diff_str = f"weights and daily_demand are not matching the same month\n Difference :\n {xor_months}"
-        raise ValueError(diff_str)
-
-    # Initialize the DataFrame for hourly demand
-    hourly_demand_df = weights.copy()
-
-    # Include monthly data in the output if keep_month_data is True
-    if keep_month_data:
-        for feature in daily_demand.data.columns:
-            if not (feature.startswith('yearly_') or feature.startswith('monthly_')):
-                hourly_demand_df[f'daily_{feature}'] = sum(
-                    (weights.index.year == index.year) *
-                    (weights.index.month == index.month) *
-                    row[feature]
-                    for index, row in daily_demand.data.iterrows()
-                )
-            else:
-                hourly_demand_df[feature] = sum(
-                    (weights.index.year == index.year) *
-                    (weights.index.month == index.month) *
-                    row[feature]
-                    for index, row in daily_demand.data.iterrows()
-                )
-
-    # Disaggregate the daily heat demand into hourly values
-    hourly_demand_df[ENERGY_FEATURE_NAME] = sum(
-        (weights.index.year == index.year) *
-        (weights.index.month == index.month) *
-        row[ENERGY_FEATURE_NAME] *
-        weights[WEIGHT_NAME_REQUIRED]
-        for index, row in daily_demand.data.iterrows()
-    )
+    # Check if weights and daily_demand match the same days
+    if not is_validated(('xor', DAY), daily_demand.index, weights.index):
+        xor_dates = find_xor_dates(pd.DataFrame(index=daily_demand.index), weights)
+        if not xor_dates.empty:
+            diff_str = f"weights and daily_demand are not matching the same days\n Difference :\n {xor_dates}"
+            raise ValueError(diff_str)
+        mark_validated(('xor', DAY), daily_demand.index, weights.index)
+
+    # Disaggregate the daily heat demand into hourly values (daily data as context if keep_month_data is True)
+    hourly_energy, context = _weighted_disaggregate(daily_demand, weights, DAY,
+                                              keep_aggregate_data=keep_month_data,
+                                              context_prefix='daily',
+                                              kept_prefixes=('yearly_', 'monthly_'))
 
     # Create an HourlyHeatDemand object with the disaggregated data
-    return HourlyHeatDemand(daily_demand.name, hourly_demand_df)
+    return HourlyHeatDemand.from_arrays(daily_demand.name, weights.index, hourly_energy, context)
 
-    
-    
-    
-    
-    
+def sub_hourly_weighted_disaggregate(hourly_demand: HourlyHeatDemand, weights: Union[pd.DataFrame, TemplateWeights],
+                                     keep_hour_data: bool = True) -> SubHourlyHeatDemand:
+    """Disaggregate hourly heat demand into sub-hourly values (for instance 15-minute values) using weights.
 
+    Args:
+        hourly_demand (HourlyHeatDemand): The input hourly heat demand to be disaggregated.
+        weights (Union[pd.DataFrame, TemplateWeights]): DataFrame containing weights for each sub-hourly step,
+            weights of each hour should sum to 1 to keep the hourly energy.
+        keep_hour_data (bool, optional): If True, hourly data is available in the output context.
+            Defaults to True.
+
+    Raises:
+        ValueError: If hourly_demand is not an instance of HourlyHeatDemand.
+        ValueError: If the weight format is not valid.
+        ValueError: If weights and hourly_demand do not match the same hours.
 
+    Returns:
+        SubHourlyHeatDemand: The disaggregated sub-hourly heat demand.
+    """
+    # Check if hourly_demand is an instance of HourlyHeatDemand
+    if not isinstance(hourly_demand, HourlyHeatDemand):
+        raise ValueError("hourly_demand should be an instance of HourlyHeatDemand")
 
+    # Check the format of the weights DataFrame
+    check_weight_format(weights)
 
- 
-    
\ No newline at end of file
+    # Check if weights and hourly_demand match the same hours
+    if not is_validated(('xor', HOUR), hourly_demand.index, weights.index):
+        xor_hours = find_xor_hour(pd.DataFrame(index=hourly_demand.index), weights)
+        if not xor_hours.empty:
+            diff_str = f"weights and hourly_demand are not matching the same hours\n Difference :\n {xor_hours}"
+            raise ValueError(diff_str)
+        mark_validated(('xor', HOUR), hourly_demand.index, weights.index)
+
+    # Disaggregate the hourly heat demand into sub-hourly values (hourly data as context if keep_hour_data is True)
+    sub_hourly_energy, context = _weighted_disaggregate(hourly_demand, weights, HOUR,
+                                                  keep_aggregate_data=keep_hour_data,
+                                                  context_prefix='hourly',
+                                                  kept_prefixes=('yearly_', 'monthly_', 'daily_'))
+
+    # Create a SubHourlyHeatDemand object with the disaggregated data
+    return SubHourlyHeatDemand.from_arrays(hourly_demand.name, weights.index, sub_hourly_energy, context)
\ No newline at end of file
@@ -1,30 +1,56 @@
 import warnings
+from typing import Union
 
+import numpy as np
 import pandas as pd
 
-from .check import ENERGY_FEATURE_NAME
-from .temporal_demand import HourlyHeatDemand
+from .check import ENERGY_FEATURE_NAME, is_validated, mark_validated
+from .dtype_policy import cast_float
+from .temporal_demand import HourlyHeatDemand, SubHourlyHeatDemand, HeatDemandSet
 from .external_factors import ExternalFactors, DEPARTURE_TEMPERATURE_NAME, RETURN_TEMPERATURE_NAME
 
+def _index_equals(left: pd.DatetimeIndex, right: pd.DatetimeIndex) -> bool:
+    """Compare two indexes, skipping pairs already found equal under the validation policy."""
+    if is_validated('equal_index', left, right):
+        return True
+    if not left.equals(right):
+        return False
+    mark_validated('equal_index', left, right)
+    return True
+
 class DistrictHeatingLoad:
-    def __init__(self, demands: list[HourlyHeatDemand], external_factors: ExternalFactors,
+    def __init__(self, demands: Union[list[Union[HourlyHeatDemand, SubHourlyHeatDemand]], HeatDemandSet], external_factors: ExternalFactors,
                  district_network_temperature: pd.DataFrame, delta_temperature: float, cp: float) -> None:
         """
         Initialize an instance of DistrictHeatingLoad.
 
         Parameters:
-            demands (list[HourlyHeatDemand]): List of HourlyHeatDemand instances representing individual demands.
+            demands (Union[list[Union[HourlyHeatDemand, SubHourlyHeatDemand]], HeatDemandSet]): List of HourlyHeatDemand (or SubHourlyHeatDemand
+                for a sub-hourly load) instances representing individual demands, or a HeatDemandSet of such demands
+                (used without per-demand copies).
             external_factors (ExternalFactors): External factors data.
             district_network_temperature (pd.DataFrame): DataFrame containing district network temperature data.
             delta_temperature (float): Temperature difference in the district heating network.
             cp (float): Specific heat capacity.
 
         Raises:
+            ValueError: If a demand is neither an HourlyHeatDemand nor a SubHourlyHeatDemand.
             ValueError: If required columns are missing in district_network_temperature.
             ValueError: If the indices between external_factors and district_network_temperature do not match.
             ValueError: If the indices between HourlyHeatDemand instances and district_network_temperature do not match.
         """
-        self.demands = {demand.name: demand.data for demand in demands}
+        if isinstance(demands, HeatDemandSet):
+            if not issubclass(demands.demand_class, (HourlyHeatDemand, SubHourlyHeatDemand)):
+                raise ValueError("demands should be instances of HourlyHeatDemand or SubHourlyHeatDemand")
+            self.demand_set = demands
+            self.demands = demands.frames()
+            demand_indexes = [demands.index]
+        else:
+            if not all(isinstance(demand, (HourlyHeatDemand, SubHourlyHeatDemand)) for demand in demands):
+                raise ValueError("demands should be instances of HourlyHeatDemand or SubHourlyHeatDemand")
+            self.demand_set = None
+            self.demands = {demand.name: demand.data for demand in demands}
+            demand_indexes = [demand.data.index for demand in demands]
         self.external_factors = external_factors
         self.delta_temperature = delta_temperature
         self.cp = cp
@@ -35,11 +61,11 @@ class DistrictHeatingLoad:
         self.district_network_temperature = district_network_temperature
 
         # Check matching indices between external_factors and district_network_temperature
-        if not external_factors.data.index.equals(district_network_temperature.index):
+        if not _index_equals(external_factors.data.index, district_network_temperature.index):
             raise ValueError("Index between external_factors and district_network_temperature are not matching")
 
         # Check matching indices between HourlyHeatDemand instances and district_network_temperature
-        if not all(demand.data.index.equals(district_network_temperature.index) for demand in demands):
+        if not all(_index_equals(demand_index, district_network_temperature.index) for demand_index in demand_indexes):
             raise ValueError("Index between HourlyHeatDemand and district_network_factors are not matching")
 
     def fit(self):
@@ -51,7 +77,11 @@ class DistrictHeatingLoad:
         Returns:
             None
         """
-        total_demand = pd.concat([demand[ENERGY_FEATURE_NAME] for demand in self.demands.values()], axis=1).sum(axis=1)
+        # Demands are summed in float64 whatever the dtype policy, outputs are cast back at the end
+        if self.demand_set is not None:
+            total_demand = pd.Series(self.demand_set.energy.sum(axis=1, dtype=np.float64), index=self.demand_set.index)
+        else:
+            total_demand = pd.concat([demand[ENERGY_FEATURE_NAME].astype(np.float64) for demand in self.demands.values()], axis=1).sum(axis=1)
         flow_rate = total_demand / (self.cp * (self.district_network_temperature[DEPARTURE_TEMPERATURE_NAME] - self.district_network_temperature[RETURN_TEMPERATURE_NAME]))
 
         min_flow_rate = (total_demand / (self.cp * (self.district_network_temperature[DEPARTURE_TEMPERATURE_NAME] - (self.district_network_temperature[RETURN_TEMPERATURE_NAME] + self.delta_temperature)))).min()
@@ -62,11 +92,18 @@ class DistrictHeatingLoad:
         self.district_network_temperature[RETURN_TEMPERATURE_NAME] = self.district_network_temperature[DEPARTURE_TEMPERATURE_NAME] - \
                                                                      total_demand / self.cp / corrected_flow_rate
 
-        self.data = pd.concat(
-            [self.external_factors.data, self.district_network_temperature] +
-            [demand.rename(lambda x: f"{name}_{x}", axis=1) for name, demand in self.demands.items()],
+        self.district_network_temperature = cast_float(self.district_network_temperature)
+
+        if self.demand_set is not None:
+            # A single block for every demand instead of one renamed frame per demand
+            demand_frames = [self.demand_set.to_frame(suffix=ENERGY_FEATURE_NAME)]
+        else:
+            demand_frames = [demand.rename(lambda x: f"{name}_{x}", axis=1) for name, demand in self.demands.items()]
+
+        self.data = cast_float(pd.concat(
+            [self.external_factors.data, self.district_network_temperature] + demand_frames,
             axis=1
-        )
+        ))
         
         
         
@@ -0,0 +1,91 @@
+from contextlib import contextmanager
+from typing import Iterator, Optional, TypeVar, Union
+
+import numpy as np
+import pandas as pd
+
+FLOAT_DTYPES = (np.dtype(np.float64), np.dtype(np.float32))
+
+_float_dtype = np.dtype(np.float64)
+
+FloatData = TypeVar('FloatData', np.ndarray, pd.Series, pd.DataFrame)
+
+def _as_float_dtype(dtype: Union[str, type, np.dtype]) -> np.dtype:
+    try:
+        dtype = np.dtype(dtype)
+    except TypeError:
+        dtype = None
+    if dtype not in FLOAT_DTYPES:
+        raise ValueError(f"dtype should be one of {', '.join(map(str, FLOAT_DTYPES))}, got {dtype}")
+    return dtype
+
+def get_float_dtype() -> np.dtype:
+    """Return the floating point dtype of the values produced by the package.
+
+    Returns:
+        np.dtype: float64 (default) or float32
+    """
+    return _float_dtype
+
+def set_float_dtype(dtype: Union[str, type, np.dtype]) -> None:
+    """Set the floating point dtype of the values produced by the package.
+
+    Process functions of external factors, profile generators, disaggregations and
+    DistrictHeatingLoad.fit produce values of this dtype. float32 halves the memory
+    of long hourly (or sub-hourly) series, sums over many rows are still accumulated
+    in float64 before being cast back.
+
+    Args:
+        dtype (Union[str, type, np.dtype]): float64 or float32
+
+    Raises:
+        ValueError: If dtype is not one of FLOAT_DTYPES
+    """
+    global _float_dtype
+    _float_dtype = _as_float_dtype(dtype)
+
+@contextmanager
+def float_dtype(dtype: Union[str, type, np.dtype]) -> Iterator[None]:
+    """Context manager setting the floating point dtype inside a block.
+
+    Example:
+        >>> with float_dtype('float32'):
+        ...     hourly_demand = hourly_weighted_disaggregate(daily_demand, weights)
+
+    Args:
+        dtype (Union[str, type, np.dtype]): float64 or float32
+
+    Raises:
+        ValueError: If dtype is not one of FLOAT_DTYPES
+    """
+    previous_dtype = get_float_dtype()
+    set_float_dtype(dtype)
+    try:
+        yield
+    finally:
+        set_float_dtype(previous_dtype)
+
+def cast_float(values: FloatData, dtype: Optional[Union[str, type, np.dtype]] = None) -> FloatData:
+    """Cast the floating point values of an array, a Series or the float columns of a DataFrame.
+
+    Other columns (booleans, integers, ...) are left untouched, as are values already of the dtype.
+
+    Args:
+        values (FloatData): Values to cast
+        dtype (Union[str, type, np.dtype], optional): Target dtype. Defaults to the current dtype (get_float_dtype).
+
+    Returns:
+        FloatData: Values of the target dtype (values itself when nothing has to be cast)
+    """
+    dtype = get_float_dtype() if dtype is None else _as_float_dtype(dtype)
+
+    if isinstance(values, pd.DataFrame):
+        columns = [column for column, column_dtype in values.dtypes.items()
+                   if column_dtype in FLOAT_DTYPES and column_dtype != dtype]
+        if not columns:
+            return values
+        return values.astype({column: dtype for column in columns})
+
+    if values.dtype in FLOAT_DTYPES and values.dtype != dtype:
+        return values.astype(dtype)
+    return values
@@ -1 +1,2 @@
-from .process import *
\ No newline at end of file
+from .process import *
+from .ensemble_external_factors import *
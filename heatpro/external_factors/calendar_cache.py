@@ -0,0 +1,304 @@
+from functools import cached_property
+from typing import Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from ..period_codes import YEAR, MONTH, DAY, period_codes, period_starts, group_period_codes
+
+# Name of the column level of members in results of an ensemble
+MEMBER_LEVEL_NAME = 'member'
+
+def _scalar(values: np.ndarray) -> Union[float, np.ndarray]:
+    """Return a single statistic as a float, statistics of several members as an array."""
+    return float(values) if np.ndim(values) == 0 else values
+
+class RunningStatistics:
+    def __init__(self, members: Optional[Sequence[str]] = None) -> None:
+        """
+        Initialize an instance of RunningStatistics, daily accumulators of external temperatures and heating season flags.
+
+        Each day keeps the sum and number of non-NaN temperatures, their minimum and maximum and whether one of its
+        datetimes is in the heating season. update reads only the new rows, statistics of the whole history
+        (means, amplitudes, coldest day) are derived from the days.
+
+        Parameters:
+            members (Sequence[str], optional): Names of the members of an ensemble. Defaults to a single series.
+        """
+        self.members = None if members is None else list(members)
+        shape = (0,) if members is None else (0, len(self.members))
+        self.days = np.zeros(0, dtype=np.int64)
+        self.daily_sum = np.zeros(shape)
+        self.daily_count = np.zeros(shape, dtype=np.int64)
+        self.daily_min = np.zeros(shape)
+        self.daily_max = np.zeros(shape)
+        self.daily_heating = np.zeros(shape, dtype=bool)
+        self._month_groups = None
+
+    def update(self, index: pd.DatetimeIndex, external_temperature: np.ndarray, heating_season: np.ndarray) -> None:
+        """
+        Add rows to the statistics, rows of the last accumulated day extend it.
+
+        Parameters:
+            index (pd.DatetimeIndex): Index of the new rows.
+            external_temperature (np.ndarray): External temperature of each new row (and member).
+            heating_season (np.ndarray): Boolean heating season flag of each new row (and member).
+
+        Raises:
+            ValueError: If new rows are before the last accumulated day.
+        """
+        # Kernels of process.utils, imported here as the process package imports this module
+        from .process.utils import daily_sums
+
+        days, sums, counts, minimums, maximums = daily_sums(np.asarray(external_temperature, dtype=np.float64), index)
+        if len(days) == 0:
+            return
+        if len(self.days) and days[0] < self.days[-1]:
+            raise ValueError(f"new rows should not be before the last day of the statistics ({period_starts(self.days[-1:], DAY)[0].date()})")
+        heating = daily_sums(np.asarray(heating_season, dtype=np.float64), index)[1] > 0
+
+        # The first new day continues the last accumulated day
+        kept = slice(None)
+        if len(self.days) and days[0] == self.days[-1]:
+            sums[0] += self.daily_sum[-1]
+            counts[0] += self.daily_count[-1]
+            minimums[0] = np.fmin(minimums[0], self.daily_min[-1])
+            maximums[0] = np.fmax(maximums[0], self.daily_max[-1])
+            heating[0] |= self.daily_heating[-1]
+            kept = slice(0, -1)
+        self.days = np.concatenate([self.days[kept], days])
+        self.daily_sum = np.concatenate([self.daily_sum[kept], sums])
+        self.daily_count = np.concatenate([self.daily_count[kept], counts])
+        self.daily_min = np.concatenate([self.daily_min[kept], minimums])
+        self.daily_max = np.concatenate([self.daily_max[kept], maximums])
+        self.daily_heating = np.concatenate([self.daily_heating[kept], heating])
+        self._month_groups = None
+
+    @property
+    def daily_mean(self) -> np.ndarray:
+        """Mean external temperature of each day of days."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.daily_sum / self.daily_count
+
+    def _month_offsets(self) -> tuple[np.ndarray, np.ndarray]:
+        """Offset of the first day of each month and sorted month codes (kept until the next update)."""
+        if self._month_groups is None:
+            _, offsets, months = group_period_codes(self.days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64))
+            self._month_groups = offsets, months
+        return self._month_groups
+
+    @property
+    def months(self) -> np.ndarray:
+        """Sorted month codes of the months with data."""
+        return self._month_offsets()[1]
+
+    @property
+    def monthly_mean(self) -> np.ndarray:
+        """Mean external temperature of each month of months."""
+        offsets, _ = self._month_offsets()
+        if len(offsets) == 0:
+            return self.daily_sum.copy()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.add.reduceat(self.daily_sum, offsets) / np.add.reduceat(self.daily_count, offsets)
+
+    @property
+    def monthly_heating(self) -> np.ndarray:
+        """Whether each month of months has a datetime in the heating season."""
+        offsets, _ = self._month_offsets()
+        if len(offsets) == 0:
+            return self.daily_heating.copy()
+        return np.logical_or.reduceat(self.daily_heating, offsets)
+
+    @property
+    def mean_temperature(self) -> Union[float, np.ndarray]:
+        """Mean external temperature (of each member)."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return _scalar(self.daily_sum.sum(axis=0) / self.daily_count.sum(axis=0))
+
+    @property
+    def coldest_dayofyear(self) -> Union[int, np.ndarray]:
+        """Day of year of the (first) day with the coldest mean temperature (of each member).
+
+        Raises:
+            ValueError: If there is no data
+        """
+        # NaN days are skipped, an empty sequence raises as in pandas
+        daily_mean = self.daily_mean
+        coldest_days = np.argmin(np.where(np.isnan(daily_mean), np.inf, daily_mean), axis=0)
+        dayofyear = period_starts(np.atleast_1d(self.days[coldest_days]), DAY).dayofyear.to_numpy()
+        return int(dayofyear[0]) if self.members is None else dayofyear
+
+    @property
+    def max_daily_amplitude(self) -> Union[float, np.ndarray]:
+        """Largest difference between the maximum and minimum temperature of a day (of each member)."""
+        return _scalar(np.nanmax(self.daily_max - self.daily_min, axis=0))
+
+    @property
+    def mean_yearly_amplitude(self) -> Union[float, np.ndarray]:
+        """Mean over years of the difference between the warmest and coldest monthly mean temperature (of each member)."""
+        from .process.utils import yearly_amplitudes
+
+        amplitudes = yearly_amplitudes(self.monthly_mean, self.months)
+        if len(amplitudes) == 0:
+            return _scalar(np.full(amplitudes.shape[1:], np.nan))
+        return _scalar(np.nanmean(amplitudes, axis=0))
+
+class CalendarCache:
+    def __init__(self, index: pd.DatetimeIndex, external_temperature: np.ndarray, heating_season: np.ndarray,
+                 members: Optional[Sequence[str]] = None, statistics: Optional[RunningStatistics] = None) -> None:
+        """
+        Initialize an instance of CalendarCache, calendar arrays and temperature statistics of external factors.
+
+        Calendar arrays are computed on first access and kept, so that process functions sharing the same
+        ExternalFactors read the raw temperature series once. Statistics are derived from daily accumulators
+        (see RunningStatistics) and skip NaN temperatures, as pandas resample does.
+
+        For an ensemble (members given), temperatures and heating season are (time x member) arrays and
+        statistics have one value per member.
+
+        Parameters:
+            index (pd.DatetimeIndex): Index of the external factors.
+            external_temperature (np.ndarray): External temperature of each datetime (and member).
+            heating_season (np.ndarray): Heating season flag of each datetime (and member).
+            members (Sequence[str], optional): Names of the members of an ensemble. Defaults to a single series.
+            statistics (RunningStatistics, optional): Statistics of a history ending with these rows, for
+                incremental updates (see ExternalFactors.append). Defaults to the statistics of these rows.
+        """
+        self.index = index
+        self.members = None if members is None else list(members)
+        self.external_temperature = np.asarray(external_temperature, dtype=np.float64)
+        heating_season = np.asarray(heating_season)
+        # Missing flags are not in the heating season (as skipped by pandas any)
+        self.heating_season = heating_season if heating_season.dtype == bool else np.where(pd.isna(heating_season), False, heating_season).astype(bool)
+        self._statistics = statistics
+
+    def per_row(self, values: np.ndarray) -> np.ndarray:
+        """Shape one value per datetime to broadcast against the temperature (a column for an ensemble)."""
+        return values if self.members is None else np.asarray(values)[:, np.newaxis]
+
+    def frame(self, feature: str, values: np.ndarray) -> pd.DataFrame:
+        """Wrap values computed on the index in a DataFrame.
+
+        A single series gives one column named feature, an ensemble one column (member, feature) per member,
+        so that frame[member] has the layout of a single series.
+
+        Parameters:
+            feature (str): Name of the feature
+            values (np.ndarray): Values of shape (len(index),) or (len(index), members)
+
+        Returns:
+            pd.DataFrame: DataFrame on index
+        """
+        if self.members is None:
+            return pd.DataFrame({feature: values}, index=self.index)
+        columns = pd.MultiIndex.from_product([self.members, [feature]], names=[MEMBER_LEVEL_NAME, None])
+        return pd.DataFrame(values, index=self.index, columns=columns)
+
+    @property
+    def statistics(self) -> RunningStatistics:
+        """Get the daily accumulators the temperature statistics are derived from.
+
+        Returns:
+            RunningStatistics: Statistics of the rows (or of the history given at construction).
+        """
+        if self._statistics is None:
+            self._statistics = RunningStatistics(self.members)
+            self._statistics.update(self.index, self.external_temperature, self.heating_season)
+        return self._statistics
+
+    def heating_by_period(self, level: str) -> np.ndarray:
+        """Flag each datetime whose period (of level) contains at least one datetime in the heating season.
+
+        Flags of the periods are read from the statistics, so that earlier rows of the history count.
+
+        Args:
+            level (str): MONTH or DAY, periods of different years are distinct
+
+        Returns:
+            np.ndarray: Flags of the periods broadcast to their datetimes, of the shape of heating_season
+        """
+        statistics = self.statistics
+        if level == DAY:
+            periods, flags, codes = statistics.days, statistics.daily_heating, self.day_codes
+        else:
+            periods, flags, codes = statistics.months, statistics.monthly_heating, self.month_codes
+        return flags[np.searchsorted(periods, codes)]
+
+    @cached_property
+    def year_codes(self) -> np.ndarray:
+        """Year code of each datetime (see period_codes)."""
+        return period_codes(self.index, YEAR)
+
+    @cached_property
+    def month_codes(self) -> np.ndarray:
+        """Month code of each datetime (see period_codes)."""
+        return period_codes(self.index, MONTH)
+
+    @cached_property
+    def day_codes(self) -> np.ndarray:
+        """Day code of each datetime (see period_codes)."""
+        return period_codes(self.index, DAY)
+
+    @cached_property
+    def month(self) -> np.ndarray:
+        """Month of year (1 to 12) of each datetime."""
+        return self.month_codes % 12 + 1
+
+    @cached_property
+    def dayofyear(self) -> np.ndarray:
+        """Day of year (1 to 366) of each datetime."""
+        return np.asarray(self.index.dayofyear)
+
+    @property
+    def mean_temperature(self) -> Union[float, np.ndarray]:
+        """Mean external temperature (of each member)."""
+        return self.statistics.mean_temperature
+
+    @property
+    def days(self) -> np.ndarray:
+        """Sorted day codes of the days with data."""
+        return self.statistics.days
+
+    @property
+    def daily_mean(self) -> np.ndarray:
+        """Mean external temperature of each day of days."""
+        return self.statistics.daily_mean
+
+    @property
+    def daily_min(self) -> np.ndarray:
+        """Minimum external temperature of each day of days."""
+        return self.statistics.daily_min
+
+    @property
+    def daily_max(self) -> np.ndarray:
+        """Maximum external temperature of each day of days."""
+        return self.statistics.daily_max
+
+    @property
+    def months(self) -> np.ndarray:
+        """Sorted month codes of the months with data."""
+        return self.statistics.months
+
+    @property
+    def monthly_mean(self) -> np.ndarray:
+        """Mean external temperature of each month of months."""
+        return self.statistics.monthly_mean
+
+    @property
+    def coldest_dayofyear(self) -> Union[int, np.ndarray]:
+        """Day of year of the (first) day with the coldest mean temperature (of each member).
+
+        Raises:
+            ValueError: If there is no data
+        """
+        return self.statistics.coldest_dayofyear
+
+    @property
+    def max_daily_amplitude(self) -> Union[float, np.ndarray]:
+        """Largest difference between the maximum and minimum temperature of a day (of each member)."""
+        return self.statistics.max_daily_amplitude
+
+    @property
+    def mean_yearly_amplitude(self) -> Union[float, np.ndarray]:
+        """Mean over years of the difference between the warmest and coldest monthly mean temperature (of each member)."""
+        return self.statistics.mean_yearly_amplitude
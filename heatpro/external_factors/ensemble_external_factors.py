@@ -0,0 +1,143 @@
+from typing import Iterator, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from .calendar_cache import CalendarCache, MEMBER_LEVEL_NAME
+from .external_factors import ExternalFactors, EXTERNAL_TEMPERATURE_NAME, HEATING_SEASON_NAME
+
+class EnsembleExternalFactors:
+    def __init__(self, index: pd.DatetimeIndex, external_temperature: np.ndarray, heating_season: np.ndarray,
+                 members: Sequence[str]) -> None:
+        """
+        Initialize an instance of EnsembleExternalFactors, several stations or weather years on one index.
+
+        Temperatures and heating season flags are (time x member) arrays. Process functions
+        (burch_cold_water, kasuda_soil_temperature, basic_temperature_departure, basic_temperature_return,
+        closed_heating_season) compute every member in one broadcast and return one column
+        (member, feature) per member: result[member] has the layout of the single-member result.
+
+        Parameters:
+            index (pd.DatetimeIndex): Index shared by members (weather years are mapped on a common year).
+            external_temperature (np.ndarray): External temperature of shape (len(index), len(members)).
+            heating_season (np.ndarray): Heating season flags of shape (len(index), len(members)).
+            members (Sequence[str]): Name of each member.
+
+        Raises:
+            ValueError: If index is not a DatetimeIndex.
+            ValueError: If arrays are not of shape (len(index), len(members)).
+            ValueError: If members are not unique.
+        """
+        if not isinstance(index, pd.DatetimeIndex):
+            raise ValueError("index should be a DatetimeIndex")
+        members = list(members)
+        if len(set(members)) != len(members):
+            raise ValueError("members should be unique")
+        shape = (len(index), len(members))
+        external_temperature = np.asarray(external_temperature)
+        heating_season = np.asarray(heating_season)
+        if external_temperature.shape != shape or heating_season.shape != shape:
+            raise ValueError(f"external_temperature and heating_season should be of shape (len(index), len(members)) = {shape}, "
+                             f"got {external_temperature.shape} and {heating_season.shape}")
+
+        self.index = index
+        self.members = members
+        self.external_temperature = external_temperature
+        self.heating_season = heating_season
+        self._calendar = None
+
+    @classmethod
+    def from_members(cls, members: Union[dict[str, ExternalFactors], Sequence[ExternalFactors]]) -> 'EnsembleExternalFactors':
+        """
+        Gather external factors on the same index in an ensemble.
+
+        Parameters:
+            members (Union[dict[str, ExternalFactors], Sequence[ExternalFactors]]): External factors by member name
+                (a sequence is named '0', '1', ...).
+
+        Raises:
+            ValueError: If members is empty or members are not on the same index.
+
+        Returns:
+            EnsembleExternalFactors: Ensemble of the members.
+        """
+        if not isinstance(members, dict):
+            members = {str(position): external_factors for position, external_factors in enumerate(members)}
+        if not members:
+            raise ValueError("members should contain at least one member")
+        index = next(iter(members.values())).data.index
+        if not all(external_factors.data.index.equals(index) for external_factors in members.values()):
+            raise ValueError("members should be on the same index")
+
+        external_temperature = np.column_stack([external_factors.data[EXTERNAL_TEMPERATURE_NAME].to_numpy(dtype=np.float64)
+                                                for external_factors in members.values()])
+        heating_season = np.column_stack([external_factors.calendar.heating_season for external_factors in members.values()])
+        return cls(index, external_temperature, heating_season, list(members))
+
+    def __len__(self) -> int:
+        """Number of members."""
+        return len(self.members)
+
+    @property
+    def calendar(self) -> CalendarCache:
+        """Get the calendar arrays and temperature statistics of every member (see ExternalFactors.calendar).
+
+        Returns:
+            CalendarCache: Calendar cache with one statistic per member.
+        """
+        if self._calendar is None:
+            self._calendar = CalendarCache(self.index, self.external_temperature, self.heating_season, self.members)
+        return self._calendar
+
+    def calendar_since(self, since: Optional[Union[str, pd.Timestamp]] = None) -> CalendarCache:
+        """Get the calendar of the rows from since, with the statistics of every row (see ExternalFactors.calendar_since).
+
+        Parameters:
+            since (Union[str, pd.Timestamp], optional): First datetime of the rows. Defaults to every row (see calendar).
+
+        Returns:
+            CalendarCache: Calendar cache of the rows from since.
+        """
+        if since is None:
+            return self.calendar
+        rows = self.index >= pd.Timestamp(since)
+        return CalendarCache(self.index[rows], self.external_temperature[rows], self.heating_season[rows], self.members,
+                             statistics=self.calendar.statistics)
+
+    @property
+    def data(self) -> pd.DataFrame:
+        """Get the data of every member, with one column (member, feature) per member and feature.
+
+        Returns:
+            pd.DataFrame: Data of the ensemble, data[member] is the data of the member.
+        """
+        columns = pd.MultiIndex.from_tuples([(member, feature) for feature in (EXTERNAL_TEMPERATURE_NAME, HEATING_SEASON_NAME)
+                                             for member in self.members], names=[MEMBER_LEVEL_NAME, None])
+        return pd.concat([pd.DataFrame(self.external_temperature, index=self.index, copy=False),
+                          pd.DataFrame(self.heating_season, index=self.index, copy=False)], axis=1).set_axis(columns, axis=1)
+
+    def member(self, name: str) -> ExternalFactors:
+        """
+        Get the external factors of one member.
+
+        Parameters:
+            name (str): Name of the member.
+
+        Raises:
+            ValueError: If there is no member named name.
+
+        Returns:
+            ExternalFactors: External factors of the member.
+        """
+        if name not in self.members:
+            raise ValueError(f"{name} is not a member of the ensemble")
+        position = self.members.index(name)
+        return ExternalFactors(pd.DataFrame({EXTERNAL_TEMPERATURE_NAME: self.external_temperature[:, position],
+                                             HEATING_SEASON_NAME: self.heating_season[:, position]}, index=self.index))
+
+    def __iter__(self) -> Iterator[ExternalFactors]:
+        return (self.member(name) for name in self.members)
+
+    def invalidate_cache(self) -> None:
+        """Drop the calendar cache, to be called after modifying arrays in place."""
+        self._calendar = None
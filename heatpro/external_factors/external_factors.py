@@ -1,7 +1,15 @@
+import os
+from typing import Callable, Optional, Sequence, Union
+
 from matplotlib.axes import Axes
+import numpy as np
 import pandas as pd
 
-from ..check import check_datetime_index
+from ..check import check_datetime_index, is_validated, mark_validated
+from ..decimation import DEFAULT_MAX_POINTS, decimate
+from ..dtype_policy import cast_float, get_float_dtype
+from .calendar_cache import CalendarCache, RunningStatistics
+from .readers import HeatingSeason, heating_season_values, parse_regular_index, read_npz, regular_index
 
 EXTERNAL_TEMPERATURE_NAME = 'external_temperature'
 HEATING_SEASON_NAME = 'heating_season'
@@ -21,13 +29,208 @@ class ExternalFactors:
             ValueError: If the required features are missing in the provided data.
             ValueError: If the data index is not in datetime format.
         """
-        if not self.check_required_features(data_external_factors):
-            raise ValueError(f"Missing required features, data_external_factors must contain columns: {', '.join(REQUIRED_FEATURES)}\n(to developer: required features set in REQUIRED_FEATURES)")
-
-        if not check_datetime_index(data_external_factors):
-            raise ValueError("data_external_factors index should be in datetime format")
+        self._check_data(data_external_factors)
 
         self._data = data_external_factors
+        self._calendar = None
+        self._calendar_data_key = None
+        # Incremented by invalidate_cache, so that in place modifications rebuild the cache
+        self._version = 0
+        # Rows appended since data was last concatenated, and running statistics kept by append
+        self._appended = []
+        self._statistics = None
+        self._statistics_key = None
+        # Felt temperature filter kept by track_felt_temperature, and its output by chunk of rows
+        self._felt_filter = None
+        self._felt_temperature = []
+
+    def _check_data(self, data_external_factors: pd.DataFrame) -> None:
+        """Check the required features and the index of external factors data (see the constructor)."""
+        if not is_validated('external_factors', data_external_factors):
+            if not self.check_required_features(data_external_factors):
+                raise ValueError(f"Missing required features, data_external_factors must contain columns: {', '.join(REQUIRED_FEATURES)}\n(to developer: required features set in REQUIRED_FEATURES)")
+
+            if not check_datetime_index(data_external_factors):
+                raise ValueError("data_external_factors index should be in datetime format")
+            mark_validated('external_factors', data_external_factors)
+
+    @classmethod
+    def _from_columns(cls, index: pd.DatetimeIndex, columns: dict[str, np.ndarray],
+                      heating_season: Optional[HeatingSeason]) -> 'ExternalFactors':
+        """Build external factors from loaded columns, with explicit dtypes (bool heating season, float policy dtype otherwise)."""
+        features = {}
+        for feature, values in columns.items():
+            values = np.asarray(values)
+            if feature == HEATING_SEASON_NAME:
+                features[feature] = values.astype(bool, copy=False)
+            else:
+                features[feature] = cast_float(values if values.dtype.kind == 'f' else values.astype(np.float64))
+        if heating_season is not None:
+            features[HEATING_SEASON_NAME] = heating_season_values(heating_season, index)
+        return cls(pd.DataFrame(features, index=index, copy=False))
+
+    @classmethod
+    def from_csv(cls, path: Union[str, os.PathLike], columns: Optional[dict[str, str]] = None,
+                 index_column: Optional[Union[int, str]] = 0, start: Optional[Union[str, pd.Timestamp]] = None,
+                 freq: Optional[str] = None, date_format: Optional[str] = None,
+                 heating_season: Optional[HeatingSeason] = None, **read_csv_kwargs) -> 'ExternalFactors':
+        """Load external factors from a csv file.
+
+        Only the needed columns are parsed, with explicit dtypes. A regular index is rebuilt from its
+        first datetime (start and freq, or the first and last datetimes of index_column with freq)
+        instead of parsing every datetime.
+
+        Example:
+            >>> ExternalFactors.from_csv('weatherdata.csv', columns={'T_ext': EXTERNAL_TEMPERATURE_NAME},
+            ...                          index_column=None, start='2021', freq='h',
+            ...                          heating_season=lambda index: (index.month < 5) | (index.month > 9))
+
+        Parameters:
+            path (Union[str, os.PathLike]): Path of the file.
+            columns (dict[str, str], optional): Columns to load as file column: feature name. Defaults to every column.
+            index_column (Union[int, str], optional): Position or name of the datetime column, None if the file has none.
+                Defaults to 0.
+            start (Union[str, pd.Timestamp], optional): First datetime, the datetime column is then not read. Defaults to None.
+            freq (str, optional): Frequency of the datetimes (required with start). Defaults to parsing every datetime.
+            date_format (str, optional): Format of the datetimes (see pd.to_datetime). Defaults to inferred.
+            heating_season (HeatingSeason, optional): Heating season flags, or function of the index returning them,
+                when the file has no heating season column. Defaults to None.
+            **read_csv_kwargs: Keyword arguments of pd.read_csv (for instance sep).
+
+        Raises:
+            ValueError: If start is given without freq, or if neither start nor index_column is given.
+            ValueError: If datetimes are not regular at freq.
+            ValueError: If the required features are missing.
+
+        Returns:
+            ExternalFactors: External factors.
+        """
+        if start is None and index_column is None:
+            raise ValueError("start or index_column should be given to build the index")
+        if start is not None and freq is None:
+            raise ValueError("freq should be given with start")
+
+        header = pd.read_csv(path, nrows=0, **read_csv_kwargs).columns
+        time_column = None if index_column is None else (header[index_column] if isinstance(index_column, int) else index_column)
+        if columns is None:
+            columns = {column: column for column in header if column != time_column}
+
+        # Explicit dtypes: no type inference on the loaded columns
+        dtypes = {column: get_float_dtype() for column, feature in columns.items() if feature != HEATING_SEASON_NAME}
+        usecols = list(columns) + ([time_column] if start is None else [])
+        if start is None:
+            dtypes[time_column] = str
+        data = pd.read_csv(path, usecols=usecols, dtype=dtypes, **read_csv_kwargs)
+
+        if start is not None:
+            index = regular_index(start, len(data), freq)
+        elif freq is not None:
+            index = parse_regular_index(data[time_column].to_numpy(), freq, date_format)
+        else:
+            index = pd.DatetimeIndex(pd.to_datetime(data[time_column].to_numpy(), format=date_format))
+        return cls._from_columns(index, {feature: data[column].to_numpy() for column, feature in columns.items()}, heating_season)
+
+    @classmethod
+    def from_parquet(cls, path: Union[str, os.PathLike], columns: Optional[dict[str, str]] = None,
+                     index_column: Optional[str] = None, start: Optional[Union[str, pd.Timestamp]] = None,
+                     freq: Optional[str] = None, heating_season: Optional[HeatingSeason] = None) -> 'ExternalFactors':
+        """Load external factors from a parquet file (requires pyarrow or fastparquet).
+
+        Only the needed columns are read, datetimes are stored typed in parquet so no parsing is needed.
+
+        Parameters:
+            path (Union[str, os.PathLike]): Path of the file.
+            columns (dict[str, str], optional): Columns to load as file column: feature name. Defaults to every column.
+            index_column (str, optional): Name of the datetime column. Defaults to the index stored in the file.
+            start (Union[str, pd.Timestamp], optional): First datetime, the stored index is then ignored. Defaults to None.
+            freq (str, optional): Frequency of the datetimes (required with start). Defaults to None.
+            heating_season (HeatingSeason, optional): Heating season flags, or function of the index returning them,
+                when the file has no heating season column. Defaults to None.
+
+        Raises:
+            ValueError: If start is given without freq.
+            ValueError: If the required features are missing.
+
+        Returns:
+            ExternalFactors: External factors.
+        """
+        if start is not None and freq is None:
+            raise ValueError("freq should be given with start")
+
+        read_columns = None if columns is None else list(columns) + ([index_column] if index_column is not None else [])
+        data = pd.read_parquet(path, columns=read_columns)
+        if index_column is not None:
+            data = data.set_index(index_column)
+        if columns is None:
+            columns = {column: column for column in data.columns}
+
+        index = regular_index(start, len(data), freq) if start is not None else pd.DatetimeIndex(data.index)
+        return cls._from_columns(index, {feature: data[column].to_numpy() for column, feature in columns.items()}, heating_season)
+
+    @classmethod
+    def from_npz(cls, path: Union[str, os.PathLike], columns: Optional[dict[str, str]] = None, mmap: bool = False,
+                 heating_season: Optional[HeatingSeason] = None) -> 'ExternalFactors':
+        """Load external factors from a .npz archive written by to_npz (or np.savez with the same layout).
+
+        The archive holds one array per column and either 'start' (datetime64) and 'freq' (string) or
+        'time' (datetime64 or int64 nanoseconds), and optionally 'tz'. With mmap, uncompressed arrays are
+        memory-mapped instead of read.
+
+        Parameters:
+            path (Union[str, os.PathLike]): Path of the archive.
+            columns (dict[str, str], optional): Arrays to load as array name: feature name. Defaults to every array.
+            mmap (bool, optional): If True, memory-map uncompressed arrays. Defaults to False.
+            heating_season (HeatingSeason, optional): Heating season flags, or function of the index returning them,
+                when the archive has no heating season array. Defaults to None.
+
+        Raises:
+            ValueError: If the archive has neither start and freq nor time.
+            ValueError: If the required features are missing.
+
+        Returns:
+            ExternalFactors: External factors.
+        """
+        time_arrays = ('start', 'freq', 'time', 'tz')
+        with np.load(path, allow_pickle=False) as archive:
+            files = archive.files
+        if columns is None:
+            columns = {name: name for name in files if name not in time_arrays}
+        arrays = read_npz(path, list(columns) + [name for name in time_arrays if name in files], mmap)
+
+        tz = str(arrays['tz']) if 'tz' in arrays else None
+        length = len(arrays[next(iter(columns))]) if columns else 0
+        if 'start' in arrays and 'freq' in arrays:
+            index = regular_index(arrays['start'][()], length, str(arrays['freq']))
+        elif 'time' in arrays:
+            index = pd.DatetimeIndex(np.asarray(arrays['time']).astype('datetime64[ns]'))
+        else:
+            raise ValueError(f"{path} should contain start and freq, or time")
+        if tz is not None:
+            index = index.tz_localize('UTC').tz_convert(tz)
+        return cls._from_columns(index, {feature: arrays[name] for name, feature in columns.items()}, heating_season)
+
+    def to_npz(self, path: Union[str, os.PathLike], compressed: bool = False) -> None:
+        """Save external factors in a .npz archive readable by from_npz.
+
+        A regular index is saved as its first datetime and frequency.
+
+        Parameters:
+            path (Union[str, os.PathLike]): Path of the archive.
+            compressed (bool, optional): If True, arrays are compressed (and cannot be memory-mapped). Defaults to False.
+        """
+        data = self.data
+        index = data.index
+        arrays = {str(column): data[column].to_numpy() for column in data.columns}
+        if index.tz is not None:
+            arrays['tz'] = np.array(str(index.tz))
+        # Datetimes are saved in UTC, the timezone is restored on load
+        utc_index = index.tz_convert('UTC').tz_localize(None) if index.tz is not None else index
+        if len(index) and index.freq is not None and (index.tz is None or isinstance(index.freq, pd.offsets.Tick)):
+            arrays['start'] = np.datetime64(utc_index[0].asm8, 'ns')
+            arrays['freq'] = np.array(index.freqstr)
+        else:
+            arrays['time'] = utc_index.values.astype('datetime64[ns]')
+        (np.savez_compressed if compressed else np.savez)(path, **arrays)
 
     def check_required_features(self, dataframe: pd.DataFrame) -> bool:
         """Check if a DataFrame contains all the required features specified in REQUIRED_FEATURES.
@@ -51,13 +254,187 @@ class ExternalFactors:
         Returns:
             pd.DataFrame: External factors data.
         """
+        if self._appended:
+            self._data = pd.concat([self._data] + self._appended)
+            self._appended = []
+            # The running statistics describe the concatenated data
+            self._statistics_key = self._calendar_key()
         return self._data
 
-    def plot(self) -> Axes:
+    @data.setter
+    def data(self, data_external_factors: pd.DataFrame) -> None:
+        """Replace the external factors data (checked as in the constructor), the calendar cache is dropped.
+
+        Parameters:
+            data_external_factors (pd.DataFrame): External factors data.
+        """
+        self.__init__(data_external_factors)
+
+    def _calendar_key(self) -> tuple:
+        """Identify the index and the arrays of the required columns, to notice replaced data without reading it."""
+        return (self._version, id(self._data.index), len(self._data.index)) + tuple(
+            self._data[feature].to_numpy().__array_interface__['data'][0] for feature in REQUIRED_FEATURES)
+
+    @property
+    def calendar(self) -> CalendarCache:
+        """Get the calendar arrays and temperature statistics of the data, computed once and shared by process functions.
+
+        The cache is rebuilt when the index or a required column of data is replaced, the raw series are not
+        read again to check it. After modifying values of data in place, call invalidate_cache.
+
+        Returns:
+            CalendarCache: Calendar cache of the data.
+        """
+        data = self.data
+        key = self._calendar_key()
+        if self._calendar is None or key != self._calendar_data_key:
+            # Statistics kept by append are reused unless data was replaced since
+            statistics = self._statistics if self._statistics is not None and self._statistics_key == key else None
+            self._calendar = self._build_calendar(data, statistics)
+            self._calendar_data_key = key
+        return self._calendar
+
+    @staticmethod
+    def _build_calendar(data: pd.DataFrame, statistics: Optional[RunningStatistics] = None) -> CalendarCache:
+        """Build the calendar cache of rows of data."""
+        return CalendarCache(data.index, data[EXTERNAL_TEMPERATURE_NAME].to_numpy(dtype='float64', na_value=np.nan),
+                             data[HEATING_SEASON_NAME].to_numpy(), statistics=statistics)
+
+    def _running_statistics(self) -> RunningStatistics:
+        """Statistics of every row, including appended rows not concatenated yet."""
+        if self._statistics is None or (not self._appended and self._statistics_key != self._calendar_key()):
+            self._statistics = self.calendar.statistics
+            self._statistics_key = self._calendar_key()
+        return self._statistics
+
+    def append(self, data_external_factors: pd.DataFrame,
+               processes: Optional[Sequence[Callable[..., pd.DataFrame]]] = None) -> pd.DataFrame:
+        """Append new rows (for instance new observations or forecasts) after the last datetime and compute their factors.
+
+        Running statistics (means, daily amplitudes, coldest day, heating months) are updated from the new rows
+        only, and each process is called with since set to the first new datetime, so it computes only the new rows
+        with statistics of the whole history: an update costs O(new rows) instead of O(history). The history is not
+        read, rows are concatenated to data when data is next read.
+
+        Example:
+            >>> external_factors.append(new_rows, processes=[burch_cold_water,
+            ...                         functools.partial(kasuda_soil_temperature, d=2., alpha=0.05)])
+
+        Parameters:
+            data_external_factors (pd.DataFrame): New rows, with the required features and a sorted datetime index.
+            processes (Sequence[Callable[..., pd.DataFrame]], optional): Process functions, called as
+                process(external_factors, since=first_new_datetime). Defaults to burch_cold_water and closed_heating_season.
+                The felt temperature of the new rows is added when it is tracked (see track_felt_temperature).
+
+        Raises:
+            ValueError: If the required features are missing or the index is not in datetime format.
+            ValueError: If the new rows are not sorted or not after the last datetime.
+
+        Returns:
+            pd.DataFrame: Columns computed by the processes for the new rows.
+        """
+        self._check_data(data_external_factors)
+        index = data_external_factors.index
+        last_index = self._appended[-1].index if self._appended else self._data.index
+        if len(index) and (not index.is_monotonic_increasing or (len(last_index) and index[0] <= last_index.max())):
+            raise ValueError("appended rows should be sorted and after the last datetime of the external factors")
+        if processes is None:
+            # Imported here because process functions import this module
+            from .process import burch_cold_water, closed_heating_season
+            processes = (burch_cold_water, closed_heating_season)
+        if len(index) == 0:
+            return pd.DataFrame(index=index)
+
+        statistics = self._running_statistics()
+        statistics.update(index, data_external_factors[EXTERNAL_TEMPERATURE_NAME].to_numpy(dtype='float64', na_value=np.nan),
+                          self._build_calendar(data_external_factors).heating_season)
+        self._appended.append(data_external_factors)
+        new_rows = [process(self, since=index[0]) for process in processes]
+        if self._felt_filter is not None:
+            self._felt_temperature.append(self._felt_filter.filter(data_external_factors[EXTERNAL_TEMPERATURE_NAME]))
+            new_rows.append(self._felt_temperature[-1])
+        return pd.concat(new_rows, axis=1) if new_rows else pd.DataFrame(index=index)
+
+    def calendar_since(self, since: Optional[Union[str, pd.Timestamp]] = None) -> CalendarCache:
+        """Get the calendar of the rows from since, with the statistics of every row (see append).
+
+        Parameters:
+            since (Union[str, pd.Timestamp], optional): First datetime of the rows. Defaults to every row (see calendar).
+
+        Returns:
+            CalendarCache: Calendar cache of the rows from since.
+        """
+        if since is None:
+            return self.calendar
+        statistics = self._running_statistics()
+        since = pd.Timestamp(since)
+        # Chunks are read from the last one, rows are found by binary search and the history is not copied
+        tails = []
+        for chunk in reversed([self._data] + self._appended):
+            if chunk.index.is_monotonic_increasing:
+                tail = chunk.iloc[chunk.index.searchsorted(since):]
+            else:
+                tail = chunk[chunk.index >= since]
+            tails.insert(0, tail)
+            # Earlier chunks end before since (appended rows are after the previous ones)
+            if len(tail) < len(chunk):
+                break
+        tail = pd.concat(tails) if len(tails) > 1 else tails[0]
+        return self._build_calendar(tail, statistics)
+
+    def track_felt_temperature(self, time_constants: Sequence[float], names: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Compute the felt temperature of buildings of several inertias and keep the filter state, so that append
+        filters only the new rows (see FeltTemperatureFilter). Replacing data stops the tracking.
+
+        Parameters:
+            time_constants (Sequence[float]): Time constant (center of mass, in datetimes) of each building.
+            names (Sequence[str], optional): Name of each building. Defaults to the time constants.
+
+        Returns:
+            pd.DataFrame: Felt temperature of every row, with one column per building.
+        """
+        # Imported here because demand profiles import external factor processes
+        from ..demand_profile.building_heating_profile import FeltTemperatureFilter
+        self._felt_filter = FeltTemperatureFilter(time_constants, names)
+        self._felt_temperature = [self._felt_filter.filter(self.data[EXTERNAL_TEMPERATURE_NAME])]
+        return self.felt_temperature
+
+    @property
+    def felt_temperature(self) -> Optional[pd.DataFrame]:
+        """Get the felt temperature of every row, None if it is not tracked (see track_felt_temperature).
+
+        Returns:
+            Optional[pd.DataFrame]: Felt temperature with one column per building.
+        """
+        if self._felt_filter is None:
+            return None
+        if len(self._felt_temperature) > 1:
+            self._felt_temperature = [pd.concat(self._felt_temperature)]
+        return self._felt_temperature[0]
+
+    def invalidate_cache(self) -> None:
+        """Drop the calendar cache and running statistics, to be called after modifying data in place.
+        The tracked felt temperature is filtered again from the first row."""
+        self._version += 1
+        self._calendar = None
+        self._statistics = None
+        if self._felt_filter is not None:
+            self._felt_filter.reset()
+            self._felt_temperature = [self._felt_filter.filter(self.data[EXTERNAL_TEMPERATURE_NAME])]
+
+    def plot(self, columns: Optional[list[str]] = None, max_points: Optional[int] = DEFAULT_MAX_POINTS, **kwargs) -> Axes:
         """Plots the external factors profile data.
 
+        Long data is decimated before drawing, keeping the minimum and maximum of buckets of consecutive rows.
+
+        Parameters:
+            columns (list[str], optional): Columns to plot. Defaults to every column.
+            max_points (int, optional): Number of points drawn per column, None draws every row. Defaults to DEFAULT_MAX_POINTS.
+            **kwargs: Keyword arguments of DataFrame.plot (for instance ax).
+
         Returns:
             Axes: The matplotlib Axes object for the plot.
         """
-        return self._data.plot()
+        data = self.data if columns is None else self.data[columns]
+        return decimate(data, max_points).plot(**kwargs)
     
@@ -1,19 +1,35 @@
+from typing import Optional, Union
+
 import pandas as pd
 
+from ...period_codes import MONTH, DAY
+from ..ensemble_external_factors import EnsembleExternalFactors
 from ..external_factors import ExternalFactors, HEATING_SEASON_NAME
 
 CLOSED_HEATING_SEASON_NAME = f"closed_{HEATING_SEASON_NAME}"
 
-def closed_heating_season(external_factor: ExternalFactors) -> pd.DataFrame:
+def closed_heating_season(external_factor: Union[ExternalFactors, EnsembleExternalFactors], level: str = MONTH,
+                          since: Optional[Union[str, pd.Timestamp]] = None) -> pd.DataFrame:
     """Return a DataFrame with the same index than external_factor.data
-    The DataFrame contains one column indicating True if the datatime is in a complete non-heating month.
-    False otherwise.
+    The DataFrame contains one column indicating True if the datatime is in a month (or day) with at least one datetime in the
+    heating season, False if it is in a complete non-heating month (or day).
+    Periods are those of the calendar (year and month, or date), so that the same month of different years is distinct.
 
     Args:
-        external_factors (ExternalFactors): external factors class
+        external_factors (Union[ExternalFactors, EnsembleExternalFactors]): external factors class (an ensemble computes every member at once)
+        level (str, optional): Period level, MONTH or DAY for the daily variant. Defaults to MONTH.
+        since (Union[str, pd.Timestamp], optional): Compute only the rows from since, periods include earlier rows
+            (see ExternalFactors.append). Defaults to every row.
+
+    Raises:
+        ValueError: If level is not MONTH or DAY
 
     Returns:
-        pd.DataFrame: DataFrame indicating the complete non-heating month
+        pd.DataFrame: DataFrame indicating the complete non-heating month (one column per member for an ensemble)
     """
-    return pd.DataFrame(external_factor.data.groupby(external_factor.data.index.month)[HEATING_SEASON_NAME].transform('any'),
-                      index=external_factor.data.index).rename({HEATING_SEASON_NAME:CLOSED_HEATING_SEASON_NAME},axis=1)
\ No newline at end of file
+    if level not in (MONTH, DAY):
+        raise ValueError(f"level should be one of {(MONTH, DAY)}, got {level}")
+    calendar = external_factor.calendar_since(since)
+
+    # A period is in the heating season if any of its datetimes is
+    return calendar.frame(CLOSED_HEATING_SEASON_NAME, calendar.heating_by_period(level))
\ No newline at end of file
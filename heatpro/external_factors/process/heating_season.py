@@ -1,5 +1,68 @@
+from typing import Optional, Sequence, Union
+
+import numpy as np
 import pandas as pd
 
+from ...period_codes import YEAR, period_codes, period_starts, group_period_codes
+
+# Tolerance on the share condition, so that a share reached exactly (for instance 8 hot days out of 10 for 0.8)
+# is met despite the rounding of the prefix sums
+_SHARE_TOLERANCE = 1e-9
+
+NON_HEATING_SEASON_START_NAME = 'start'
+NON_HEATING_SEASON_END_NAME = 'end'
+
+def longest_hot_windows(hot_days: np.ndarray, hot_day_min_share: Union[float, np.ndarray],
+                        n_days: Optional[np.ndarray] = None) -> tuple[np.ndarray, np.ndarray]:
+    r"""Find in each row the longest window of days starting on a hot day and containing a minimum share of hot days.
+
+    With :math:`P_k` the number of hot days before day :math:`k` minus :math:`\sigma \cdot k`, days :math:`i` to
+    :math:`j - 1` meet the share if :math:`P_j \geq P_i`. The suffix maximum of :math:`P` is non-increasing, so the
+    last end of every start is found by a binary search in it, for every start and row at once (O(n log n) per row).
+
+    Args:
+        hot_days (np.ndarray): Hot day flags of shape (rows, days)
+        hot_day_min_share (Union[float, np.ndarray]): Minimum share of hot days (of each row)
+        n_days (np.ndarray, optional): Number of days of each row, following days are padding. Defaults to every day.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: First day and number of days of the longest window of each row (the earliest one
+        on ties), 0 days if no window meets the share
+    """
+    n_rows, n_columns = hot_days.shape
+    if n_columns == 0:
+        return np.zeros(n_rows, dtype=np.int64), np.zeros(n_rows, dtype=np.int64)
+    hot_days = hot_days.astype(bool)
+    if n_days is not None:
+        hot_days = hot_days & (np.arange(n_columns) < n_days[:, np.newaxis])
+    share = np.broadcast_to(np.asarray(hot_day_min_share, dtype=np.float64), (n_rows,))[:, np.newaxis]
+
+    # Prefix sums of hot days minus share, padding days can not end a window
+    prefix = np.zeros((n_rows, n_columns + 1))
+    np.cumsum(hot_days, axis=1, dtype=np.float64, out=prefix[:, 1:])
+    prefix -= share * np.arange(n_columns + 1)
+    if n_days is not None:
+        prefix[np.arange(n_columns + 1) > n_days[:, np.newaxis]] = -np.inf
+    suffix_max = np.maximum.accumulate(prefix[:, ::-1], axis=1)[:, ::-1]
+
+    # Binary search of the number of ends j with suffix_max[j] >= prefix[i], for every start i
+    targets = prefix[:, :-1] - _SHARE_TOLERANCE
+    low = np.zeros((n_rows, n_columns), dtype=np.int64)
+    high = np.full((n_rows, n_columns), n_columns + 1, dtype=np.int64)
+    searching = low < high
+    while searching.any():
+        middle = np.minimum((low + high) // 2, n_columns)
+        reached = np.take_along_axis(suffix_max, middle, axis=1) >= targets
+        low = np.where(searching & reached, middle + 1, low)
+        high = np.where(searching & ~reached, middle, high)
+        searching = low < high
+
+    # Windows start on hot days, the first longest one is kept
+    lengths = np.where(hot_days, low - 1 - np.arange(n_columns), 0)
+    starts = np.argmax(lengths, axis=1)
+    return starts, lengths[np.arange(n_rows), starts]
+
+
 def non_heating_season_basic(external_temperature: pd.Series, temperature_threshold: float, hot_day_min_share: float) -> tuple[pd.Timestamp,pd.Timestamp]:
     r"""
     Determines the beginning and end dates of the non-heating season for a district heating network.
@@ -41,40 +104,72 @@ def non_heating_season_basic(external_temperature: pd.Series, temperature_thresh
 
         \sum_{n\in\{n_{start},\dots,n_{end}\}} \mathbb{1}_{\bar{T}_{n}>T_{threshold}} \geq \sigma \cdot ( n_{end} - n_{start})
         
-    :math:`n_{start},n_{end}` are found by testing all the combinations given that days :math:`n_{start} and  :math:`n_{end}` are hot days next to cold days.
+    :math:`n_{start}` is a hot day, the earliest window is returned on ties. The window is found in O(n log n) from prefix sums
+    of hot days (see longest_hot_windows).
     
     """
     # Resample the series to daily average temperatures
     daily_temps = external_temperature.resample('D').mean()
-    
+
     # Identify days where the average temperature is above the threshold
-    hot_days = (daily_temps > temperature_threshold).astype(int)
-    
-    # Initialize variables to keep track of the longest period of non-heating days
-    max_length = 0
-    best_start = None
-    best_end = None
-    
-    # Iterate over the possible start days
-    for start in range(len(hot_days)):
-        if hot_days.iloc[start] == 1:
-            # Count hot days and total days
-            hot_day_count = 0
-            total_days = 0
-            
-            for end in range(start, len(hot_days)):
-                total_days += 1
-                if hot_days.iloc[end] == 1:
-                    hot_day_count += 1
-                
-                # Check if the current period meets the hot day share requirement
-                if hot_day_count / total_days >= hot_day_min_share:
-                    if total_days > max_length:
-                        max_length = total_days
-                        best_start = start
-                        best_end = end
-    
-    if best_start is not None and best_end is not None:
-        return daily_temps.index[best_start], daily_temps.index[best_end]
+    hot_days = (daily_temps > temperature_threshold).to_numpy()
+
+    starts, lengths = longest_hot_windows(hot_days[np.newaxis], hot_day_min_share)
+    if lengths[0] > 0:
+        return daily_temps.index[starts[0]], daily_temps.index[starts[0] + lengths[0] - 1]
+    else:
+        return None, None
+
+def non_heating_season_batch(external_temperature: Union[pd.Series, pd.DataFrame],
+                             temperature_threshold: Union[float, Sequence[float]],
+                             hot_day_min_share: Union[float, Sequence[float]],
+                             by_year: bool = True) -> pd.DataFrame:
+    """Determine the non-heating season (see non_heating_season_basic) of every station, year, temperature threshold
+    and hot day share in one vectorised call.
+
+    Args:
+        external_temperature (Union[pd.Series, pd.DataFrame]): Hourly average external temperature, one column per station.
+        temperature_threshold (Union[float, Sequence[float]]): Temperature thresholds above which a day is a hot day.
+        hot_day_min_share (Union[float, Sequence[float]]): Minimum shares of hot days of the non-heating season.
+        by_year (bool, optional): If True, the season is determined in each calendar year, else on the whole series. Defaults to True.
+
+    Returns:
+        pd.DataFrame: Beginning and end dates (NaT if there is no non-heating season) indexed by station, year (if by_year),
+        temperature_threshold and hot_day_min_share.
+    """
+    daily_temps = external_temperature.resample('D').mean()
+    if isinstance(daily_temps, pd.Series):
+        daily_temps = daily_temps.to_frame()
+    dates = daily_temps.index
+    temperatures = daily_temps.to_numpy(dtype=np.float64).T
+    thresholds = np.atleast_1d(np.asarray(temperature_threshold, dtype=np.float64))
+    shares = np.atleast_1d(np.asarray(hot_day_min_share, dtype=np.float64))
+
+    # Days of each year (or of the whole series) as rows padded to the longest one
+    if by_year:
+        _, offsets, years = group_period_codes(period_codes(dates, YEAR))
     else:
-        return None, None
\ No newline at end of file
+        offsets = np.zeros(min(len(dates), 1), dtype=np.int64)
+    n_days = np.diff(np.append(offsets, len(dates)))
+    day_positions = np.minimum(offsets[:, np.newaxis] + np.arange(n_days.max(initial=0)), max(len(dates) - 1, 0))
+
+    # Rows ordered by station, year, threshold and share
+    hot_days = (temperatures[:, day_positions, np.newaxis] > thresholds).swapaxes(2, 3)[:, :, :, np.newaxis]
+    shape = (len(daily_temps.columns), len(offsets), len(thresholds), len(shares))
+    starts, lengths = longest_hot_windows(np.broadcast_to(hot_days, shape + hot_days.shape[-1:]).reshape(-1, hot_days.shape[-1]),
+                                          np.broadcast_to(shares, shape).ravel(),
+                                          np.broadcast_to(n_days[:, np.newaxis, np.newaxis], shape).ravel())
+
+    found = lengths > 0
+    first_days = np.broadcast_to(offsets[:, np.newaxis, np.newaxis], shape).ravel() + starts
+    result = pd.DataFrame({
+        NON_HEATING_SEASON_START_NAME: dates[np.where(found, first_days, 0)].where(found),
+        NON_HEATING_SEASON_END_NAME: dates[np.where(found, first_days + lengths - 1, 0)].where(found),
+    })
+    levels = [daily_temps.columns, thresholds, shares]
+    names = ['station', 'temperature_threshold', 'hot_day_min_share']
+    if by_year:
+        levels.insert(1, period_starts(years, YEAR).year)
+        names.insert(1, 'year')
+    result.index = pd.MultiIndex.from_product(levels, names=names)
+    return result
@@ -1,20 +1,27 @@
+from typing import Optional, Union
+
 import numpy as np
 import pandas as pd
 
-from .utils import convert_serie_C_to_F, convert_serie_F_to_C, get_coldest_dayofyear
-from ..external_factors import ExternalFactors, EXTERNAL_TEMPERATURE_NAME
+from ...dtype_policy import cast_float
+from ..ensemble_external_factors import EnsembleExternalFactors
+from ..external_factors import ExternalFactors
 
 COLD_WATER_TEMPERATURE_NAME = 'cold_water_temperature'
 
-def burch_cold_water(external_factors: ExternalFactors) -> pd.DataFrame:
+def burch_cold_water(external_factors: Union[ExternalFactors, EnsembleExternalFactors],
+                     since: Optional[Union[str, pd.Timestamp]] = None) -> pd.DataFrame:
     r"""
     Calculate the cold water temperature based on external factors using (Burch et al., 2007) approach.
 
     Parameters:
-        external_factors (ExternalFactors): External factors data containing temperatures.
+        external_factors (Union[ExternalFactors, EnsembleExternalFactors]): External factors data containing temperatures
+            (an ensemble computes every member at once).
+        since (Union[str, pd.Timestamp], optional): Compute only the rows from since, with the statistics of every row
+            (see ExternalFactors.append). Defaults to every row.
 
     Returns:
-        pd.DataFrame: DataFrame containing the calculated cold water temperatures.
+        pd.DataFrame: DataFrame containing the calculated cold water temperatures (one column per member for an ensemble).
         
     **Overview**
     
@@ -29,23 +36,22 @@ def burch_cold_water(external_factors: ExternalFactors) -> pd.DataFrame:
     :math:`\bar{T}^{(\text{External})}` : Average external temperature over the dataset.
     
     """
-    # Convert external temperature to Fahrenheit
-    external_temperature_F = convert_serie_C_to_F(external_factors.data[EXTERNAL_TEMPERATURE_NAME])
+    calendar = external_factors.calendar_since(since)
 
     # Get the day of the year with the coldest average daily temperature
-    coldest_dayofyear = get_coldest_dayofyear(external_factors)
+    coldest_dayofyear = calendar.coldest_dayofyear
+
+    # Average temperature and largest daily amplitude in Fahrenheit
+    average_external_temperature_F = calendar.mean_temperature * 9/5 + 32
+    max_daily_amplitude_F = calendar.max_daily_amplitude * 9/5
 
     # Calculate the cold water temperature in Fahrenheit
-    cold_water_temperature_F = external_temperature_F.mean() + 3 +\
-        (0.4 + 0.01 * (external_temperature_F.mean() - 44)) / 2 *\
-        external_temperature_F.resample('D').apply(lambda x: x.max() - x.min()).max() *\
-        np.sin(0.01745 * (0.986 * (external_temperature_F.index.dayofyear - coldest_dayofyear - (35 - (external_temperature_F.mean() - 44))) - 90))
+    cold_water_temperature_F = average_external_temperature_F + 3 +\
+        (0.4 + 0.01 * (average_external_temperature_F - 44)) / 2 *\
+        max_daily_amplitude_F *\
+        np.sin(0.01745 * (0.986 * (calendar.per_row(calendar.dayofyear) - coldest_dayofyear - (35 - (average_external_temperature_F - 44))) - 90))
 
     # Convert cold water temperature back to Celsius and create DataFrame
-    cold_water_temperature = pd.DataFrame(
-        convert_serie_F_to_C(cold_water_temperature_F),
-        columns=[COLD_WATER_TEMPERATURE_NAME],
-        index=external_temperature_F.index
-    )
+    cold_water_temperature = calendar.frame(COLD_WATER_TEMPERATURE_NAME, (cold_water_temperature_F - 32) * 5/9)
 
-    return cold_water_temperature
\ No newline at end of file
+    return cast_float(cold_water_temperature)
\ No newline at end of file
@@ -1,27 +1,33 @@
+from typing import Optional, Union
+
 import pandas as pd
 
-from ..external_factors import ExternalFactors, EXTERNAL_TEMPERATURE_NAME, HEATING_SEASON_NAME
+from ...dtype_policy import cast_float
+from ..ensemble_external_factors import EnsembleExternalFactors
+from ..external_factors import ExternalFactors
 
 DEPARTURE_TEMPERATURE_NAME = 'departure_temperature'
 
-def basic_temperature_departure(external_factor: ExternalFactors, T_max_HS: float,
+def basic_temperature_departure(external_factor: Union[ExternalFactors, EnsembleExternalFactors], T_max_HS: float,
                                 T_max_NHS: float, T_min_HS: float,
                                 T_min_NHS: float, T_ext_mid: float,
-                                T_ext_min: float) -> pd.DataFrame:
+                                T_ext_min: float, since: Optional[Union[str, pd.Timestamp]] = None) -> pd.DataFrame:
     r"""
     Calculate basic temperature departure based on external factors.
 
     Parameters:
-        external_factor (ExternalFactors): External factors data.
+        external_factor (Union[ExternalFactors, EnsembleExternalFactors]): External factors data (an ensemble computes every member at once).
         T_max_HS (float): Maximum temperature during the heating season.
         T_max_NHS (float): Maximum temperature during the non-heating season.
         T_min_HS (float): Minimum temperature during the heating season.
         T_min_NHS (float): Minimum temperature during the non-heating season.
         T_ext_mid (float): Intermediate external temperature threshold.
         T_ext_min (float): Minimum external temperature threshold.
+        since (Union[str, pd.Timestamp], optional): Compute only the rows from since, with the statistics of every row
+            (see ExternalFactors.append). Defaults to every row.
 
     Returns:
-        pd.DataFrame: DataFrame containing the calculated basic temperature departure.
+        pd.DataFrame: DataFrame containing the calculated basic temperature departure (one column per member for an ensemble).
         
     **Overview**
     
@@ -29,17 +35,19 @@ def basic_temperature_departure(external_factor: ExternalFactors, T_max_HS: floa
         T^{(departure)}_t = \mathbb{1}_{T^{(ext)}_t<T^{(ext)}_{mid}} \frac{T^{(ext)}_t - T^{(ext)}_{mid}}{T^{(ext)}_{min} - T^{(ext)}_{mid}} \cdot (\mathbb{1}_{t \in HS}\cdot (T^{(departure)}_{HS,max} - T^{(departure)}_{HS,min}) + \\ \mathbb{1}_{t \in NHS}\cdot (T^{(departure)}_{NHS,max} - T^{(departure)}_{NHS,min})) + \mathbb{1}_{t \in HS}\cdot T^{(departure)}_{HS,min} + \mathbb{1}_{t \in NHS}\cdot T^{(departure)}_{NHS,min}
         
     """
-    # Create an empty DataFrame with the same index as external_factor
-    df = pd.DataFrame(index=external_factor.data.index, columns=[DEPARTURE_TEMPERATURE_NAME])
+    # Arrays of the calendar cache, (time x member) for an ensemble
+    calendar = external_factor.calendar_since(since)
+    external_temperature = calendar.external_temperature
+    heating_season = calendar.heating_season
 
     # Calculate basic temperature departure using the specified formula
-    df[DEPARTURE_TEMPERATURE_NAME] = (external_factor.data[EXTERNAL_TEMPERATURE_NAME] < T_ext_mid) *\
-        (external_factor.data[EXTERNAL_TEMPERATURE_NAME] - T_ext_mid) /\
+    df = calendar.frame(DEPARTURE_TEMPERATURE_NAME, (external_temperature < T_ext_mid) *\
+        (external_temperature - T_ext_mid) /\
         (T_ext_min - T_ext_mid) *\
-        (external_factor.data[HEATING_SEASON_NAME] * (T_max_HS - T_min_HS) +\
-        (1 - external_factor.data[HEATING_SEASON_NAME]) * (T_max_NHS - T_min_NHS)) +\
-        external_factor.data[HEATING_SEASON_NAME] * T_min_HS +\
-        (1 - external_factor.data[HEATING_SEASON_NAME]) * T_min_NHS
+        (heating_season * (T_max_HS - T_min_HS) +\
+        (1 - heating_season) * (T_max_NHS - T_min_NHS)) +\
+        heating_season * T_min_HS +\
+        (1 - heating_season) * T_min_NHS)
 
-    return df
+    return cast_float(df)
                                 
\ No newline at end of file
@@ -1,20 +1,28 @@
+from typing import Optional, Union
+
+import numpy as np
 import pandas as pd
 
-from ..external_factors import ExternalFactors, EXTERNAL_TEMPERATURE_NAME, HEATING_SEASON_NAME
+from ...dtype_policy import cast_float
+from ..ensemble_external_factors import EnsembleExternalFactors
+from ..external_factors import ExternalFactors
 
 RETURN_TEMPERATURE_NAME = 'return_temperature'
 
-def basic_temperature_return(external_factor: ExternalFactors, T_HS: float, T_NHS: float) -> pd.DataFrame:
+def basic_temperature_return(external_factor: Union[ExternalFactors, EnsembleExternalFactors], T_HS: float, T_NHS: float,
+                             since: Optional[Union[str, pd.Timestamp]] = None) -> pd.DataFrame:
     r"""
     Calculate basic return temperature based on external factors.
 
     Parameters:
-        external_factor (ExternalFactors): External factors data.
+        external_factor (Union[ExternalFactors, EnsembleExternalFactors]): External factors data (an ensemble computes every member at once).
         T_HS (float): Return temperature during the heating season.
         T_NHS (float): Return temperature during the non-heating season.
+        since (Union[str, pd.Timestamp], optional): Compute only the rows from since, with the statistics of every row
+            (see ExternalFactors.append). Defaults to every row.
 
     Returns:
-        pd.DataFrame: DataFrame containing the calculated basic return temperature.
+        pd.DataFrame: DataFrame containing the calculated basic return temperature (one column per member for an ensemble).
         
     **Overview**
     
@@ -22,11 +30,11 @@ def basic_temperature_return(external_factor: ExternalFactors, T_HS: float, T_NH
         T^{(return)}_t = \mathbb{1}_{t \in HS}\cdot T^{(return)}_{HS} + \mathbb{1}_{t \in NHS}\cdot T^{(return)}_{NHS}
         
     """
-    # Create an empty DataFrame with the same index as external_factor
-    df = pd.DataFrame(index=external_factor.data.index, columns=[RETURN_TEMPERATURE_NAME])
+    # Heating season flags of the calendar cache, (time x member) for an ensemble
+    calendar = external_factor.calendar_since(since)
+    heating_season = calendar.heating_season
 
-    # Calculate basic return temperature using the specified formula
-    df[RETURN_TEMPERATURE_NAME] = external_factor.data[HEATING_SEASON_NAME] * T_HS +\
-                                (1 - external_factor.data[HEATING_SEASON_NAME]) * T_NHS
+    # Calculate basic return temperature using the specified formula, in float even for integer temperatures
+    df = calendar.frame(RETURN_TEMPERATURE_NAME, np.where(heating_season, float(T_HS), float(T_NHS)))
 
-    return df
\ No newline at end of file
+    return cast_float(df)
\ No newline at end of file
@@ -1,22 +1,28 @@
+from typing import Optional, Union
+
 import numpy as np
 import pandas as pd
 
-from .utils import get_coldest_dayofyear
+from ...dtype_policy import cast_float
+from ..ensemble_external_factors import EnsembleExternalFactors
 from ..external_factors import ExternalFactors
 
 SOIL_TEMPERATURE_NAME = 'soil_temperature'
 
-def kasuda_soil_temperature(external_factor: ExternalFactors, d: float, alpha: float) -> pd.DataFrame:
+def kasuda_soil_temperature(external_factor: Union[ExternalFactors, EnsembleExternalFactors], d: float, alpha: float,
+                            since: Optional[Union[str, pd.Timestamp]] = None) -> pd.DataFrame:
     r"""
     Calculate Kasuda soil temperature based on external factors using (Kusada et al., 1965) approach.
 
     Parameters:
-        external_factor (ExternalFactors): External factors data.
+        external_factor (Union[ExternalFactors, EnsembleExternalFactors]): External factors data (an ensemble computes every member at once).
         d (float): Depth of pipes (meter).
         alpha (float): thermal diffusivity of the soil (meter²/day)
+        since (Union[str, pd.Timestamp], optional): Compute only the rows from since, with the statistics of every row
+            (see ExternalFactors.append). Defaults to every row.
 
     Returns:
-        pd.DataFrame: DataFrame containing the calculated Kasuda soil temperature.
+        pd.DataFrame: DataFrame containing the calculated Kasuda soil temperature (one column per member for an ensemble).
         
     **Overview**
     
@@ -27,17 +33,16 @@ def kasuda_soil_temperature(external_factor: ExternalFactors, d: float, alpha: f
         
     where :math:`\Delta_{month}T^{(\text{External})}` is the average monthly amplitude over the years.
     """
-    # Create an empty DataFrame with the same index as external_factor
-    df = pd.DataFrame(index=external_factor.data.index, columns=[SOIL_TEMPERATURE_NAME])
+    calendar = external_factor.calendar_since(since)
 
     # Calculate average external temperature, average monthly amplitude, and coldest day of the year
-    average_external_temperature = external_factor.data.external_temperature.mean()
-    average_monthly_amplitude = 0.5 * external_factor.data.external_temperature.resample('MS').mean().resample('YS').apply(lambda x: x.max() - x.min()).mean()
-    coldest_dayofyear = get_coldest_dayofyear(external_factor)
+    average_external_temperature = calendar.mean_temperature
+    average_monthly_amplitude = 0.5 * calendar.mean_yearly_amplitude
+    coldest_dayofyear = calendar.coldest_dayofyear
 
     # Calculate Kasuda soil temperature using the specified formula
-    df[SOIL_TEMPERATURE_NAME] = average_external_temperature - average_monthly_amplitude * np.exp(-d*(np.pi/(365*alpha))**0.5) \
-                            * np.cos(2*np.pi/365 *(df.index.dayofyear - coldest_dayofyear - d/2*(365/(np.pi*alpha))**0.5))
+    df = calendar.frame(SOIL_TEMPERATURE_NAME, average_external_temperature - average_monthly_amplitude * np.exp(-d*(np.pi/(365*alpha))**0.5) \
+                            * np.cos(2*np.pi/365 *(calendar.per_row(calendar.dayofyear) - coldest_dayofyear - d/2*(365/(np.pi*alpha))**0.5)))
 
-    return df
+    return cast_float(df)
 
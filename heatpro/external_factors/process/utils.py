@@ -1,7 +1,14 @@
+from typing import Optional, Union
+
+import numpy as np
 import pandas as pd
 
+from ...period_codes import DAY, MONTH, datetime_values, period_groups, group_period_codes, sum_by_period
 from ..external_factors import ExternalFactors
 
+# Length of a day in nanoseconds, the period of the reshape kernels
+_DAY_NANOSECONDS = pd.Timedelta(days=1).value
+
 def convert_serie_C_to_F(celsius_serie: pd.Series) -> pd.Series:
     """
     Convert a pandas Series from Celsius to Fahrenheit.
@@ -36,10 +43,196 @@ def get_coldest_dayofyear(external_factors: ExternalFactors) -> int:
     Returns:
         int: Day of the year with the coldest average daily temperature.
     """
-    # Resample the external temperature to daily and calculate the mean
-    df_average_daily_temperature = external_factors.data.external_temperature.resample('D').mean()
-    
-    # Find the day of the year with the minimum average daily temperature
-    coldest_dayofyear = df_average_daily_temperature.idxmin().dayofyear
+    # Daily means are computed once per ExternalFactors (see ExternalFactors.calendar)
+    return external_factors.calendar.coldest_dayofyear
+
+def rows_per_day(datetime_index: pd.DatetimeIndex) -> Optional[int]:
+    """
+    Get the number of rows of each day of a regular index covering whole days.
+
+    Wall-clock datetimes are used, so that an index with a daylight saving time change is not regular.
+
+    Parameters:
+        datetime_index (pd.DatetimeIndex): Index.
+
+    Returns:
+        Optional[int]: Number of rows per day, None if the index does not have a fixed step dividing a day,
+        does not start at midnight or does not end at the end of a day.
+    """
+    if len(datetime_index) < 2:
+        return None
+    values = datetime_values(datetime_index).astype('datetime64[ns]', copy=False).view(np.int64)
+    step = values[1] - values[0]
+    if step <= 0 or _DAY_NANOSECONDS % step or values[0] % _DAY_NANOSECONDS:
+        return None
+    rows = int(_DAY_NANOSECONDS // step)
+    if len(values) % rows or not (np.diff(values) == step).all():
+        return None
+    return rows
 
-    return coldest_dayofyear
\ No newline at end of file
+def nan_period_sums(values: np.ndarray, groups: tuple) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compute the sum, number of non-NaN values, minimum and maximum of values over each period, NaN skipped.
+
+    Parameters:
+        values (np.ndarray): Values of each datetime, of shape (n,) or (n, members).
+        groups (tuple): Groups of the datetimes (see period_groups).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: Sum, count, minimum and maximum of each period
+        (minimum and maximum are NaN if every value is NaN).
+    """
+    order, offsets, _ = groups
+    if len(offsets) == 0:
+        empty = np.zeros((0,) + values.shape[1:])
+        return empty, empty.astype(np.int64), empty, empty
+    sorted_values = values if order is None else values[order]
+    missing = np.isnan(sorted_values)
+    sums = sum_by_period(np.where(missing, 0, sorted_values), (None, offsets, None))
+    counts = sum_by_period((~missing).astype(np.int64), (None, offsets, None))
+    return sums, counts, np.fmin.reduceat(sorted_values, offsets), np.fmax.reduceat(sorted_values, offsets)
+
+def nan_period_stats(values: np.ndarray, groups: tuple) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compute the mean, minimum and maximum of values over each period, NaN skipped (as pandas resample).
+
+    Parameters:
+        values (np.ndarray): Values of each datetime, of shape (n,) or (n, members).
+        groups (tuple): Groups of the datetimes (see period_groups).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: Mean, minimum and maximum of each period (NaN if every value is NaN).
+    """
+    sums, counts, minimums, maximums = nan_period_sums(values, groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return sums / counts, minimums, maximums
+
+def _regular_daily_sums(values: np.ndarray, datetime_index: pd.DatetimeIndex,
+                        rows: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Day codes, values reshaped to (days, rows, ...), sums and counts of non-NaN values of each day of a regular index."""
+    days = datetime_values(datetime_index[::rows]).astype('datetime64[D]').astype(np.int64)
+    daily_values = values.reshape((len(values) // rows, rows) + values.shape[1:])
+    missing = np.isnan(daily_values)
+    return days, daily_values, np.where(missing, 0, daily_values).sum(axis=1), (~missing).sum(axis=1)
+
+def daily_sums(values: np.ndarray, datetime_index: pd.DatetimeIndex) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compute the sum, number of non-NaN values, minimum and maximum of values over each day, NaN skipped.
+
+    A regular index covering whole days (see rows_per_day) is reshaped to (days, rows per day), other indexes
+    are grouped by day codes.
+
+    Parameters:
+        values (np.ndarray): Values of each datetime, of shape (n,) or (n, members).
+        datetime_index (pd.DatetimeIndex): Index of values.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]: Sorted day codes (see period_codes), sum,
+        count, minimum and maximum of each day.
+    """
+    rows = rows_per_day(datetime_index)
+    if rows is None:
+        _, _, days = groups = period_groups(datetime_index, DAY)
+        return (days,) + nan_period_sums(values, groups)
+
+    days, daily_values, sums, counts = _regular_daily_sums(values, datetime_index, rows)
+    return days, sums, counts, np.fmin.reduce(daily_values, axis=1), np.fmax.reduce(daily_values, axis=1)
+
+def daily_stats(values: np.ndarray, datetime_index: pd.DatetimeIndex) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compute the mean, minimum and maximum of values over each day, NaN skipped (see daily_sums).
+
+    Parameters:
+        values (np.ndarray): Values of each datetime, of shape (n,) or (n, members).
+        datetime_index (pd.DatetimeIndex): Index of values.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: Sorted day codes (see period_codes), mean, minimum
+        and maximum of each day.
+    """
+    days, sums, counts, minimums, maximums = daily_sums(values, datetime_index)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return days, sums / counts, minimums, maximums
+
+def daily_amplitudes(values: np.ndarray, datetime_index: pd.DatetimeIndex) -> np.ndarray:
+    """
+    Compute the difference between the maximum and minimum value of each day (see daily_stats).
+
+    Parameters:
+        values (np.ndarray): Values of each datetime, of shape (n,) or (n, members).
+        datetime_index (pd.DatetimeIndex): Index of values.
+
+    Returns:
+        np.ndarray: Amplitude of each day (sorted by day).
+    """
+    _, _, minimums, maximums = daily_stats(values, datetime_index)
+    return maximums - minimums
+
+def yearly_amplitudes(monthly_values: np.ndarray, months: np.ndarray) -> np.ndarray:
+    """
+    Compute the difference between the largest and smallest monthly value of each year, NaN skipped.
+
+    Parameters:
+        monthly_values (np.ndarray): Value of each month, of shape (months,) or (months, members).
+        months (np.ndarray): Sorted month codes of monthly_values (see period_codes).
+
+    Returns:
+        np.ndarray: Amplitude of each year.
+    """
+    _, offsets, _ = group_period_codes(months // 12)
+    if len(offsets) == 0:
+        return np.zeros((0,) + monthly_values.shape[1:])
+    return np.fmax.reduceat(monthly_values, offsets) - np.fmin.reduceat(monthly_values, offsets)
+
+def monthly_means(values: np.ndarray, datetime_index: pd.DatetimeIndex) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Compute the mean of values over each month, NaN skipped.
+
+    Months of a regular index covering whole days (see rows_per_day) are reduced from daily sums.
+
+    Parameters:
+        values (np.ndarray): Values of each datetime, of shape (n,) or (n, members).
+        datetime_index (pd.DatetimeIndex): Index of values.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Sorted month codes (see period_codes) and mean of each month.
+    """
+    rows = rows_per_day(datetime_index)
+    if rows is None:
+        _, _, months = groups = period_groups(datetime_index, MONTH)
+        return months, nan_period_stats(values, groups)[0]
+
+    # Daily sums of a regular index are summed by month, a reduction over days instead of datetimes
+    days, _, sums, counts = _regular_daily_sums(values, datetime_index, rows)
+    _, offsets, months = group_period_codes(days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return months, np.add.reduceat(sums, offsets) / np.add.reduceat(counts, offsets)
+
+def max_daily_amplitude(values: np.ndarray, datetime_index: pd.DatetimeIndex) -> Union[float, np.ndarray]:
+    """
+    Compute the largest daily amplitude of values (of each member), as used by burch_cold_water.
+
+    Parameters:
+        values (np.ndarray): Values of each datetime, of shape (n,) or (n, members).
+        datetime_index (pd.DatetimeIndex): Index of values.
+
+    Returns:
+        Union[float, np.ndarray]: Largest daily amplitude (one per member for 2-D values).
+    """
+    amplitude = np.nanmax(daily_amplitudes(values, datetime_index), axis=0)
+    return float(amplitude) if np.ndim(amplitude) == 0 else amplitude
+
+def mean_yearly_amplitude(values: np.ndarray, datetime_index: pd.DatetimeIndex) -> Union[float, np.ndarray]:
+    """
+    Compute the mean over years of the amplitude of monthly means (of each member), as used by kasuda_soil_temperature.
+
+    Parameters:
+        values (np.ndarray): Values of each datetime, of shape (n,) or (n, members).
+        datetime_index (pd.DatetimeIndex): Index of values.
+
+    Returns:
+        Union[float, np.ndarray]: Mean yearly amplitude (one per member for 2-D values).
+    """
+    months, means = monthly_means(values, datetime_index)
+    amplitude = np.nanmean(yearly_amplitudes(means, months), axis=0)
+    return float(amplitude) if np.ndim(amplitude) == 0 else amplitude
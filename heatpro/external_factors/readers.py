@@ -0,0 +1,114 @@
+import os
+import struct
+import zipfile
+from typing import Callable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+# Size of the fixed part of a zip local file header (signature to extra field length)
+_ZIP_LOCAL_HEADER_SIZE = 30
+
+HeatingSeason = Union[np.ndarray, pd.Series, Callable[[pd.DatetimeIndex], np.ndarray]]
+
+def regular_index(start: Union[str, pd.Timestamp, np.datetime64], periods: int, freq: str,
+                  tz: Optional[str] = None) -> pd.DatetimeIndex:
+    """Build a regular index from its first datetime instead of parsing every datetime.
+
+    Args:
+        start (Union[str, pd.Timestamp, np.datetime64]): First datetime
+        periods (int): Number of datetimes
+        freq (str): Frequency (for instance 'h' or '15min')
+        tz (str, optional): Timezone of the index. Defaults to the timezone of start (naive if none).
+
+    Returns:
+        pd.DatetimeIndex: Index
+    """
+    return pd.date_range(pd.Timestamp(start), periods=periods, freq=freq, tz=tz)
+
+def parse_regular_index(values: np.ndarray, freq: str, date_format: Optional[str] = None) -> pd.DatetimeIndex:
+    """Rebuild the index of datetime strings known to be regular, only the first and last ones are parsed.
+
+    Args:
+        values (np.ndarray): Datetime strings
+        freq (str): Frequency of the datetimes
+        date_format (str, optional): Format of the datetimes (see pd.to_datetime). Defaults to inferred.
+
+    Raises:
+        ValueError: If the last datetime is not the one expected at freq
+
+    Returns:
+        pd.DatetimeIndex: Index
+    """
+    if len(values) == 0:
+        return pd.DatetimeIndex([])
+    first, last = pd.to_datetime([values[0], values[-1]], format=date_format)
+    index = regular_index(first, len(values), freq)
+    if index[-1] != last:
+        raise ValueError(f"datetimes are not regular at frequency {freq}: expected {index[-1]} as last datetime, got {last}")
+    return index
+
+def heating_season_values(heating_season: HeatingSeason, index: pd.DatetimeIndex) -> np.ndarray:
+    """Compute the heating season flag of each datetime from an array or a function of the index.
+
+    Args:
+        heating_season (HeatingSeason): Flags, or function returning the flags of an index
+        index (pd.DatetimeIndex): Index
+
+    Raises:
+        ValueError: If there is not one flag per datetime
+
+    Returns:
+        np.ndarray: Boolean flags
+    """
+    values = heating_season(index) if callable(heating_season) else heating_season
+    values = np.asarray(values, dtype=bool)
+    if values.shape != (len(index),):
+        raise ValueError(f"heating_season should have one value per datetime ({len(index)}), got shape {values.shape}")
+    return values
+
+def _npz_member_memmap(path: Union[str, os.PathLike], info: zipfile.ZipInfo) -> Optional[np.ndarray]:
+    """Memory-map an uncompressed .npy member of a .npz archive (None if it cannot be mapped)."""
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+    with open(path, 'rb') as file:
+        file.seek(info.header_offset)
+        local_header = file.read(_ZIP_LOCAL_HEADER_SIZE)
+        name_length, extra_length = struct.unpack('<HH', local_header[26:30])
+        file.seek(info.header_offset + _ZIP_LOCAL_HEADER_SIZE + name_length + extra_length)
+
+        version = np.lib.format.read_magic(file)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(file)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(file)
+        if dtype.hasobject or not shape:
+            return None
+        offset = file.tell()
+    return np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape, order='F' if fortran_order else 'C')
+
+def read_npz(path: Union[str, os.PathLike], names: Optional[list[str]] = None, mmap: bool = False) -> dict[str, np.ndarray]:
+    """Read arrays of a .npz archive, optionally memory-mapped.
+
+    Uncompressed members (written by np.savez) are mapped without being read when mmap is True,
+    compressed members and scalars are read.
+
+    Args:
+        path (Union[str, os.PathLike]): Path of the archive
+        names (list[str], optional): Arrays to read. Defaults to every array.
+        mmap (bool, optional): If True, map uncompressed arrays instead of reading them. Defaults to False.
+
+    Raises:
+        KeyError: If an array of names is not in the archive
+
+    Returns:
+        dict[str, np.ndarray]: Arrays by name
+    """
+    arrays = {}
+    with np.load(path, allow_pickle=False) as archive, zipfile.ZipFile(path) as zip_file:
+        for name in (archive.files if names is None else names):
+            if name not in archive.files:
+                raise KeyError(f"{name} is not in {path}")
+            array = _npz_member_memmap(path, zip_file.getinfo(f"{name}.npy")) if mmap else None
+            arrays[name] = archive[name] if array is None else array
+    return arrays
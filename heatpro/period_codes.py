@@ -0,0 +1,259 @@
+import weakref
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+YEAR = 'year'
+MONTH = 'month'
+DAY = 'day'
+HOUR = 'hour'
+PERIOD_LEVELS = (YEAR, MONTH, DAY, HOUR)
+
+_NUMPY_DATETIME_UNITS = {
+    YEAR: 'datetime64[Y]',
+    MONTH: 'datetime64[M]',
+    DAY: 'datetime64[D]',
+    HOUR: 'datetime64[h]',
+}
+
+# Period groups computed per (index id, level), dropped when the index is freed
+_period_groups_cache: dict[tuple[int, str], tuple[weakref.ref, tuple]] = {}
+
+_FIXED_LEVEL_NANOSECONDS = {
+    DAY: pd.Timedelta(days=1).value,
+    HOUR: pd.Timedelta(hours=1).value,
+}
+
+def datetime_values(datetime_index: pd.DatetimeIndex) -> np.ndarray:
+    """Return the wall-clock datetime64 values of a DatetimeIndex.
+
+    Timezone aware indexes are converted to their local wall time so that
+    periods (days, months, ...) are the ones a reader of the index would expect.
+
+    Args:
+        datetime_index (pd.DatetimeIndex): Index
+
+    Returns:
+        np.ndarray: datetime64 values of the index
+    """
+    if datetime_index.tz is not None:
+        datetime_index = datetime_index.tz_localize(None)
+    return datetime_index.values
+
+def time_step(datetime_index: pd.DatetimeIndex) -> pd.Timedelta:
+    """Return the time step of a regular DatetimeIndex.
+
+    The frequency of the index is used when it is set, otherwise the smallest gap between two datetimes.
+
+    Args:
+        datetime_index (pd.DatetimeIndex): Index with at least two distinct datetimes or a fixed frequency
+
+    Raises:
+        ValueError: If the time step cannot be determined
+
+    Returns:
+        pd.Timedelta: Time step
+    """
+    if datetime_index.freq is not None:
+        try:
+            return pd.Timedelta(datetime_index.freq)
+        except ValueError:
+            pass
+    gaps = np.diff(np.unique(datetime_values(datetime_index)))
+    if len(gaps) == 0:
+        raise ValueError("time step of the index cannot be determined")
+    return pd.Timedelta(gaps.min())
+
+def period_codes(datetime_index: pd.DatetimeIndex, level: str) -> np.ndarray:
+    """Compute one integer code per datetime identifying the period it belongs to.
+
+    Codes are the number of periods elapsed since 1970 (for instance months since
+    January 1970 for ``level=MONTH``), two datetimes share a code if and only if
+    they are in the same period.
+
+    Args:
+        datetime_index (pd.DatetimeIndex): Index
+        level (str): Period level, one of PERIOD_LEVELS or a fixed sub-hourly frequency such as '15min'
+
+    Raises:
+        ValueError: If level is neither one of PERIOD_LEVELS nor a fixed frequency
+
+    Returns:
+        np.ndarray: int64 array of period codes, same length as datetime_index
+    """
+    if level in _FIXED_LEVEL_NANOSECONDS:
+        # Days and hours have a fixed length: an integer division is faster than a calendar conversion
+        return datetime_values(datetime_index).astype('datetime64[ns]', copy=False).view(np.int64) // _FIXED_LEVEL_NANOSECONDS[level]
+    if level in _NUMPY_DATETIME_UNITS:
+        return datetime_values(datetime_index).astype(_NUMPY_DATETIME_UNITS[level]).astype(np.int64)
+
+    try:
+        step = pd.Timedelta(level)
+    except ValueError:
+        raise ValueError(f"level should be one of {', '.join(PERIOD_LEVELS)} or a fixed frequency, got {level}")
+    return datetime_values(datetime_index).astype('datetime64[ns]').view(np.int64) // step.value
+
+def period_starts(codes: np.ndarray, level: str) -> pd.DatetimeIndex:
+    """Return the first datetime of the periods identified by codes (inverse of period_codes).
+
+    Args:
+        codes (np.ndarray): Period codes
+        level (str): Period level of the codes, one of PERIOD_LEVELS or a fixed sub-hourly frequency
+
+    Returns:
+        pd.DatetimeIndex: First datetime of each period
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    if level in _NUMPY_DATETIME_UNITS:
+        return pd.DatetimeIndex(codes.astype(_NUMPY_DATETIME_UNITS[level]).astype('datetime64[ns]'))
+    return pd.DatetimeIndex((codes * pd.Timedelta(level).value).astype('datetime64[ns]'))
+
+def unique_period_codes(codes: np.ndarray) -> np.ndarray:
+    """Return the sorted unique codes.
+
+    Sorted codes (for a sorted index) are deduplicated in a single pass, other codes are sorted by np.unique.
+
+    Args:
+        codes (np.ndarray): Period codes
+
+    Returns:
+        np.ndarray: Sorted unique codes
+    """
+    if len(codes) < 2:
+        return np.asarray(codes, dtype=np.int64)
+    gaps = np.diff(codes)
+    if (gaps >= 0).all():
+        return codes[np.concatenate([[True], gaps > 0])]
+    return np.unique(codes)
+
+def duplicate_period_codes(codes: np.ndarray) -> np.ndarray:
+    """Find the codes appearing more than once.
+
+    Sorted codes (the usual case, for a sorted index) are checked with a single
+    comparison of consecutive codes, other codes are counted with np.unique.
+
+    Args:
+        codes (np.ndarray): Period codes
+
+    Returns:
+        np.ndarray: Sorted unique codes with multiple occurrences
+    """
+    if len(codes) < 2:
+        return np.asarray(codes[:0], dtype=np.int64)
+
+    # Sorted index: duplicates are equal neighbours
+    gaps = np.diff(codes)
+    if (gaps >= 0).all():
+        return np.unique(codes[1:][gaps == 0])
+
+    unique_codes, counts = np.unique(codes, return_counts=True)
+    return unique_codes[counts > 1]
+
+def match_period_codes(codes: np.ndarray, reference_codes: np.ndarray) -> np.ndarray:
+    """Find for each code its position in reference_codes.
+
+    reference_codes are expected to be unique (one row per period, as in a
+    TemporalHeatDemand).
+
+    Args:
+        codes (np.ndarray): Period codes to look up
+        reference_codes (np.ndarray): Unique period codes of the reference
+
+    Returns:
+        np.ndarray: int64 array of positions in reference_codes, -1 where the code is absent
+    """
+    if len(reference_codes) == 0:
+        return np.full(len(codes), -1, dtype=np.int64)
+
+    # Contiguous sorted periods (the usual case): positions are a plain offset
+    first, last = reference_codes[0], reference_codes[-1]
+    if last - first == len(reference_codes) - 1 and np.all(np.diff(reference_codes) == 1):
+        positions = codes - first
+        return np.where((positions >= 0) & (positions < len(reference_codes)), positions, -1)
+
+    # General case: binary search in the sorted reference
+    sorter = np.argsort(reference_codes, kind='stable')
+    sorted_reference_codes = reference_codes[sorter]
+    positions = np.minimum(np.searchsorted(sorted_reference_codes, codes), len(reference_codes) - 1)
+    return np.where(sorted_reference_codes[positions] == codes, sorter[positions], -1)
+
+def broadcast_period_values(values: np.ndarray, positions: np.ndarray, fill_value: float = 0) -> np.ndarray:
+    """Broadcast one value per period to every row of a finer index with a single gather.
+
+    Args:
+        values (np.ndarray): One value per reference period
+        positions (np.ndarray): Positions returned by match_period_codes
+        fill_value (float, optional): Value of rows without period. Defaults to 0.
+
+    Returns:
+        np.ndarray: Array of values, same length as positions
+    """
+    # The fill value is appended so that position -1 gathers it
+    return np.append(values, np.asarray([fill_value], dtype=np.asarray(values).dtype)).take(positions)
+
+def group_period_codes(codes: np.ndarray) -> tuple[Optional[np.ndarray], np.ndarray, np.ndarray]:
+    """Group rows by period, in the form expected by np.add.reduceat.
+
+    Args:
+        codes (np.ndarray): Period codes of the rows
+
+    Returns:
+        tuple[Optional[np.ndarray], np.ndarray, np.ndarray]: Order sorting the rows by period (None if
+        codes are already sorted), offset of the first sorted row of each period and sorted unique codes
+    """
+    order = None
+    if len(codes) > 1 and (np.diff(codes) < 0).any():
+        order = np.argsort(codes, kind='stable')
+        codes = codes[order]
+    if len(codes) == 0:
+        return order, np.zeros(0, dtype=np.int64), codes
+    offsets = np.flatnonzero(np.concatenate([[True], codes[1:] != codes[:-1]]))
+    return order, offsets, codes[offsets]
+
+def period_groups(datetime_index: pd.DatetimeIndex, level: str) -> tuple[Optional[np.ndarray], np.ndarray, np.ndarray]:
+    """Group the rows of an index by period (see group_period_codes), cached per index and level.
+
+    Demands sharing the same index object share the groups, so repeated roll-ups of this index
+    only cost the np.add.reduceat.
+
+    Args:
+        datetime_index (pd.DatetimeIndex): Index
+        level (str): Period level, one of PERIOD_LEVELS or a fixed sub-hourly frequency
+
+    Returns:
+        tuple[Optional[np.ndarray], np.ndarray, np.ndarray]: Order (or None), offsets and unique codes
+    """
+    key = (id(datetime_index), level)
+    cached = _period_groups_cache.get(key)
+    if cached is not None and cached[0]() is datetime_index:
+        return cached[1]
+
+    groups = group_period_codes(period_codes(datetime_index, level))
+
+    def forget(reference: weakref.ref) -> None:
+        if key in _period_groups_cache and _period_groups_cache[key][0] is reference:
+            del _period_groups_cache[key]
+
+    _period_groups_cache[key] = (weakref.ref(datetime_index, forget), groups)
+    return groups
+
+def sum_by_period(values: np.ndarray, groups: tuple[Optional[np.ndarray], np.ndarray, np.ndarray]) -> np.ndarray:
+    """Sum values over each period of groups with a single np.add.reduceat.
+
+    float32 values are accumulated in float64 and the sums cast back to float32.
+
+    Args:
+        values (np.ndarray): Values of the rows, the first axis is the rows
+        groups (tuple[Optional[np.ndarray], np.ndarray, np.ndarray]): Groups returned by period_groups or group_period_codes
+
+    Returns:
+        np.ndarray: Sum of each period, in the order of the unique codes of groups, of the dtype of values
+    """
+    order, offsets, _ = groups
+    values = np.asarray(values)
+    if len(offsets) == 0:
+        return np.zeros((0,) + values.shape[1:], dtype=values.dtype)
+    if values.dtype == np.float32:
+        return np.add.reduceat(values if order is None else values[order], offsets, axis=0, dtype=np.float64).astype(np.float32)
+    return np.add.reduceat(values if order is None else values[order], offsets, axis=0)
@@ -1,13 +1,24 @@
+import warnings
+
 import pandas as pd
 
-from .check import ENERGY_FEATURE_NAME, WEIGHT_NAME_REQUIRED
+from .check import ENERGY_FEATURE_NAME, WEIGHT_NAME_REQUIRED, check_weight_normalisation
 from .demand_profile import day_length_proportionnal_weight
+from .dtype_policy import cast_float
+from .period_codes import DAY
 from .external_factors import ExternalFactors, burch_cold_water, closed_heating_season, CLOSED_HEATING_SEASON_NAME
 from .temporal_demand import MonthlyHeatDemand, HourlyHeatDemand
 
+# Handling of an hourly day profile that does not sum to 1 on each day
+DAY_PROFILE_KEEP = 'keep'
+DAY_PROFILE_WARN = 'warn'
+DAY_PROFILE_RENORMALISE = 'renormalise'
+DAY_PROFILE_CHECKS = (DAY_PROFILE_KEEP, DAY_PROFILE_WARN, DAY_PROFILE_RENORMALISE)
+
 def special_hot_water(external_factors: ExternalFactors, total_heating_including_hotwater: MonthlyHeatDemand,
                       monthly_hot_water_profile: pd.DataFrame, temperature_hot_water: float,
-                      hourly_hot_water_day_profil: pd.DataFrame, name: str="hot_water"):
+                      hourly_hot_water_day_profil: pd.DataFrame, name: str="hot_water",
+                      day_profile_check: str = DAY_PROFILE_KEEP):
     """Calculate the hourly energy demand for hot water considering external factors and profiles.
 
     Args:
@@ -17,10 +28,22 @@ def special_hot_water(external_factors: ExternalFactors, total_heating_including
         temperature_hot_water (float): The temperature of the hot water.
         hourly_hot_water_day_profil (pd.DataFrame): Hourly profile for hot water demand (In term of quantity i.e. L).
         name (str, optional): Name of the demand. Defaults to "hot_water".
+        day_profile_check (str, optional): Handling of an hourly_hot_water_day_profil that does not sum to 1 on each day
+            (see check_weight_normalisation), the daily energy is then scaled by the daily sum of the profile.
+            DAY_PROFILE_KEEP uses the profile as given, DAY_PROFILE_WARN warns and DAY_PROFILE_RENORMALISE divides
+            the profile by its daily sums (the input is not modified). Defaults to DAY_PROFILE_KEEP, because
+            the hourly profile is a quantity profile: the profiles built by basic_hot_water_hourly_profile sum to 1
+            within about 1% only and the results of existing studies (see the non-regression tests) rely on them.
+
+    Raises:
+        ValueError: If day_profile_check is not one of DAY_PROFILE_CHECKS.
+        ValueError: If day_profile_check is DAY_PROFILE_RENORMALISE and the profile sums to 0 on a day.
 
     Returns:
         HourlyHeatDemand: The hourly demand for hot water.
     """
+    if day_profile_check not in DAY_PROFILE_CHECKS:
+        raise ValueError(f"day_profile_check should be one of {', '.join(DAY_PROFILE_CHECKS)}, got {day_profile_check}")
     
     # Calculate induced factors based on external factors
     induced_factors = pd.concat((
@@ -61,14 +84,22 @@ def special_hot_water(external_factors: ExternalFactors, total_heating_including
                                                 .groupby(hourly_hot_water_month_profile.index.date).transform('sum')/\
                                             (hourly_hot_water_month_profile['weight'] * (temperature_hot_water - induced_factors['cold_water_temperature']))[mask_daily_hot_water_energy_consumption].sum())\
                                                 .rename(ENERGY_FEATURE_NAME)
-    # TODO: Verify if sums equal 1 on each day in hourly_hot_water_day_profil
+    # Hourly profile should sum to 1 on each day to keep the daily energy
+    if day_profile_check == DAY_PROFILE_WARN:
+        try:
+            check_weight_normalisation(hourly_hot_water_day_profil, DAY)
+        except ValueError as error:
+            warnings.warn(f"hourly_hot_water_day_profil : {error}")
+    elif day_profile_check == DAY_PROFILE_RENORMALISE:
+        hourly_hot_water_day_profil = hourly_hot_water_day_profil.copy()
+        check_weight_normalisation(hourly_hot_water_day_profil, DAY, renormalise=True)
     # Warning: simultaneity and sanitary loop are considered calculated
     
     # Calculate final hourly hot water energy consumption
     final_hourly_hot_water_energy_consumption = pd.DataFrame((daily_hot_water_energy_consumption * hourly_hot_water_day_profil[WEIGHT_NAME_REQUIRED]).rename(ENERGY_FEATURE_NAME))
     
     # Return the result as HourlyHeatDemand
-    return HourlyHeatDemand(name, final_hourly_hot_water_energy_consumption)
+    return HourlyHeatDemand(name, cast_float(final_hourly_hot_water_energy_consumption))
 
     
     
\ No newline at end of file
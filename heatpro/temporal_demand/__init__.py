@@ -1,6 +1,10 @@
+from .lazy_context import LazyContext
 from .temporal_heat_demand import TemporalHeatDemand
 
 from .daily_heat_demand import *
 from .hourly_heat_demand import *
 from .monthly_heat_demand import *
-from .yearly_heat_demand import *
\ No newline at end of file
+from .yearly_heat_demand import *
+from .sub_hourly_heat_demand import *
+from .heat_demand_set import *
+
@@ -1,24 +1,37 @@
+from typing import Optional
+
 from matplotlib.axes import Axes
 import pandas as pd
 
 from . import TemporalHeatDemand
-from ..check import find_duplicate_days
+from .lazy_context import LazyContext
+from ..check import find_duplicate_days, is_validated, mark_validated
+from ..period_codes import DAY, period_codes, duplicate_period_codes
+
+class DailyHeatDemand(TemporalHeatDemand, level=DAY):
+    __slots__ = ()
 
-class DailyHeatDemand(TemporalHeatDemand):
-    def __init__(self, name: str, data: pd.DataFrame) -> None:
+    def __init__(self, name: str, data: pd.DataFrame, context: Optional[LazyContext] = None) -> None:
         """
         Initialize an instance of DailyHeatDemand.
 
         Parameters:
             name (str): Name of the daily heat demand.
             data (pd.DataFrame): DataFrame containing daily heat demand data.
+            context (LazyContext, optional): Context columns expanded only when read. Defaults to no context.
 
         Raises:
             ValueError: If the data index is not in datetime format.
             ValueError: If the required energy feature is not present in the data.
             ValueError: If there are duplicate days in the data index.
         """
-        super().__init__(name, data)
+        super().__init__(name, data, context)
 
-        if not find_duplicate_days(data.index).empty:
-            raise ValueError(f"Days {' ,'.join([f'{day.Day}-{day.Month}-{day.Year}' for _, day in find_duplicate_days(data.index).iterrows()])} have multiple occurrences.")
\ No newline at end of file
+    def _validate(self) -> None:
+        """Check that each day appears once."""
+        if not is_validated(('duplicates', DAY), self.index):
+            # Integer codes of the days, the readable list is only built to report duplicates
+            if len(duplicate_period_codes(period_codes(self.index, DAY))):
+                duplicate_days = find_duplicate_days(self.index)
+                raise ValueError(f"Days {' ,'.join([f'{day.Day}-{day.Month}-{day.Year}' for _, day in duplicate_days.iterrows()])} have multiple occurrences.")
+            mark_validated(('duplicates', DAY), self.index)
\ No newline at end of file
@@ -0,0 +1,244 @@
+from collections.abc import Mapping
+from typing import Hashable, Iterator, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from . import TemporalHeatDemand
+from .hourly_heat_demand import HourlyHeatDemand
+from ..check import ENERGY_FEATURE_NAME
+
+class HeatDemandSet:
+    def __init__(self, index: pd.DatetimeIndex, energy: np.ndarray, names: Sequence[str],
+                 metadata: Optional[pd.DataFrame] = None, demand_class: type = HourlyHeatDemand, **attributes) -> None:
+        """
+        Initialize an instance of HeatDemandSet, many demands of the same class sharing one index.
+
+        Energy is stored as one 2-D (time x demand) array in column-major order: the energy of each
+        demand is contiguous and the set is viewed as a DataFrame without copy. Totals and group sums
+        are single vectorised operations whatever the number of demands.
+
+        Parameters:
+            index (pd.DatetimeIndex): Index shared by every demand.
+            energy (np.ndarray): Energy of shape (len(index), len(names)).
+            names (Sequence[str]): Name of each demand.
+            metadata (pd.DataFrame, optional): One row per demand indexed by names (for instance sector or substation).
+                Defaults to no metadata.
+            demand_class (type, optional): TemporalHeatDemand subclass of the demands. Defaults to HourlyHeatDemand.
+            **attributes: Attributes of demand_class (for instance freq of SubHourlyHeatDemand).
+
+        Raises:
+            ValueError: If index is not a DatetimeIndex.
+            ValueError: If energy is not of shape (len(index), len(names)).
+            ValueError: If names are not unique.
+            ValueError: If metadata is not indexed by names.
+            ValueError: If the periods of index are not valid for demand_class (for instance duplicate hours).
+        """
+        if not isinstance(index, pd.DatetimeIndex):
+            raise ValueError("index should be a DatetimeIndex")
+        energy = np.asfortranarray(energy)
+        if energy.ndim != 2 or energy.shape != (len(index), len(names)):
+            raise ValueError(f"energy should be of shape (len(index), len(names)) = ({len(index)}, {len(names)}), got {energy.shape}")
+        if energy.dtype not in (np.float32, np.float64):
+            energy = energy.astype(np.float64, order='F')
+        names = list(names)
+        if len(set(names)) != len(names):
+            raise ValueError("names of the demands should be unique")
+        if metadata is not None and not metadata.index.equals(pd.Index(names)):
+            raise ValueError("metadata should be indexed by the names of the demands")
+
+        # The index is checked once for every demand, as an index of demand_class
+        demand_class.from_arrays('', index, np.zeros(len(index)), **attributes)
+
+        self.index = index
+        self.energy = energy
+        self.names = names
+        self.metadata = metadata
+        self.demand_class = demand_class
+        self.attributes = attributes
+        self._positions = {name: position for position, name in enumerate(names)}
+
+    @classmethod
+    def from_demands(cls, demands: Sequence[TemporalHeatDemand], metadata: Optional[pd.DataFrame] = None) -> 'HeatDemandSet':
+        """
+        Gather demands of the same class on the same index in a set.
+
+        Parameters:
+            demands (Sequence[TemporalHeatDemand]): Demands, with unique names.
+            metadata (pd.DataFrame, optional): One row per demand indexed by demand names. Defaults to no metadata.
+
+        Raises:
+            ValueError: If demands is empty.
+            ValueError: If demands are not all of the same class or not on the same index.
+
+        Returns:
+            HeatDemandSet: Set of the demands.
+        """
+        if not demands:
+            raise ValueError("demands should contain at least one demand")
+        first = demands[0]
+        if not all(demand._same_index(first) for demand in demands[1:]):
+            raise ValueError("demands should be on the same index")
+
+        energy = np.empty((len(first), len(demands)), dtype=np.result_type(*(demand.energy for demand in demands)), order='F')
+        for position, demand in enumerate(demands):
+            energy[:, position] = demand.energy
+        attributes = {attribute: getattr(first, attribute) for attribute in first._attributes}
+        return cls(first.index, energy, [demand.name for demand in demands], metadata, type(first), **attributes)
+
+    def __len__(self) -> int:
+        """Number of demands."""
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._positions
+
+    def _derive(self, index: pd.DatetimeIndex, energy: np.ndarray, names: Sequence[str],
+                metadata: Optional[pd.DataFrame]) -> 'HeatDemandSet':
+        """Build a set from parts of this one, without checks."""
+        demand_set = type(self).__new__(type(self))
+        demand_set.index = index
+        demand_set.energy = energy
+        demand_set.names = list(names)
+        demand_set.metadata = metadata
+        demand_set.demand_class = self.demand_class
+        demand_set.attributes = self.attributes
+        demand_set._positions = {name: position for position, name in enumerate(demand_set.names)}
+        return demand_set
+
+    def demand(self, name: str) -> TemporalHeatDemand:
+        """
+        Get one demand of the set (its energy is a view of the set).
+
+        Parameters:
+            name (str): Name of the demand.
+
+        Raises:
+            KeyError: If there is no demand named name.
+
+        Returns:
+            TemporalHeatDemand: Demand of class demand_class.
+        """
+        return self.demand_class.from_arrays(name, self.index, self.energy[:, self._positions[name]], **self.attributes)
+
+    def __iter__(self) -> Iterator[TemporalHeatDemand]:
+        return (self.demand(name) for name in self.names)
+
+    def select(self, names: Sequence[str]) -> 'HeatDemandSet':
+        """
+        Get the set of some demands.
+
+        Parameters:
+            names (Sequence[str]): Names of the selected demands.
+
+        Raises:
+            KeyError: If a name is not in the set.
+
+        Returns:
+            HeatDemandSet: Set of the selected demands.
+        """
+        positions = [self._positions[name] for name in names]
+        metadata = self.metadata.loc[list(names)] if self.metadata is not None else None
+        return self._derive(self.index, self.energy[:, positions], names, metadata)
+
+    def between(self, start: Optional[Union[str, pd.Timestamp]] = None,
+                end: Optional[Union[str, pd.Timestamp]] = None) -> 'HeatDemandSet':
+        """
+        Get the set restricted to a time range, as a view (nothing is copied).
+
+        Parameters:
+            start (Union[str, pd.Timestamp], optional): First datetime (included). Defaults to the start of the index.
+            end (Union[str, pd.Timestamp], optional): Last datetime (included, as in DataFrame.loc). Defaults to the end of the index.
+
+        Returns:
+            HeatDemandSet: Set on the time range.
+        """
+        rows = self.index.slice_indexer(start, end)
+        return self._derive(self.index[rows], self.energy[rows], self.names, self.metadata)
+
+    def total(self, name: str = 'total') -> TemporalHeatDemand:
+        """
+        Sum every demand of the set (accumulated in float64).
+
+        Parameters:
+            name (str, optional): Name of the total demand. Defaults to 'total'.
+
+        Returns:
+            TemporalHeatDemand: Total demand of class demand_class.
+        """
+        energy = self.energy.sum(axis=1, dtype=np.float64).astype(self.energy.dtype, copy=False)
+        return self.demand_class.from_arrays(name, self.index, energy, **self.attributes)
+
+    def group_sum(self, by: Union[str, Sequence[Hashable], pd.Series]) -> 'HeatDemandSet':
+        """
+        Sum the demands of each group (for instance each sector or substation) with one matrix product.
+
+        Parameters:
+            by (Union[str, Sequence[Hashable], pd.Series]): Column of metadata, or group of each demand (in the order of names,
+                or as a Series indexed by names).
+
+        Raises:
+            ValueError: If by is a column name and the set has no such metadata column.
+            ValueError: If there is not one group per demand.
+            ValueError: If the group of a demand is missing (NaN, None or a name absent from a Series).
+
+        Returns:
+            HeatDemandSet: One demand per group, named after the groups (sorted).
+        """
+        if isinstance(by, str):
+            if self.metadata is None or by not in self.metadata.columns:
+                raise ValueError(f"metadata has no column {by}")
+            by = self.metadata[by]
+        if isinstance(by, pd.Series):
+            by = by.reindex(self.names)
+        if len(by) != len(self):
+            raise ValueError(f"by should give one group per demand ({len(self)}), got {len(by)}")
+
+        codes, groups = pd.factorize(np.asarray(by), sort=True)
+        if (codes < 0).any():
+            missing = [name for name, code in zip(self.names, codes) if code < 0]
+            raise ValueError(f"demands {', '.join(map(str, missing[:5]))} have no group")
+        # Indicator matrix (demand x group): a single BLAS product sums every group
+        indicator = np.zeros((len(self), len(groups)), dtype=np.float64)
+        indicator[np.arange(len(self)), codes] = 1
+        energy = np.asfortranarray(self.energy.astype(np.float64, copy=False) @ indicator).astype(self.energy.dtype, copy=False)
+        return self._derive(self.index, energy, [str(group) for group in groups], None)
+
+    def to_frame(self, suffix: Optional[str] = None) -> pd.DataFrame:
+        """
+        View the set as a DataFrame with one column per demand (nothing is copied).
+
+        Parameters:
+            suffix (str, optional): If given, columns are named f"{name}_{suffix}". Defaults to the demand names.
+
+        Returns:
+            pd.DataFrame: Energy of the demands.
+        """
+        columns = self.names if suffix is None else [f"{name}_{suffix}" for name in self.names]
+        return pd.DataFrame(self.energy, index=self.index, columns=columns, copy=False)
+
+    def frames(self) -> Mapping:
+        """
+        Map each demand name to a DataFrame of its energy, built on access as a view of the set.
+
+        Returns:
+            Mapping: Demand name -> DataFrame with column ENERGY_FEATURE_NAME.
+        """
+        return _DemandFrames(self)
+
+class _DemandFrames(Mapping):
+    """Read-only mapping of a HeatDemandSet to per-demand DataFrames (the layout of DistrictHeatingLoad.demands)."""
+
+    def __init__(self, demand_set: HeatDemandSet) -> None:
+        self.demand_set = demand_set
+
+    def __getitem__(self, name: str) -> pd.DataFrame:
+        position = self.demand_set._positions[name]
+        return pd.DataFrame(self.demand_set.energy[:, position:position + 1], index=self.demand_set.index,
+                            columns=[ENERGY_FEATURE_NAME], copy=False)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.demand_set.names)
+
+    def __len__(self) -> int:
+        return len(self.demand_set)
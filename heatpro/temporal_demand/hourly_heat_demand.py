@@ -1,24 +1,37 @@
+from typing import Optional
+
 from matplotlib.axes import Axes
 import pandas as pd
 
 from . import TemporalHeatDemand
-from ..check import find_duplicate_hours
+from .lazy_context import LazyContext
+from ..check import find_duplicate_hours, is_validated, mark_validated
+from ..period_codes import HOUR, period_codes, duplicate_period_codes
+
+class HourlyHeatDemand(TemporalHeatDemand, level=HOUR):
+    __slots__ = ()
 
-class HourlyHeatDemand(TemporalHeatDemand):
-    def __init__(self, name: str, data: pd.DataFrame) -> None:
+    def __init__(self, name: str, data: pd.DataFrame, context: Optional[LazyContext] = None) -> None:
         """
         Initialize an instance of HourlyHeatDemand.
 
         Parameters:
             name (str): Name of the hourly heat demand.
             data (pd.DataFrame): DataFrame containing hourly heat demand data.
+            context (LazyContext, optional): Context columns expanded only when read. Defaults to no context.
 
         Raises:
             ValueError: If the data index is not in datetime format.
             ValueError: If the required energy feature is not present in the data.
             ValueError: If there are duplicate hours in the data index.
         """
-        super().__init__(name, data)
+        super().__init__(name, data, context)
 
-        if not find_duplicate_hours(data.index).empty:
-            raise ValueError(f"Hours {' ,'.join([f'{hour.Hour}:{hour.Day}-{hour.Month}-{hour.Year}' for _, hour in find_duplicate_hours(data.index).iterrows()])} have multiple occurrences.")
\ No newline at end of file
+    def _validate(self) -> None:
+        """Check that each hour appears once."""
+        if not is_validated(('duplicates', HOUR), self.index):
+            # Integer codes of the hours, the readable list is only built to report duplicates
+            if len(duplicate_period_codes(period_codes(self.index, HOUR))):
+                duplicate_hours = find_duplicate_hours(self.index)
+                raise ValueError(f"Hours {' ,'.join([f'{hour.Hour}:{hour.Day}-{hour.Month}-{hour.Year}' for _, hour in duplicate_hours.iterrows()])} have multiple occurrences.")
+            mark_validated(('duplicates', HOUR), self.index)
\ No newline at end of file
@@ -0,0 +1,126 @@
+from collections.abc import Mapping
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..period_codes import period_codes, match_period_codes, broadcast_period_values
+
+class LazyContext(Mapping):
+    def __init__(self, index: pd.DatetimeIndex,
+                 sources: Optional[dict[str, tuple[Optional[str], Optional[np.ndarray], np.ndarray]]] = None) -> None:
+        """
+        Initialize an instance of LazyContext, the context columns of a temporal heat demand.
+
+        Context columns are kept in a compact form and only expanded on the demand index when read.
+        Each source is either aligned with the index (level and codes are None) or given by one value
+        per period of a coarser level (for instance the yearly demand of each year).
+
+        Parameters:
+            index (pd.DatetimeIndex): Index of the demand the context belongs to.
+            sources (dict[str, tuple[Optional[str], Optional[np.ndarray], np.ndarray]], optional):
+                Context columns as name: (level, period codes, values). Defaults to no column.
+        """
+        self.index = index
+        self.sources = dict(sources) if sources is not None else {}
+
+    @classmethod
+    def from_aggregate(cls, index: pd.DatetimeIndex, aggregate_data: pd.DataFrame, aggregate_context: Optional['LazyContext'],
+                       level: str, prefix: str, kept_prefixes: tuple[str, ...] = ()) -> 'LazyContext':
+        """
+        Build the context of a disaggregated demand from the demand it was disaggregated from.
+
+        Columns of aggregate_data and aligned columns of aggregate_context are served at level under the name
+        f"{prefix}_{column}" (unless the column starts with one of kept_prefixes), coarser columns of
+        aggregate_context are passed on unchanged. Nothing is expanded on index.
+
+        Parameters:
+            index (pd.DatetimeIndex): Index of the disaggregated demand.
+            aggregate_data (pd.DataFrame): Data of the aggregated demand, one row per period of level.
+            aggregate_context (Optional[LazyContext]): Context of the aggregated demand.
+            level (str): Period level of the aggregated demand.
+            prefix (str): Prefix of the aggregated columns.
+            kept_prefixes (tuple[str, ...], optional): Columns starting with these prefixes keep their name. Defaults to ().
+
+        Returns:
+            LazyContext: Context of the disaggregated demand.
+        """
+        codes = period_codes(aggregate_data.index, level)
+        sources = {}
+
+        aggregate_columns = {feature: aggregate_data[feature].to_numpy() for feature in aggregate_data.columns}
+        if aggregate_context is not None:
+            for name, (source_level, source_codes, values) in aggregate_context.sources.items():
+                if source_level is None:
+                    aggregate_columns.setdefault(name, values)
+                else:
+                    sources[name] = (source_level, source_codes, values)
+
+        for feature, values in aggregate_columns.items():
+            name = feature if feature.startswith(kept_prefixes) else f"{prefix}_{feature}"
+            sources[name] = (level, codes, values)
+
+        return cls(index, sources)
+
+    def take(self, positions: np.ndarray) -> 'LazyContext':
+        """
+        Restrict the context to some rows of the demand index.
+
+        Periodic columns are shared, only aligned columns are sliced.
+
+        Parameters:
+            positions (np.ndarray): Positions (or slice) of the kept rows in the demand index.
+
+        Returns:
+            LazyContext: Context on the kept rows.
+        """
+        return LazyContext(self.index[positions],
+                           {name: (level, codes, values) if level is not None else (None, None, np.asarray(values)[positions])
+                            for name, (level, codes, values) in self.sources.items()})
+
+    def __getitem__(self, name: str) -> pd.Series:
+        """
+        Expand a context column on the demand index.
+
+        Parameters:
+            name (str): Name of the context column.
+
+        Returns:
+            pd.Series: Context column.
+        """
+        level, codes, values = self.sources[name]
+        if level is None:
+            return pd.Series(values, index=self.index, name=name)
+        positions = match_period_codes(period_codes(self.index, level), codes)
+        return pd.Series(broadcast_period_values(values, positions), index=self.index, name=name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.sources)
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+    @property
+    def columns(self) -> list[str]:
+        """Names of the context columns."""
+        return list(self.sources)
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Expand every context column on the demand index.
+
+        Returns:
+            pd.DataFrame: Context columns.
+        """
+        positions_by_level = {}
+        columns = {}
+        for name, (level, codes, values) in self.sources.items():
+            if level is None:
+                columns[name] = values
+                continue
+            # Positions are shared by columns coming from the same aggregated demand
+            key = (level, id(codes))
+            if key not in positions_by_level:
+                positions_by_level[key] = match_period_codes(period_codes(self.index, level), codes)
+            columns[name] = broadcast_period_values(values, positions_by_level[key])
+        return pd.DataFrame(columns, index=self.index)
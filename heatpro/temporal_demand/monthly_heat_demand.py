@@ -1,24 +1,37 @@
+from typing import Optional
+
 from matplotlib.axes import Axes
 import pandas as pd
 
 from . import TemporalHeatDemand
-from ..check import find_duplicate_months
+from .lazy_context import LazyContext
+from ..check import find_duplicate_months, is_validated, mark_validated
+from ..period_codes import MONTH, period_codes, duplicate_period_codes
+
+class MonthlyHeatDemand(TemporalHeatDemand, level=MONTH):
+    __slots__ = ()
 
-class MonthlyHeatDemand(TemporalHeatDemand):
-    def __init__(self, name: str, data: pd.DataFrame) -> None:
+    def __init__(self, name: str, data: pd.DataFrame, context: Optional[LazyContext] = None) -> None:
         """
         Initialize an instance of MonthlyHeatDemand.
 
         Parameters:
             name (str): Name of the monthly heat demand.
             data (pd.DataFrame): DataFrame containing monthly heat demand data.
+            context (LazyContext, optional): Context columns expanded only when read. Defaults to no context.
 
         Raises:
             ValueError: If the data index is not in datetime format.
             ValueError: If the required energy feature is not present in the data.
             ValueError: If there are duplicate months in the data index.
         """
-        super().__init__(name, data)
+        super().__init__(name, data, context)
 
-        if not find_duplicate_months(data.index).empty:
-            raise ValueError(f"Months {' ,'.join([f'{month.Month}-{month.Year}' for _, month in find_duplicate_months(data.index).iterrows()])} have multiple occurrences.")
+    def _validate(self) -> None:
+        """Check that each month appears once."""
+        if not is_validated(('duplicates', MONTH), self.index):
+            # Integer codes of the months, the readable list is only built to report duplicates
+            if len(duplicate_period_codes(period_codes(self.index, MONTH))):
+                duplicate_months = find_duplicate_months(self.index)
+                raise ValueError(f"Months {' ,'.join([f'{month.Month}-{month.Year}' for _, month in duplicate_months.iterrows()])} have multiple occurrences.")
+            mark_validated(('duplicates', MONTH), self.index)
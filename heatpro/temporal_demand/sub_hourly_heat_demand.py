@@ -0,0 +1,49 @@
+from typing import Optional
+
+from matplotlib.axes import Axes
+import pandas as pd
+
+from . import TemporalHeatDemand
+from .lazy_context import LazyContext
+from ..check import find_duplicate_sub_hours, is_validated, mark_validated
+from ..period_codes import time_step, period_codes, duplicate_period_codes
+
+class SubHourlyHeatDemand(TemporalHeatDemand):
+    __slots__ = ('freq',)
+    _attributes = ('freq',)
+
+    def __init__(self, name: str, data: pd.DataFrame, context: Optional[LazyContext] = None,
+                 freq: Optional[str] = None) -> None:
+        """
+        Initialize an instance of SubHourlyHeatDemand (for instance 15-minute or 5-minute heat demand).
+
+        Parameters:
+            name (str): Name of the sub-hourly heat demand.
+            data (pd.DataFrame): DataFrame containing sub-hourly heat demand data.
+            context (LazyContext, optional): Context columns expanded only when read. Defaults to no context.
+            freq (str, optional): Time step of the data, a fixed frequency dividing an hour such as '15min'.
+                Defaults to the time step of the data index.
+
+        Raises:
+            ValueError: If the data index is not in datetime format.
+            ValueError: If the required energy feature is not present in the data.
+            ValueError: If freq is not a fixed frequency shorter than an hour and dividing it.
+            ValueError: If there are duplicate time steps in the data index.
+        """
+        self.freq = freq
+        super().__init__(name, data, context)
+
+    def _validate(self) -> None:
+        """Check the time step and that each time step appears once."""
+        freq = getattr(self, 'freq', None)
+        step = pd.Timedelta(freq) if freq is not None else time_step(self.index)
+        if not (pd.Timedelta(0) < step < pd.Timedelta(hours=1)) or pd.Timedelta(hours=1) % step:
+            raise ValueError(f"freq should be shorter than an hour and divide it, got {step}")
+        self.freq = step
+
+        if not is_validated(('duplicates', self.freq), self.index):
+            # Integer codes of the time steps, the readable list is only built to report duplicates
+            if len(duplicate_period_codes(period_codes(self.index, self.freq))):
+                duplicate_steps = find_duplicate_sub_hours(self.index, self.freq)
+                raise ValueError(f"Time steps {' ,'.join([f'{step.Hour}:{step.Minute:02d}:{step.Day}-{step.Month}-{step.Year}' for _, step in duplicate_steps.iterrows()])} have multiple occurrences.")
+            mark_validated(('duplicates', self.freq), self.index)
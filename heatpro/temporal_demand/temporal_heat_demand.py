@@ -1,44 +1,457 @@
+from typing import Optional, Union
+
 from matplotlib.axes import Axes
+import numpy as np
 import pandas as pd
 
-from ..check import check_datetime_index, check_energy_feature, ENERGY_FEATURE_NAME
+from ..check import check_datetime_index, check_energy_feature, is_validated, mark_validated, ENERGY_FEATURE_NAME
+from ..decimation import DEFAULT_MAX_POINTS, decimate, min_max_positions
+from ..period_codes import YEAR, MONTH, DAY, HOUR, period_codes, period_groups, group_period_codes, sum_by_period, period_starts
+from .lazy_context import LazyContext
+
+# Demand class of each period level from the finest to the coarsest, filled by subclasses
+_LEVEL_CLASSES: dict[str, type] = dict.fromkeys((HOUR, DAY, MONTH, YEAR))
+
+def _energy_array(energy: np.ndarray) -> np.ndarray:
+    """Store energy as a contiguous float64 (or float32) array."""
+    energy = np.ascontiguousarray(energy)
+    if energy.dtype not in (np.float32, np.float64):
+        energy = energy.astype(np.float64)
+    return energy
 
 class TemporalHeatDemand:
-    def __init__(self, name: str, data: pd.DataFrame) -> None:
+    # Core arrays of the demand, the DataFrame is only a cached view
+    __slots__ = ('name', '_time', '_tz', '_energy', '_columns', '_index', '_data', '_context', '__weakref__')
+
+    # Attributes of subclasses copied to demands derived from this one
+    _attributes: tuple[str, ...] = ()
+
+    # Period level of each row (None when the demand is not tied to a level)
+    level: Optional[str] = None
+
+    def __init_subclass__(cls, level: Optional[str] = None, **kwargs) -> None:
+        """Register the demand class of a period level (class HourlyHeatDemand(TemporalHeatDemand, level=HOUR))."""
+        super().__init_subclass__(**kwargs)
+        if level is not None:
+            cls.level = level
+            _LEVEL_CLASSES[level] = cls
+
+    def __init__(self, name: str, data: pd.DataFrame, context: Optional[LazyContext] = None) -> None:
         """
         Initialize an instance of TemporalHeatDemand.
 
+        The demand is stored as int64 datetimes and a contiguous energy array, data is kept
+        as the cached DataFrame view of these arrays.
+
         Parameters:
             name (str): Name of the heat demand.
             data (pd.DataFrame): DataFrame containing temporal heat demand data.
+            context (LazyContext, optional): Context columns (for instance data of the demand it was
+                disaggregated from), expanded only when read. Defaults to no context.
 
         Raises:
             ValueError: If the data index is not in datetime format.
             ValueError: If the required energy feature is not present in the data.
         """
-        if not check_datetime_index(data):
-            raise ValueError("data index should be in datetime format")
-        if not check_energy_feature(data):
-            raise ValueError(f"data has no {ENERGY_FEATURE_NAME} (required)")
+        if not is_validated('temporal_heat_demand', data):
+            if not check_datetime_index(data):
+                raise ValueError("data index should be in datetime format")
+            if not check_energy_feature(data):
+                raise ValueError(f"data has no {ENERGY_FEATURE_NAME} (required)")
+            mark_validated('temporal_heat_demand', data)
 
-        self.name = name
+        self._set_core(name, data.index, data[ENERGY_FEATURE_NAME].to_numpy(), None, context)
         self._data = data
+        self._validate()
+
+    @classmethod
+    def from_arrays(cls, name: str, time: Union[pd.DatetimeIndex, np.ndarray], energy: np.ndarray,
+                    context: Optional[LazyContext] = None, columns: Optional[dict[str, np.ndarray]] = None,
+                    **attributes) -> 'TemporalHeatDemand':
+        """
+        Build a demand directly from arrays, without building a DataFrame.
+
+        Parameters:
+            name (str): Name of the heat demand.
+            time (Union[pd.DatetimeIndex, np.ndarray]): Datetimes, as an index or as int64 nanoseconds since epoch.
+            energy (np.ndarray): Energy of each datetime.
+            context (LazyContext, optional): Context columns. Defaults to no context.
+            columns (dict[str, np.ndarray], optional): Other data columns. Defaults to no column.
+            **attributes: Attributes of the subclass (for instance freq of SubHourlyHeatDemand).
+
+        Raises:
+            ValueError: If time and energy lengths differ.
+            ValueError: If the periods of the subclass are not valid (for instance duplicate hours).
+
+        Returns:
+            TemporalHeatDemand: Demand of the class from which the method is called.
+        """
+        if len(time) != len(energy):
+            raise ValueError("time and energy should have the same length")
+
+        demand = cls.__new__(cls)
+        for attribute, value in attributes.items():
+            setattr(demand, attribute, value)
+        demand._set_core(name, time, energy, columns, context)
+        demand._data = None
+        demand._validate()
+        return demand
+
+    def _set_core(self, name: str, time: Union[pd.DatetimeIndex, np.ndarray], energy: np.ndarray,
+                  columns: Optional[dict[str, np.ndarray]], context: Optional[LazyContext]) -> None:
+        """Store the core arrays (the index is kept when given, to be reused by data and context)."""
+        if isinstance(time, pd.DatetimeIndex):
+            self._index = time
+            self._tz = time.tz
+            self._time = time.asi8
+        else:
+            self._index = None
+            self._tz = None
+            self._time = np.asarray(time).astype('datetime64[ns]').view(np.int64)
+
+        self.name = name
+        self._energy = _energy_array(energy)
+        self._columns = columns
+        self._context = context if context is not None else LazyContext(self.index)
+
+    def _validate(self) -> None:
+        """Check the periods of the demand, overridden by subclasses."""
+
+    def _derive(self, positions: Union[slice, np.ndarray], validate: bool) -> 'TemporalHeatDemand':
+        """Build a demand of the same class from some rows of this one, sharing what can be shared."""
+        demand = type(self).__new__(type(self))
+        for attribute in self._attributes:
+            setattr(demand, attribute, getattr(self, attribute))
+        demand._set_core(self.name, self.index[positions], self.energy[positions],
+                         {name: values[positions] for name, values in self.columns.items()},
+                         self._context.take(positions))
+        demand._data = None
+        if validate:
+            demand._validate()
+        return demand
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        """
+        Get the datetimes of the demand (built once from the int64 values).
+
+        Returns:
+            pd.DatetimeIndex: Index of the demand.
+        """
+        if self._index is None:
+            index = pd.DatetimeIndex(self._time.view('datetime64[ns]'))
+            self._index = index.tz_localize('UTC').tz_convert(self._tz) if self._tz is not None else index
+        return self._index
+
+    @property
+    def time(self) -> np.ndarray:
+        """
+        Get the datetimes of the demand as int64 nanoseconds since epoch (UTC for timezone aware demands).
+
+        Returns:
+            np.ndarray: int64 datetimes.
+        """
+        return self._time
+
+    @property
+    def energy(self) -> np.ndarray:
+        """
+        Get the energy of each datetime.
+
+        Once data is built it is the source of the energy, so that modifications of data by the caller
+        are used by roll-ups, arithmetic and disaggregations.
+
+        Returns:
+            np.ndarray: Contiguous float64 (or float32) array of ENERGY_FEATURE_NAME.
+        """
+        if self._data is not None:
+            self._energy = _energy_array(self._data[ENERGY_FEATURE_NAME].to_numpy())
+        return self._energy
+
+    @property
+    def columns(self) -> dict[str, np.ndarray]:
+        """
+        Get the data columns other than ENERGY_FEATURE_NAME (read from data once it is built, as energy).
+
+        Returns:
+            dict[str, np.ndarray]: Column name to values.
+        """
+        if self._data is not None:
+            self._columns = {feature: self._data[feature].to_numpy() for feature in self._data.columns if feature != ENERGY_FEATURE_NAME}
+        elif self._columns is None:
+            self._columns = {}
+        return self._columns
 
     @property
     def data(self) -> pd.DataFrame:
         """
-        Get the temporal heat demand data.
+        Get the temporal heat demand data (built on first access when the demand was built from arrays).
 
         Returns:
             pd.DataFrame: DataFrame containing temporal heat demand data.
         """
+        if self._data is None:
+            self._data = pd.DataFrame({ENERGY_FEATURE_NAME: self._energy, **self.columns}, index=self.index, copy=False)
         return self._data
 
-    def plot(self) -> Axes:
+    @property
+    def context(self) -> LazyContext:
+        """
+        Get the context columns of the temporal heat demand, expanded only when read.
+
+        Returns:
+            LazyContext: Mapping from context column name to its values on the demand index.
+        """
+        return self._context
+
+    def __len__(self) -> int:
+        return len(self._energy)
+
+    def __getitem__(self, positions: Union[slice, np.ndarray]) -> 'TemporalHeatDemand':
+        """
+        Select rows of the demand, arrays and context are sliced without building a DataFrame.
+
+        Parameters:
+            positions (Union[slice, np.ndarray]): Slice, boolean mask or integer positions of the rows.
+
+        Raises:
+            ValueError: If positions select the same period several times.
+
+        Returns:
+            TemporalHeatDemand: Demand of the same class on the selected rows.
+        """
+        positions = positions if isinstance(positions, slice) else np.asarray(positions)
+        # Slices, masks and increasing positions select each row at most once: periods stay unique
+        validate = not isinstance(positions, slice) and positions.dtype != bool and not (np.diff(positions) > 0).all()
+        return self._derive(positions, validate)
+
+    def roll_up(self, levels: Union[str, list[str]]) -> Union['TemporalHeatDemand', list['TemporalHeatDemand']]:
+        """
+        Sum the demand over coarser periods.
+
+        The demand is summed once over the finest requested level with np.add.reduceat on the period
+        boundaries of its index (cached, so rolling up many demands sharing an index is nearly free),
+        coarser levels are then summed from this first result.
+
+        Parameters:
+            levels (Union[str, list[str]]): One level or several levels among HOUR, DAY, MONTH, YEAR,
+                coarser than the level of the demand.
+
+        Raises:
+            ValueError: If a level is not one of HOUR, DAY, MONTH, YEAR or is not coarser than the demand level.
+
+        Returns:
+            Union[TemporalHeatDemand, list[TemporalHeatDemand]]: Demand summed over each level, a list in the order
+            of levels if several levels are given.
+        """
+        requested_levels = [levels] if isinstance(levels, str) else list(levels)
+        ordered_levels = list(_LEVEL_CLASSES)
+        for level in requested_levels:
+            if level not in _LEVEL_CLASSES:
+                raise ValueError(f"level should be one of {', '.join(ordered_levels)}, got {level}")
+            if self.level is not None and ordered_levels.index(level) <= ordered_levels.index(self.level):
+                raise ValueError(f"{level} is not coarser than {self.level}")
+
+        index = self.index
+        rolled_up = {}
+        energy, starts = None, None
+        # From the finest to the coarsest level, each level is summed from the previous one
+        for level in [level for level in ordered_levels if level in requested_levels]:
+            groups = period_groups(index, level) if energy is None else group_period_codes(period_codes(starts, level))
+            energy = sum_by_period(self.energy if energy is None else energy, groups)
+
+            starts = period_starts(groups[2], level)
+            rolled_up[level] = _LEVEL_CLASSES[level].from_arrays(self.name, starts.tz_localize(index.tz) if index.tz is not None else starts,
+                                                               energy)
+
+        return rolled_up[levels] if isinstance(levels, str) else [rolled_up[level] for level in requested_levels]
+
+    def to_hourly(self) -> 'TemporalHeatDemand':
+        """Sum the demand over each hour (see roll_up)."""
+        return self.roll_up(HOUR)
+
+    def to_daily(self) -> 'TemporalHeatDemand':
+        """Sum the demand over each day (see roll_up)."""
+        return self.roll_up(DAY)
+
+    def to_monthly(self) -> 'TemporalHeatDemand':
+        """Sum the demand over each month (see roll_up)."""
+        return self.roll_up(MONTH)
+
+    def to_yearly(self) -> 'TemporalHeatDemand':
+        """Sum the demand over each year (see roll_up)."""
+        return self.roll_up(YEAR)
+
+    def _with_energy(self, energy: np.ndarray, name: Optional[str] = None) -> 'TemporalHeatDemand':
+        """Build a demand of the same class on the same index, without checks (the index is already valid)."""
+        demand = type(self).__new__(type(self))
+        for attribute in self._attributes:
+            setattr(demand, attribute, getattr(self, attribute))
+        demand._set_core(self.name if name is None else name, self.index, energy, {}, None)
+        demand._data = None
+        return demand
+
+    def _same_index(self, other: 'TemporalHeatDemand') -> bool:
+        """Tell if other is a demand of the same class on the same datetimes."""
+        if type(other) is not type(self):
+            raise ValueError(f"{type(self).__name__} can only be combined with another {type(self).__name__}, got {type(other).__name__}")
+        return self._time is other._time or (self._tz == other._tz and np.array_equal(self._time, other._time))
+
+    def _combine(self, other: 'TemporalHeatDemand', sign: float, align: bool) -> 'TemporalHeatDemand':
+        """Add sign * other, on the same index or on the union of both indexes if align."""
+        if self._same_index(other):
+            return self._with_energy(self.energy + sign * other.energy if sign != 1 else self.energy + other.energy)
+        if not align:
+            raise ValueError("demands are not on the same index, use add or subtract with align=True to realign them")
+        if self._tz != other._tz:
+            raise ValueError("demands with different timezones cannot be aligned")
+
+        # Union of the datetimes, missing values count as 0
+        time = np.union1d(self._time, other._time)
+        energy = np.zeros(len(time), dtype=np.result_type(self.energy, other.energy))
+        energy[np.searchsorted(time, self._time)] += self.energy
+        energy[np.searchsorted(time, other._time)] += sign * other.energy
+
+        index = pd.DatetimeIndex(time.view('datetime64[ns]'))
+        index = index.tz_localize('UTC').tz_convert(self._tz) if self._tz is not None else index
+        return type(self).from_arrays(self.name, index, energy, **{attribute: getattr(self, attribute) for attribute in self._attributes})
+
+    def add(self, other: 'TemporalHeatDemand', align: bool = False) -> 'TemporalHeatDemand':
+        """
+        Add another demand of the same class.
+
+        Parameters:
+            other (TemporalHeatDemand): Demand to add.
+            align (bool, optional): If True, demands on different indexes are added on the union of both indexes
+                (missing values count as 0). Defaults to False.
+
+        Raises:
+            ValueError: If other is not of the same class.
+            ValueError: If indexes differ and align is False.
+
+        Returns:
+            TemporalHeatDemand: Sum of both demands, named after this demand.
+        """
+        return self._combine(other, 1, align)
+
+    def subtract(self, other: 'TemporalHeatDemand', align: bool = False) -> 'TemporalHeatDemand':
+        """
+        Subtract another demand of the same class.
+
+        Parameters:
+            other (TemporalHeatDemand): Demand to subtract.
+            align (bool, optional): If True, demands on different indexes are subtracted on the union of both indexes
+                (missing values count as 0). Defaults to False.
+
+        Raises:
+            ValueError: If other is not of the same class.
+            ValueError: If indexes differ and align is False.
+
+        Returns:
+            TemporalHeatDemand: Difference of both demands, named after this demand.
+        """
+        return self._combine(other, -1, align)
+
+    def __add__(self, other: 'TemporalHeatDemand') -> 'TemporalHeatDemand':
+        return self.add(other)
+
+    def __radd__(self, other: Union[int, 'TemporalHeatDemand']) -> 'TemporalHeatDemand':
+        # 0 + demand, to support the builtin sum
+        if isinstance(other, (int, float)) and other == 0:
+            return self._with_energy(self.energy.copy())
+        return NotImplemented
+
+    def __sub__(self, other: 'TemporalHeatDemand') -> 'TemporalHeatDemand':
+        return self.subtract(other)
+
+    def __mul__(self, other: Union[float, np.ndarray, 'TemporalHeatDemand']) -> 'TemporalHeatDemand':
+        """
+        Multiply the demand by a scalar, an array with one factor per row or another demand on the same index.
+
+        Parameters:
+            other (Union[float, np.ndarray, TemporalHeatDemand]): Factor.
+
+        Raises:
+            ValueError: If other is a demand of another class or on another index.
+
+        Returns:
+            TemporalHeatDemand: Scaled demand.
+        """
+        if isinstance(other, TemporalHeatDemand):
+            if not self._same_index(other):
+                raise ValueError("demands are not on the same index")
+            other = other.energy
+        elif not np.isscalar(other) and np.shape(other) != self.energy.shape:
+            raise ValueError(f"factor should be a scalar or have one value per row ({len(self)}), got shape {np.shape(other)}")
+        return self._with_energy(self.energy * other)
+
+    __rmul__ = __mul__
+
+    @classmethod
+    def sum(cls, demands: list['TemporalHeatDemand'], name: Optional[str] = None, align: bool = False) -> 'TemporalHeatDemand':
+        """
+        Sum demands of the same class, accumulated in a single array.
+
+        Parameters:
+            demands (list[TemporalHeatDemand]): Demands to sum.
+            name (str, optional): Name of the sum. Defaults to the name of the first demand.
+            align (bool, optional): If True, demands on different indexes are summed on the union of their indexes.
+                Defaults to False.
+
+        Raises:
+            ValueError: If demands is empty.
+            ValueError: If demands are not all of the same class.
+            ValueError: If indexes differ and align is False.
+
+        Returns:
+            TemporalHeatDemand: Sum of the demands.
+        """
+        if not demands:
+            raise ValueError("demands should contain at least one demand")
+
+        first = demands[0]
+        dtype = np.result_type(*(demand.energy for demand in demands))
+        # float32 demands are accumulated in float64, the total is cast back at the end
+        total = first._with_energy(first.energy.astype(np.float64), name)
+        for demand in demands[1:]:
+            if total._same_index(demand):
+                # One in-place vector operation per demand
+                total._energy += demand.energy
+            else:
+                total = total._combine(demand, 1, align)
+        if dtype != np.float64:
+            total = total._with_energy(total._energy.astype(dtype))
+        return total
+
+    def with_context(self) -> pd.DataFrame:
+        """
+        Get the temporal heat demand data with every context column expanded.
+
+        Returns:
+            pd.DataFrame: DataFrame containing data and context columns.
+        """
+        return pd.concat([self._context.to_frame(), self.data], axis=1)
+
+    def plot(self, columns: Optional[list[str]] = None, max_points: Optional[int] = DEFAULT_MAX_POINTS, **kwargs) -> Axes:
         """
         Plot the temporal heat demand data.
 
+        Long demands are decimated before drawing: the minimum and maximum of buckets of consecutive
+        rows are kept so that peaks stay visible (see heatpro.decimation.min_max_positions).
+
+        Parameters:
+            columns (list[str], optional): Columns of data or context to plot. Defaults to ENERGY_FEATURE_NAME.
+            max_points (int, optional): Number of points drawn per column, None draws every row. Defaults to DEFAULT_MAX_POINTS.
+            **kwargs: Keyword arguments of DataFrame.plot (for instance ax).
+
         Returns:
             Axes: The matplotlib Axes object for the plot.
         """
-        return self._data.plot()
+        if columns is None:
+            # Rows are selected on the energy array, only the drawn rows are put in a DataFrame
+            positions = np.arange(len(self)) if max_points is None else min_max_positions(self.energy, max_points)
+            data = pd.DataFrame({ENERGY_FEATURE_NAME: self.energy[positions]}, index=self.index[positions])
+        else:
+            data = self.data if set(columns).issubset(self.data.columns) else self.with_context()
+            data = decimate(data[columns], max_points)
+        return data.plot(**kwargs)
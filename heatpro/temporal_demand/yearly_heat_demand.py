@@ -1,24 +1,37 @@
+from typing import Optional
+
 from matplotlib.axes import Axes
 import pandas as pd
 
 from . import TemporalHeatDemand
-from ..check import find_duplicate_years
+from .lazy_context import LazyContext
+from ..check import find_duplicate_years, is_validated, mark_validated
+from ..period_codes import YEAR, period_codes, duplicate_period_codes
+
+class YearlyHeatDemand(TemporalHeatDemand, level=YEAR):
+    __slots__ = ()
 
-class YearlyHeatDemand(TemporalHeatDemand):
-    def __init__(self, name: str, data: pd.DataFrame) -> None:
+    def __init__(self, name: str, data: pd.DataFrame, context: Optional[LazyContext] = None) -> None:
         """
         Initialize an instance of YearlyHeatDemand.
 
         Parameters:
             name (str): Name of the yearly heat demand.
             data (pd.DataFrame): DataFrame containing yearly heat demand data.
+            context (LazyContext, optional): Context columns expanded only when read. Defaults to no context.
 
         Raises:
             ValueError: If the data index is not in datetime format.
             ValueError: If the required energy feature is not present in the data.
             ValueError: If there are duplicate years in the data index.
         """
-        super().__init__(name, data)
+        super().__init__(name, data, context)
 
-        if find_duplicate_years(data.index):
-            raise ValueError(f"Years {' ,'.join([str(year) for year in find_duplicate_years(data.index)])} have multiple occurrences.")
+    def _validate(self) -> None:
+        """Check that each year appears once."""
+        if not is_validated(('duplicates', YEAR), self.index):
+            # Integer codes of the years, the readable list is only built to report duplicates
+            if len(duplicate_period_codes(period_codes(self.index, YEAR))):
+                duplicate_years = find_duplicate_years(self.index)
+                raise ValueError(f"Years {' ,'.join([str(year) for year in duplicate_years])} have multiple occurrences.")
+            mark_validated(('duplicates', YEAR), self.index)
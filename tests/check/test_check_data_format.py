@@ -66,3 +66,18 @@ def test_find_xor_hour(sample_dataframe):
     df_right = sample_dataframe.iloc[2:]
     xor_hour = find_xor_hour(df_left, df_right)
     assert not xor_hour.empty
+
+# Test duplicate detection on unsorted index with repeated periods
+def test_find_duplicates_unsorted():
+    datetime_index = pd.DatetimeIndex(['2022-03-01 10:00', '2021-01-01 00:00', '2022-03-01 10:30', '2021-01-01 05:00'])
+    assert find_duplicate_years(datetime_index) == [2021, 2022]
+    assert find_duplicate_months(datetime_index).values.tolist() == [[2021, 1], [2022, 3]]
+    assert find_duplicate_days(datetime_index).values.tolist() == [[2021, 1, 1], [2022, 3, 1]]
+    assert find_duplicate_hours(datetime_index).values.tolist() == [[2022, 3, 1, 10]]
+
+# Test find_xor_hour compares hours, not only dates
+def test_find_xor_hour_compact():
+    hourly_dataframe = pd.DataFrame(index=pd.date_range('2022-01-01', periods=48, freq='h'))
+    xor_hour = find_xor_hour(hourly_dataframe, hourly_dataframe.iloc[1:-1])
+    assert xor_hour[['Hour', '_merge']].values.tolist() == [[0, 'left_only'], [23, 'left_only']]
+    assert find_xor_hour(hourly_dataframe, hourly_dataframe.iloc[::-1]).empty
@@ -1,6 +1,8 @@
+import numpy as np
 import pandas as pd
 import pytest
-from heatpro.check import WEIGHT_NAME_REQUIRED, check_weight_format
+from heatpro.check import WEIGHT_NAME_REQUIRED, check_weight_format, check_weight_normalisation
+from heatpro.period_codes import DAY
 
 # Fixture for a sample DataFrame with datetime index
 @pytest.fixture
@@ -23,3 +25,26 @@ def test_check_weight_format(sample_weights):
     invalid_weights_no_column = sample_weights.drop(columns=[WEIGHT_NAME_REQUIRED])
     with pytest.raises(ValueError, match=f"Months weights must be contained in a column named {WEIGHT_NAME_REQUIRED} of weights"):
         check_weight_format(invalid_weights_no_column)
+
+# Test check_weight_normalisation
+def test_check_weight_normalisation():
+    index = pd.date_range('2022-01-01', periods=48, freq='h')
+    weights = pd.DataFrame({WEIGHT_NAME_REQUIRED: np.full(48, 1 / 24)}, index=index)
+    check_weight_normalisation(weights, DAY)  # Should not raise any exception
+
+    # Second day not normalised
+    weights.iloc[24:] *= 2
+    with pytest.raises(ValueError, match="weights do not sum to 1 on 1 days"):
+        check_weight_normalisation(weights, DAY)
+
+    # Renormalised in place
+    check_weight_normalisation(weights, DAY, renormalise=True)
+    assert np.allclose(weights[WEIGHT_NAME_REQUIRED], 1 / 24)
+
+    # NaN and negative weights
+    weights.iloc[3] = np.nan
+    with pytest.raises(ValueError, match="weights contain NaN"):
+        check_weight_normalisation(weights, DAY)
+    weights.iloc[3] = -1
+    with pytest.raises(ValueError, match="weights contain negative values"):
+        check_weight_normalisation(weights, DAY, renormalise=True)
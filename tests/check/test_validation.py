@@ -0,0 +1,46 @@
+import pandas as pd
+import pytest
+from heatpro.check import (ENERGY_FEATURE_NAME, STRICT, ONCE, OFF, get_validation_policy, set_validation_policy,
+                           validation_policy, is_validated, mark_validated)
+from heatpro.temporal_demand import HourlyHeatDemand
+
+# Fixture for hourly data with a duplicated hour
+@pytest.fixture
+def duplicated_hour_data():
+    index = pd.date_range('2022-01-01', periods=5, freq='h')
+    return pd.DataFrame({ENERGY_FEATURE_NAME: range(6)}, index=index.append(index[:1]))
+
+# Test the validation policy switch
+def test_validation_policy():
+    assert get_validation_policy() == STRICT
+
+    with validation_policy(OFF):
+        assert get_validation_policy() == OFF
+    assert get_validation_policy() == STRICT
+
+    with pytest.raises(ValueError, match="policy should be one of"):
+        set_validation_policy('sometimes')
+
+# Test checks skipped or memoised depending on the policy
+def test_validation_policy_checks(duplicated_hour_data):
+    with pytest.raises(ValueError, match="have multiple occurrences"):
+        HourlyHeatDemand('SampleDemand', duplicated_hour_data)
+
+    # Trusted inputs are not checked
+    with validation_policy(OFF):
+        HourlyHeatDemand('SampleDemand', duplicated_hour_data)
+
+    # Checks passed once are not run again on the same objects
+    index = pd.date_range('2022-01-01', periods=5, freq='h')
+    with validation_policy(ONCE):
+        assert not is_validated('check', index)
+        mark_validated('check', index)
+        assert is_validated('check', index)
+        assert not is_validated('check', index.copy())
+
+        # A failing check is not recorded
+        for _ in range(2):
+            with pytest.raises(ValueError, match="have multiple occurrences"):
+                HourlyHeatDemand('SampleDemand', duplicated_hour_data)
+
+    assert not is_validated('check', index)
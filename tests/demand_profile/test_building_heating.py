@@ -3,7 +3,7 @@ import numpy as np
 import pytest
 
 from heatpro.check.check_weight_format import WEIGHT_NAME_REQUIRED
-from heatpro.demand_profile.building_heating_profile import basic_building_heating_profile
+from heatpro.demand_profile.building_heating_profile import basic_building_heating_profile, felt_temperature, FeltTemperatureFilter
 
 # Fixture for a sample felt_temperature DataFrame
 @pytest.fixture
@@ -33,3 +33,34 @@ def test_basic_building_heating_profile(sample_felt_temperature, sample_hourly_w
         basic_building_heating_profile(invalid_felt_temperature, 15, sample_hourly_weight)
 
     # Additional tests for edge cases or specific scenarios.
+
+# Test that the felt temperature of each time constant is the exponentially weighted mean of pandas
+def test_felt_temperature():
+    index = pd.date_range('2022-01-01', periods=1000, freq='h')
+    external_temperature = pd.Series(np.random.normal(10, 8, len(index)), index=index)
+    external_temperature.iloc[[0, 5, 6, 7]] = np.nan
+    external_temperature.iloc[300:700] = np.nan
+    time_constants = [0, 0.5, 3, 24, 200]
+
+    felt = felt_temperature(external_temperature, time_constants, ['a', 'b', 'c', 'd', 'e'])
+    assert list(felt.columns) == ['a', 'b', 'c', 'd', 'e']
+    for name, time_constant in zip(felt.columns, time_constants):
+        pd.testing.assert_series_equal(felt[name], external_temperature.ewm(time_constant).mean(), check_names=False)
+
+# Test that filtering chunks one after the other gives the felt temperature of the whole series
+def test_felt_temperature_filter_chunks():
+    external_temperature = np.random.normal(10, 8, 500)
+    external_temperature[100:150] = np.nan
+    whole = FeltTemperatureFilter([2, 48]).filter(external_temperature)
+
+    felt_temperature_filter = FeltTemperatureFilter([2, 48])
+    chunks = [felt_temperature_filter.filter(external_temperature[start:stop]) for start, stop in [(0, 1), (1, 120), (120, 121), (121, 500)]]
+    np.testing.assert_allclose(np.concatenate(chunks), whole)
+
+    felt_temperature_filter.reset()
+    np.testing.assert_allclose(felt_temperature_filter.filter(external_temperature), whole)
+
+    with pytest.raises(ValueError, match="time_constants should be non-negative"):
+        FeltTemperatureFilter([-1, 2])
+    with pytest.raises(ValueError, match="names should give one name per time constant"):
+        FeltTemperatureFilter([1, 2], ['a'])
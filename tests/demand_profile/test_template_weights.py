@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from heatpro.check import ENERGY_FEATURE_NAME, WEIGHT_NAME_REQUIRED
+from heatpro.demand_profile import (TemplateWeights, apply_hourly_pattern, apply_weekly_hourly_pattern,
+                                    day_length_proportionnal_weight)
+from heatpro.disaggregation import weekly_weighted_disaggregate
+from heatpro.temporal_demand import MonthlyHeatDemand
+
+# Fixture for a one year hourly index
+@pytest.fixture
+def hourly_index():
+    return pd.date_range('2021', '2022', freq='h', inclusive='left')
+
+@pytest.fixture
+def weekly_mapping():
+    return {(day, hour): np.random.uniform(0, 1) for day in range(7) for hour in range(24)}
+
+# Test compressed patterns equal expanded ones
+def test_compressed_patterns(hourly_index, weekly_mapping):
+    weights = apply_weekly_hourly_pattern(hourly_index, weekly_mapping, compressed=True)
+    assert isinstance(weights, TemplateWeights)
+    assert weights.template.shape == (7, 24)
+    assert weights.to_frame().equals(apply_weekly_hourly_pattern(hourly_index, weekly_mapping))
+
+    hourly_mapping = {hour: 1 / 24 for hour in range(24)}
+    weights = apply_hourly_pattern(hourly_index, hourly_mapping, compressed=True)
+    assert weights.template.shape == (1, 24)
+    assert np.allclose(weights.to_numpy(), apply_hourly_pattern(hourly_index, hourly_mapping)[WEIGHT_NAME_REQUIRED])
+
+    # Index not made of complete days
+    with pytest.raises(ValueError, match="made of complete days"):
+        apply_hourly_pattern(hourly_index[1:], hourly_mapping, compressed=True)
+
+# Test multiplication keeps the compressed representation for day constant weights
+def test_template_weights_multiplication(hourly_index, weekly_mapping):
+    weights = apply_weekly_hourly_pattern(hourly_index, weekly_mapping, compressed=True)
+    expected = apply_weekly_hourly_pattern(hourly_index, weekly_mapping) * day_length_proportionnal_weight(hourly_index)
+
+    # Both operand orders
+    for scaled_weights in (weights * day_length_proportionnal_weight(hourly_index),
+                           day_length_proportionnal_weight(hourly_index) * weights):
+        assert isinstance(scaled_weights, TemplateWeights)
+        assert np.allclose(scaled_weights.to_numpy(), expected[WEIGHT_NAME_REQUIRED])
+    day_factors = np.random.uniform(0, 1, len(weights.day_types))
+    assert np.allclose((day_factors * weights).to_numpy(), (weights * day_factors).to_numpy())
+    assert np.allclose((2 * weights).to_numpy(), 2 * weights.to_numpy())
+
+    # Weights varying within a day are multiplied expanded
+    random_weights = pd.DataFrame({WEIGHT_NAME_REQUIRED: np.random.uniform(0, 1, len(hourly_index))}, index=hourly_index)
+    for product in (weights * random_weights, random_weights * weights):
+        assert isinstance(product, pd.DataFrame)
+        assert np.allclose(product[WEIGHT_NAME_REQUIRED], weights.to_numpy() * random_weights[WEIGHT_NAME_REQUIRED])
+
+# Test disaggregation consumes compressed weights directly
+def test_disaggregation_with_template_weights(hourly_index, weekly_mapping):
+    monthly_demand = MonthlyHeatDemand('sample', pd.DataFrame({ENERGY_FEATURE_NAME: np.random.uniform(100, 1000, 12)},
+                                                              index=pd.date_range('2021', periods=12, freq='MS')))
+    weights = apply_weekly_hourly_pattern(hourly_index, weekly_mapping, compressed=True) * day_length_proportionnal_weight(hourly_index)
+
+    hourly_demand = weekly_weighted_disaggregate(monthly_demand, weights)
+    expected = weekly_weighted_disaggregate(monthly_demand, weights.to_frame())
+    assert hourly_demand.data.index.equals(hourly_index)
+    assert np.allclose(hourly_demand.data[ENERGY_FEATURE_NAME], expected.data[ENERGY_FEATURE_NAME])
+    assert WEIGHT_NAME_REQUIRED not in hourly_demand.context
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from heatpro.check import ENERGY_FEATURE_NAME, WEIGHT_NAME_REQUIRED
+from heatpro.disaggregation import batch_weighted_disaggregate, weekly_weighted_disaggregate
+from heatpro.temporal_demand import MonthlyHeatDemand
+
+# Fixture for a wide table of monthly demands
+@pytest.fixture
+def monthly_demands():
+    return pd.DataFrame(np.random.uniform(100, 1000, (24, 3)),
+                        index=pd.date_range('2021', periods=24, freq='MS'),
+                        columns=['residential', 'tertiary', 'industry'])
+
+@pytest.fixture
+def hourly_index():
+    return pd.date_range('2021', '2023', freq='h', inclusive='left')
+
+# Test batch_weighted_disaggregate with one weight column shared by all demands
+def test_batch_weighted_disaggregate_shared_weight(monthly_demands, hourly_index):
+    weights = pd.DataFrame({WEIGHT_NAME_REQUIRED: np.random.uniform(0, 1, len(hourly_index))}, index=hourly_index)
+    hourly_demands = batch_weighted_disaggregate(monthly_demands, weights)
+
+    assert list(hourly_demands.columns) == list(monthly_demands.columns)
+    assert hourly_demands.index.equals(hourly_index)
+    for name in monthly_demands.columns:
+        expected = weekly_weighted_disaggregate(MonthlyHeatDemand(name, monthly_demands[[name]].rename(columns={name: ENERGY_FEATURE_NAME})), weights)
+        assert np.allclose(hourly_demands[name], expected.data[ENERGY_FEATURE_NAME])
+
+# Test batch_weighted_disaggregate with one weight column per demand
+def test_batch_weighted_disaggregate_weight_matrix(monthly_demands, hourly_index):
+    weights = pd.DataFrame(np.random.uniform(0, 1, (len(hourly_index), 3)), index=hourly_index,
+                           columns=['industry', 'residential', 'tertiary'])
+    hourly_demands = batch_weighted_disaggregate(monthly_demands, weights)
+
+    expected = monthly_demands.reindex(hourly_index, method='ffill') * weights
+    assert np.allclose(hourly_demands, expected[monthly_demands.columns])
+
+# Test batch_weighted_disaggregate errors
+def test_batch_weighted_disaggregate_errors(monthly_demands, hourly_index):
+    weights = pd.DataFrame({WEIGHT_NAME_REQUIRED: np.ones(len(hourly_index))}, index=hourly_index)
+
+    with pytest.raises(ValueError, match="not matching the same month"):
+        batch_weighted_disaggregate(monthly_demands.iloc[:12], weights)
+
+    with pytest.raises(ValueError, match="one column per demand"):
+        batch_weighted_disaggregate(monthly_demands, weights.rename(columns={WEIGHT_NAME_REQUIRED: 'other'}))
+
+    with pytest.raises(ValueError, match="weights index should be in datetime format"):
+        batch_weighted_disaggregate(monthly_demands, weights.reset_index(drop=True))
+
+    with pytest.raises(ValueError, match=f"either a column named {WEIGHT_NAME_REQUIRED} or columns per demand, not both \\(got residential\\)"):
+        batch_weighted_disaggregate(monthly_demands, weights.assign(residential=2.))
@@ -47,3 +47,88 @@ def test_disaggregate_temporal_demand():
     result_demand_no_functions = disaggregate_temporal_demand(input_demand, [])
     
     assert result_demand_no_functions.data.equals(input_demand.data)
+
+import numpy as np
+
+from heatpro.check import WEIGHT_NAME_REQUIRED
+from heatpro.demand_profile import month_length_proportionnal_weight, day_length_proportionnal_weight
+from heatpro.disaggregation import (DisaggregationPlan, monthly_weighted_disaggregate, daily_weighted_dissagregate,
+                                    hourly_weighted_dissagregate, iter_disaggregate_temporal_demand, iter_weighted_disaggregate,
+                                    split_weights)
+from heatpro.period_codes import MONTH
+from heatpro.temporal_demand import YearlyHeatDemand, HourlyHeatDemand
+
+@pytest.fixture
+def yearly_to_hourly_stages():
+    hourly_index = pd.date_range('2021', '2023', freq='h', inclusive='left')
+    return [
+        (monthly_weighted_disaggregate, month_length_proportionnal_weight(pd.date_range('2021', periods=24, freq='MS'))),
+        (daily_weighted_dissagregate, day_length_proportionnal_weight(pd.date_range('2021', '2023', freq='D', inclusive='left'))),
+        (hourly_weighted_dissagregate, pd.DataFrame({WEIGHT_NAME_REQUIRED: np.random.uniform(0, 1, len(hourly_index))}, index=hourly_index)),
+    ]
+
+def test_disaggregation_plan(yearly_to_hourly_stages):
+    # Test if the fused plan gives the same result as chaining the functions
+    yearly_demand = YearlyHeatDemand('sample', pd.DataFrame({ENERGY_FEATURE_NAME: [1000., 2000.]},
+                                                            index=pd.date_range('2021', periods=2, freq='YS')))
+    plan = DisaggregationPlan(yearly_to_hourly_stages)
+    hourly_demand = plan.disaggregate(yearly_demand)
+
+    intermediates = plan.intermediates(yearly_demand)
+    assert len(intermediates) == 3
+    assert isinstance(hourly_demand, HourlyHeatDemand)
+    assert np.allclose(hourly_demand.data[ENERGY_FEATURE_NAME], intermediates[-1].data[ENERGY_FEATURE_NAME])
+    assert list(hourly_demand.data.columns) == [ENERGY_FEATURE_NAME]
+    assert hourly_demand.context.columns == [WEIGHT_NAME_REQUIRED]
+
+    # Demands built from arrays are disaggregated without building their DataFrame
+    array_demand = YearlyHeatDemand.from_arrays('sample', yearly_demand.index, yearly_demand.energy)
+    assert np.allclose(plan.disaggregate(array_demand).energy, hourly_demand.energy)
+    assert array_demand._data is None
+
+    # Demand of the wrong class
+    with pytest.raises(ValueError, match="demand should be an instance of YearlyHeatDemand"):
+        plan.disaggregate(intermediates[0])
+
+def test_disaggregation_plan_invalid_stages(yearly_to_hourly_stages):
+    # Stages not chaining
+    with pytest.raises(ValueError, match="expects a DailyHeatDemand"):
+        DisaggregationPlan([yearly_to_hourly_stages[0], yearly_to_hourly_stages[2]])
+
+    # Weights of consecutive stages not matching
+    function, daily_weights = yearly_to_hourly_stages[1]
+    with pytest.raises(ValueError, match="are not matching the same"):
+        DisaggregationPlan([yearly_to_hourly_stages[0], (function, daily_weights.loc['2021'])])
+
+    # Unknown function
+    with pytest.raises(ValueError, match="is not a weighted disaggregation function"):
+        DisaggregationPlan([(add_one_demand, yearly_to_hourly_stages[0][1])])
+
+def test_iter_disaggregate_temporal_demand(yearly_to_hourly_stages):
+    yearly_demand = YearlyHeatDemand('sample', pd.DataFrame({ENERGY_FEATURE_NAME: [1000., 2000.]},
+                                                            index=pd.date_range('2021', periods=2, freq='YS')))
+    expected = DisaggregationPlan(yearly_to_hourly_stages).intermediates(yearly_demand)
+
+    # One chunk per month, weights of the last stage read lazily from a generator
+    function, hourly_weights = yearly_to_hourly_stages[2]
+    stages = yearly_to_hourly_stages[:2] + [(function, (chunk for chunk in split_weights(hourly_weights, MONTH)))]
+    chunks = list(iter_disaggregate_temporal_demand(yearly_demand, stages, chunk_level=MONTH))
+    assert len(chunks) == 24
+    assert all(isinstance(chunk, HourlyHeatDemand) for chunk in chunks)
+    assert np.allclose(pd.concat([chunk.data for chunk in chunks])[ENERGY_FEATURE_NAME], expected[-1].data[ENERGY_FEATURE_NAME])
+
+    # Weights of the last stage shifted by one month, or missing the last month
+    shifted_chunks = list(split_weights(hourly_weights, MONTH))[1:]
+    with pytest.raises(ValueError, match="chunk 0 of the weights of each stage should cover the same periods of month"):
+        next(iter_disaggregate_temporal_demand(yearly_demand, yearly_to_hourly_stages[:2] + [(function, shifted_chunks)], chunk_level=MONTH))
+    with pytest.raises(ValueError, match="weights of all stages should have the same number of chunks"):
+        list(iter_disaggregate_temporal_demand(yearly_demand, yearly_to_hourly_stages[:2] + [(function, hourly_weights.loc[:'2022-11'])],
+                                               chunk_level=MONTH))
+
+    # Single function, one chunk per year
+    chunks = list(iter_weighted_disaggregate(yearly_demand, yearly_to_hourly_stages[0][1], monthly_weighted_disaggregate))
+    assert len(chunks) == 2
+    assert pd.concat([chunk.data for chunk in chunks]).equals(expected[0].data)
+
+    with pytest.raises(ValueError, match="is not a weighted disaggregation function"):
+        next(iter_weighted_disaggregate(yearly_demand, yearly_to_hourly_stages[0][1], add_one_demand))
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from heatpro.check import ENERGY_FEATURE_NAME, WEIGHT_NAME_REQUIRED
+from heatpro.demand_profile import month_length_proportionnal_weight
+from heatpro.disaggregation import (monthly_weighted_disaggregate, weekly_weighted_disaggregate,
+                                    daily_weighted_dissagregate, hourly_weighted_dissagregate, sub_hourly_weighted_disaggregate)
+from heatpro.temporal_demand import YearlyHeatDemand, MonthlyHeatDemand, HourlyHeatDemand, SubHourlyHeatDemand
+
+# Fixture for a yearly demand over several years
+@pytest.fixture
+def yearly_demand():
+    return YearlyHeatDemand('sample', pd.DataFrame({ENERGY_FEATURE_NAME: [1000., 2000., 3000.]},
+                                                   index=pd.date_range('2020', periods=3, freq='YS')))
+
+# Fixture for a monthly demand over several years
+@pytest.fixture
+def monthly_demand(yearly_demand):
+    return monthly_weighted_disaggregate(yearly_demand,
+                                         month_length_proportionnal_weight(pd.date_range('2020', periods=36, freq='MS')))
+
+def random_weights(index: pd.DatetimeIndex) -> pd.DataFrame:
+    return pd.DataFrame({WEIGHT_NAME_REQUIRED: np.random.uniform(0.1, 1, len(index))}, index=index)
+
+# Test monthly_weighted_disaggregate
+def test_monthly_weighted_disaggregate(yearly_demand, monthly_demand):
+    assert isinstance(monthly_demand, MonthlyHeatDemand)
+    assert np.allclose(monthly_demand.data[ENERGY_FEATURE_NAME].resample('YS').sum(), [1000., 2000., 3000.])
+    assert list(monthly_demand.data.columns) == [ENERGY_FEATURE_NAME]
+    assert (monthly_demand.context[f'yearly_{ENERGY_FEATURE_NAME}'].loc['2021'] == 2000.).all()
+
+    monthly_demand_no_year_data = monthly_weighted_disaggregate(yearly_demand,
+                                                                month_length_proportionnal_weight(pd.date_range('2020', periods=36, freq='MS')),
+                                                                keep_year_data=False)
+    assert monthly_demand_no_year_data.context.columns == [WEIGHT_NAME_REQUIRED]
+
+# Test weekly_weighted_disaggregate
+def test_weekly_weighted_disaggregate(monthly_demand):
+    weights = random_weights(pd.date_range('2020', '2023', freq='h', inclusive='left'))
+    hourly_demand = weekly_weighted_disaggregate(monthly_demand, weights)
+
+    expected = monthly_demand.data[ENERGY_FEATURE_NAME].reindex(weights.index, method='ffill') * weights[WEIGHT_NAME_REQUIRED]
+    assert np.allclose(hourly_demand.data[ENERGY_FEATURE_NAME], expected)
+    assert np.allclose(hourly_demand.context[f'monthly_{ENERGY_FEATURE_NAME}'], monthly_demand.data[ENERGY_FEATURE_NAME].reindex(weights.index, method='ffill'))
+    assert np.allclose(hourly_demand.context[f'monthly_{WEIGHT_NAME_REQUIRED}'], monthly_demand.context[WEIGHT_NAME_REQUIRED].reindex(weights.index, method='ffill'))
+    assert (hourly_demand.context[f'yearly_{ENERGY_FEATURE_NAME}'].loc['2022'] == 3000.).all()
+
+    # Weights not covering the same months
+    with pytest.raises(ValueError, match="weights and monthly_demand are not matching the same month"):
+        weekly_weighted_disaggregate(monthly_demand, weights.loc['2020'])
+
+# Test daily_weighted_dissagregate and hourly_weighted_dissagregate
+def test_daily_then_hourly_weighted_disaggregate(monthly_demand):
+    daily_weights = random_weights(pd.date_range('2020', '2023', freq='D', inclusive='left'))
+    daily_demand = daily_weighted_dissagregate(monthly_demand, daily_weights)
+
+    expected = monthly_demand.data[ENERGY_FEATURE_NAME].reindex(daily_weights.index, method='ffill') * daily_weights[WEIGHT_NAME_REQUIRED]
+    assert np.allclose(daily_demand.data[ENERGY_FEATURE_NAME], expected)
+
+    hourly_weights = random_weights(pd.date_range('2020', '2023', freq='h', inclusive='left'))
+    hourly_demand = hourly_weighted_dissagregate(daily_demand, hourly_weights)
+
+    # Each hour is disaggregated from the demand of its own day
+    expected = daily_demand.data[ENERGY_FEATURE_NAME].reindex(hourly_weights.index, method='ffill') * hourly_weights[WEIGHT_NAME_REQUIRED]
+    assert np.allclose(hourly_demand.data[ENERGY_FEATURE_NAME], expected)
+    assert list(hourly_demand.data.columns) == [ENERGY_FEATURE_NAME]
+    assert set(hourly_demand.context.columns) == {WEIGHT_NAME_REQUIRED, f'daily_{WEIGHT_NAME_REQUIRED}', f'monthly_{WEIGHT_NAME_REQUIRED}',
+                                                  f'daily_{ENERGY_FEATURE_NAME}', f'monthly_{ENERGY_FEATURE_NAME}', f'yearly_{ENERGY_FEATURE_NAME}'}
+    assert hourly_demand.with_context().shape == (len(hourly_weights), 7)
+
+    with pytest.raises(ValueError, match="weights and daily_demand are not matching the same days"):
+        hourly_weighted_dissagregate(daily_demand, hourly_weights.iloc[24:])
+
+# Test sub_hourly_weighted_disaggregate
+def test_sub_hourly_weighted_disaggregate():
+    hourly_index = pd.date_range('2020-01-01', periods=48, freq='h')
+    hourly_demand = HourlyHeatDemand('sample', pd.DataFrame({ENERGY_FEATURE_NAME: np.arange(48.)}, index=hourly_index))
+
+    weights = random_weights(pd.date_range('2020-01-01', periods=48 * 4, freq='15min'))
+    sub_hourly_demand = sub_hourly_weighted_disaggregate(hourly_demand, weights)
+
+    assert isinstance(sub_hourly_demand, SubHourlyHeatDemand)
+    expected = hourly_demand.data[ENERGY_FEATURE_NAME].reindex(weights.index, method='ffill') * weights[WEIGHT_NAME_REQUIRED]
+    assert np.allclose(sub_hourly_demand.data[ENERGY_FEATURE_NAME], expected)
+    assert np.allclose(sub_hourly_demand.context[f'hourly_{ENERGY_FEATURE_NAME}'], hourly_demand.data[ENERGY_FEATURE_NAME].reindex(weights.index, method='ffill'))
+
+    with pytest.raises(ValueError, match="weights and hourly_demand are not matching the same hours"):
+        sub_hourly_weighted_disaggregate(hourly_demand, weights.iloc[4:])
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+from heatpro.external_factors import ExternalFactors, closed_heating_season, CLOSED_HEATING_SEASON_NAME, \
+    EXTERNAL_TEMPERATURE_NAME, HEATING_SEASON_NAME
+from heatpro.period_codes import DAY, HOUR
+
+# Fixture for two years of hourly data, heating only in January 2022 (first hour) and on 2023-01-02
+@pytest.fixture
+def external_factors():
+    index = pd.date_range('2022-01-01', '2023-12-31 23:00', freq='h')
+    heating_season = np.zeros(len(index), dtype=bool)
+    heating_season[0] = True
+    heating_season[index.get_loc(pd.Timestamp('2023-01-02 12:00'))] = True
+    return ExternalFactors(pd.DataFrame({EXTERNAL_TEMPERATURE_NAME: np.zeros(len(index)),
+                                         HEATING_SEASON_NAME: heating_season}, index=index))
+
+# Test that the same month of different years is a different period
+def test_closed_heating_season_month(external_factors):
+    closed = closed_heating_season(external_factors)[CLOSED_HEATING_SEASON_NAME]
+    index = external_factors.data.index
+
+    assert closed.index.equals(index)
+    assert (closed == (index.month == 1)).all()
+
+    # Heating flags of 2023 only
+    external_factors.data[HEATING_SEASON_NAME] = index.year == 2023
+    external_factors.invalidate_cache()
+    closed = closed_heating_season(external_factors)[CLOSED_HEATING_SEASON_NAME]
+    assert (closed == (index.year == 2023)).all()
+
+# Test the daily variant and an unsorted index
+def test_closed_heating_season_day(external_factors):
+    closed = closed_heating_season(external_factors, level=DAY)[CLOSED_HEATING_SEASON_NAME]
+    heating_dates = set(closed[closed].index.normalize())
+    assert heating_dates == {pd.Timestamp('2022-01-01'), pd.Timestamp('2023-01-02')}
+
+    shuffled = ExternalFactors(external_factors.data.sample(frac=1, random_state=0))
+    pd.testing.assert_frame_equal(closed_heating_season(shuffled, level=DAY).sort_index(),
+                                  closed.to_frame(), check_freq=False)
+
+    with pytest.raises(ValueError, match="level should be one of"):
+        closed_heating_season(external_factors, level=HOUR)
@@ -1,7 +1,7 @@
 import pytest
 import pandas as pd
 import numpy as np
-from heatpro.external_factors import non_heating_season_basic  # Replace 'your_module' with the actual module name where the function is defined
+from heatpro.external_factors import non_heating_season_basic, non_heating_season_batch  # Replace 'your_module' with the actual module name where the function is defined
 
 # Helper function to generate test data
 def generate_test_data():
@@ -30,3 +30,30 @@ def test_non_heating_season_basic(case):
     
     assert start.strftime('%Y-%m-%d') == case['expected_start']
     assert end.strftime('%Y-%m-%d') == case['expected_end']
+
+
+# Test that a share reached exactly (8 hot days out of 10) meets the condition
+def test_non_heating_season_basic_exact_share():
+    daily = [20, 0, 20, 20, 20, 20, 20, 20, 20, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
+    external_temperature = pd.Series(np.repeat(daily, 24), index=pd.date_range('2023-01-01', periods=24 * len(daily), freq='h'))
+
+    start, end = non_heating_season_basic(external_temperature, temperature_threshold=10, hot_day_min_share=0.8)
+    assert (start, end) == (pd.Timestamp('2023-01-01'), pd.Timestamp('2023-01-10'))
+
+    start, end = non_heating_season_basic(external_temperature, temperature_threshold=30, hot_day_min_share=0.8)
+    assert (start, end) == (None, None)
+
+# Test that the batch gives the season of each station, year and parameters
+def test_non_heating_season_batch():
+    external_temperature = generate_test_data()
+    two_years = pd.concat([external_temperature, external_temperature.set_axis(external_temperature.index + pd.DateOffset(years=1))])
+    stations = pd.DataFrame({'north': two_years, 'south': two_years + 3})
+
+    result = non_heating_season_batch(stations, temperature_threshold=[15, 20], hot_day_min_share=[0.5, 0.8])
+    assert result.index.names == ['station', 'year', 'temperature_threshold', 'hot_day_min_share']
+    assert len(result) == 2 * 2 * 2 * 2
+    for (station, year, temperature_threshold, hot_day_min_share), (start, end) in result.iterrows():
+        assert (start, end) == non_heating_season_basic(stations[station][str(year)], temperature_threshold, hot_day_min_share)
+
+    whole = non_heating_season_batch(external_temperature, 20, 0.8, by_year=False)
+    assert list(whole.iloc[0]) == [pd.Timestamp('2023-03-21'), pd.Timestamp('2023-04-20')]
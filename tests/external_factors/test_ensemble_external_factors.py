@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+from heatpro.external_factors import (EnsembleExternalFactors, ExternalFactors, EXTERNAL_TEMPERATURE_NAME, HEATING_SEASON_NAME,
+                                      burch_cold_water, kasuda_soil_temperature, basic_temperature_departure,
+                                      basic_temperature_return, closed_heating_season)
+
+# Fixture for two stations of two years of hourly data with different climates
+@pytest.fixture
+def members():
+    index = pd.date_range('2021-01-01', '2022-12-31 23:00', freq='h')
+    hours = np.arange(len(index))
+    yearly = np.cos(2 * np.pi * hours / (24 * 365))
+    daily = np.cos(2 * np.pi * hours / 24)
+    return {
+        name: ExternalFactors(pd.DataFrame({
+            EXTERNAL_TEMPERATURE_NAME: mean - amplitude * yearly + 3 * daily,
+            HEATING_SEASON_NAME: yearly > threshold,
+        }, index=index))
+        for name, mean, amplitude, threshold in (('north', 8, 10, -0.2), ('south', 15, 7, 0.3))
+    }
+
+# Test that every process of an ensemble gives the result of each member
+@pytest.mark.parametrize('process', [
+    burch_cold_water,
+    lambda external_factors: kasuda_soil_temperature(external_factors, 2, 0.05),
+    lambda external_factors: basic_temperature_departure(external_factors, 100, 80, 70, 65, 15, -10),
+    lambda external_factors: basic_temperature_return(external_factors, 60, 50),
+    closed_heating_season,
+])
+def test_ensemble_process(members, process):
+    ensemble = EnsembleExternalFactors.from_members(members)
+    result = process(ensemble)
+
+    assert list(result.columns.get_level_values('member')) == list(members)
+    for name, external_factors in members.items():
+        pd.testing.assert_frame_equal(result[name], process(external_factors), check_names=False)
+
+# Test member access and data layout
+def test_ensemble_members(members):
+    ensemble = EnsembleExternalFactors.from_members(list(members.values()))
+
+    assert len(ensemble) == 2
+    assert ensemble.members == ['0', '1']
+    pd.testing.assert_frame_equal(ensemble.member('1').data, members['south'].data)
+    pd.testing.assert_frame_equal(ensemble.data['0'], members['north'].data, check_names=False)
+    assert [member.data.shape for member in ensemble] == [members['north'].data.shape] * 2
+    np.testing.assert_allclose(ensemble.calendar.mean_temperature,
+                               [members['north'].calendar.mean_temperature, members['south'].calendar.mean_temperature])
+
+    with pytest.raises(ValueError, match="east is not a member of the ensemble"):
+        ensemble.member('east')
+
+# Test errors on shapes, member names and indexes
+def test_ensemble_errors(members):
+    index = members['north'].data.index
+    with pytest.raises(ValueError, match="should be of shape"):
+        EnsembleExternalFactors(index, np.zeros((len(index), 2)), np.zeros((len(index), 3), dtype=bool), ['a', 'b'])
+    with pytest.raises(ValueError, match="members should be unique"):
+        EnsembleExternalFactors(index, np.zeros((len(index), 2)), np.zeros((len(index), 2), dtype=bool), ['a', 'a'])
+    with pytest.raises(ValueError, match="members should be on the same index"):
+        EnsembleExternalFactors.from_members({'north': members['north'],
+                                              'short': ExternalFactors(members['south'].data.iloc[:-1])})
+
+# Test that rows from since are computed with the statistics of every row
+def test_ensemble_since(members):
+    ensemble = EnsembleExternalFactors.from_members(members)
+    since = ensemble.index[-50]
+    pd.testing.assert_frame_equal(burch_cold_water(ensemble, since=since), burch_cold_water(ensemble).iloc[-50:])
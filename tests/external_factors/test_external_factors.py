@@ -1,7 +1,10 @@
+import numpy as np
 import pandas as pd
 from matplotlib.axes import Axes
 import pytest
-from heatpro.external_factors import ExternalFactors, EXTERNAL_TEMPERATURE_NAME
+from heatpro.demand_profile import felt_temperature
+from heatpro.external_factors import (ExternalFactors, EXTERNAL_TEMPERATURE_NAME, HEATING_SEASON_NAME, burch_cold_water,
+                                      closed_heating_season, get_coldest_dayofyear, kasuda_soil_temperature)
 
 # Sample data for testing
 sample_data = pd.DataFrame({
@@ -37,3 +40,92 @@ def test_external_factors_plot():
     plot_axes = external_factors.plot()
     
     assert isinstance(plot_axes, Axes)
+
+def test_external_factors_calendar():
+    index = pd.date_range('2022-01-01', periods=24 * 60, freq='h')
+    data = pd.DataFrame({
+        'external_temperature': np.cos(np.arange(len(index)) / len(index) * 2 * np.pi),
+        'heating_season': index.month == 1,
+    }, index=index)
+    external_factors = ExternalFactors(data)
+
+    calendar = external_factors.calendar
+    assert external_factors.calendar is calendar
+    assert np.allclose(calendar.daily_mean, data.external_temperature.resample('D').mean())
+    assert np.allclose(calendar.monthly_mean, data.external_temperature.resample('MS').mean())
+    assert get_coldest_dayofyear(external_factors) == data.external_temperature.resample('D').mean().idxmin().dayofyear
+
+    # Replaced columns rebuild the cache, in place modifications need invalidate_cache
+    external_factors.data['external_temperature'] = -data['external_temperature']
+    assert external_factors.calendar is not calendar
+    calendar = external_factors.calendar
+    external_factors.data.iloc[0, 0] = 100.
+    assert external_factors.calendar is calendar
+    external_factors.invalidate_cache()
+    assert external_factors.calendar.daily_max[0] == 100.
+
+# Test that values edited in place with loc are computed again after invalidate_cache
+def test_external_factors_calendar_loc_edit():
+    index = pd.date_range('2021-01-01', '2022-12-31 23:00', freq='h')
+    data = pd.DataFrame({
+        EXTERNAL_TEMPERATURE_NAME: 10 - 10 * np.cos(2 * np.pi * np.arange(len(index)) / (24 * 365)),
+        'heating_season': (index.month < 5) | (index.month > 9),
+    }, index=index)
+    external_factors = ExternalFactors(data.copy())
+    burch_cold_water(external_factors)
+
+    external_factors.data.loc[index.month == 1, EXTERNAL_TEMPERATURE_NAME] -= 20
+    external_factors.invalidate_cache()
+    pd.testing.assert_frame_equal(burch_cold_water(external_factors), burch_cold_water(ExternalFactors(external_factors.data.copy())))
+
+def test_external_factors_append():
+    index = pd.date_range('2021-01-01', '2022-12-31 23:00', freq='h')
+    data = pd.DataFrame({
+        EXTERNAL_TEMPERATURE_NAME: np.random.default_rng(0).normal(10, 8, len(index)),
+        HEATING_SEASON_NAME: (index.month < 5) | (index.month > 9),
+    }, index=index)
+    history = len(index) - 100
+    external_factors = ExternalFactors(data.iloc[:history])
+    burch_cold_water(external_factors)
+
+    # Rows appended in chunks starting in the middle of a day, only new rows are computed and returned
+    # (with the statistics of the rows known so far)
+    for start in range(history, len(index), 30):
+        new_rows = external_factors.append(data.iloc[start:start + 30])
+        known = ExternalFactors(data.iloc[:start + 30])
+        expected_rows = pd.concat([burch_cold_water(known), closed_heating_season(known)], axis=1).iloc[start:]
+        pd.testing.assert_frame_equal(new_rows, expected_rows, check_freq=False)
+    assert external_factors.append(data.iloc[:0], processes=[]).empty
+    since = data.index[history]
+    expected = ExternalFactors(data)
+    for process in (burch_cold_water, lambda factors, since=None: kasuda_soil_temperature(factors, 1.2, 0.05, since=since),
+                    closed_heating_season):
+        pd.testing.assert_frame_equal(process(external_factors, since=since), process(expected).iloc[history:], check_freq=False)
+
+    pd.testing.assert_frame_equal(external_factors.data, data, check_freq=False)
+    assert external_factors.calendar.mean_temperature == pytest.approx(expected.calendar.mean_temperature)
+
+    with pytest.raises(ValueError, match="appended rows should be sorted and after the last datetime"):
+        external_factors.append(data.iloc[-10:])
+
+
+# Test that the felt temperature tracked through appends in pieces equals one run over every row
+def test_external_factors_append_felt_temperature():
+    index = pd.date_range('2021-01-01', '2021-03-31 23:00', freq='h')
+    temperature = np.random.default_rng(1).normal(5, 6, len(index))
+    temperature[100:130] = np.nan
+    data = pd.DataFrame({EXTERNAL_TEMPERATURE_NAME: temperature, HEATING_SEASON_NAME: True}, index=index)
+    expected = felt_temperature(data[EXTERNAL_TEMPERATURE_NAME], [10, 48], ['light', 'heavy'])
+
+    external_factors = ExternalFactors(data.iloc[:90])
+    assert external_factors.felt_temperature is None
+    pd.testing.assert_frame_equal(external_factors.track_felt_temperature([10, 48], ['light', 'heavy']), expected.iloc[:90])
+    for start in range(90, len(index), 500):
+        new_rows = external_factors.append(data.iloc[start:start + 500], processes=[])
+        pd.testing.assert_frame_equal(new_rows, expected.iloc[start:start + 500])
+    pd.testing.assert_frame_equal(external_factors.felt_temperature, expected)
+
+    # In place modifications are filtered again by invalidate_cache
+    external_factors.data.iloc[:, 0] += 1.
+    external_factors.invalidate_cache()
+    pd.testing.assert_frame_equal(external_factors.felt_temperature, expected + 1.)
@@ -1,6 +1,8 @@
+import numpy as np
 import pandas as pd
 import pytest
-from heatpro.external_factors import convert_serie_C_to_F, convert_serie_F_to_C, get_coldest_dayofyear, ExternalFactors
+from heatpro.external_factors import (convert_serie_C_to_F, convert_serie_F_to_C, get_coldest_dayofyear, ExternalFactors,
+                                      rows_per_day, daily_stats, max_daily_amplitude, mean_yearly_amplitude)
 
 # Sample data for testing
 sample_data = pd.DataFrame({
@@ -39,3 +41,30 @@ def test_get_coldest_dayofyear():
 # def test_convert_serie_F_to_C_invalid_input():
 #     with pytest.raises(TypeError, match="Expected input of type pd.Series"):
 #         convert_serie_F_to_C([50.0, 59.0, 68.0])
+
+# Test the regular index detection of reshape kernels
+def test_rows_per_day():
+    assert rows_per_day(pd.date_range('2022-01-01', periods=48, freq='h')) == 24
+    assert rows_per_day(pd.date_range('2022-01-01', periods=96 * 2, freq='15min', tz='UTC')) == 96
+    # Starting after midnight, incomplete last day or a daylight saving change
+    assert rows_per_day(pd.date_range('2022-01-01 01:00', periods=48, freq='h')) is None
+    assert rows_per_day(pd.date_range('2022-01-01', periods=47, freq='h')) is None
+    assert rows_per_day(pd.date_range('2022-03-27', periods=48, freq='h', tz='Europe/Paris')) is None
+
+# Test that amplitude kernels give the pandas resample results, for regular and irregular indexes
+@pytest.mark.parametrize('index', [
+    pd.date_range('2021-01-01', '2022-12-31 23:00', freq='h'),
+    pd.date_range('2021-01-01 05:00', '2022-12-31 23:00', freq='h', tz='Europe/Paris'),
+])
+def test_amplitude_kernels(index):
+    temperature = pd.Series(np.random.default_rng(0).normal(10, 8, len(index)), index=index)
+    temperature.iloc[30:60] = np.nan
+    daily = temperature.resample('D')
+    monthly_mean = temperature.resample('MS').mean()
+
+    _, means, minimums, maximums = daily_stats(temperature.to_numpy(), index)
+    np.testing.assert_allclose(means, daily.mean().to_numpy())
+    np.testing.assert_allclose(maximums - minimums, (daily.max() - daily.min()).to_numpy())
+    assert max_daily_amplitude(temperature.to_numpy(), index) == pytest.approx((daily.max() - daily.min()).max())
+    assert mean_yearly_amplitude(temperature.to_numpy(), index) == \
+        pytest.approx(monthly_mean.groupby(monthly_mean.index.year).agg(lambda x: x.max() - x.min()).mean())
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+from heatpro.external_factors import ExternalFactors, EXTERNAL_TEMPERATURE_NAME, HEATING_SEASON_NAME
+
+# Fixture for hourly external factors with an extra column
+@pytest.fixture
+def external_factors():
+    index = pd.date_range('2022-01-01', periods=24 * 10, freq='h', tz='Europe/Paris')
+    return ExternalFactors(pd.DataFrame({
+        EXTERNAL_TEMPERATURE_NAME: np.linspace(-5, 15, len(index)),
+        HEATING_SEASON_NAME: np.arange(len(index)) % 3 == 0,
+        'wind': np.ones(len(index)),
+    }, index=index))
+
+# Test csv loading with a rebuilt index, pruned columns and a computed heating season
+def test_from_csv(tmp_path):
+    path = tmp_path / 'weather.csv'
+    pd.DataFrame({'T_ext': [1.5, 2.5, 3.5], 'G_dif': [0, 1, 2]}).to_csv(path, index=False)
+
+    external_factors = ExternalFactors.from_csv(path, columns={'T_ext': EXTERNAL_TEMPERATURE_NAME}, index_column=None,
+                                                start='2022-01-01', freq='h', heating_season=lambda index: index.hour > 0)
+    assert list(external_factors.data.columns) == [EXTERNAL_TEMPERATURE_NAME, HEATING_SEASON_NAME]
+    assert external_factors.data.index.equals(pd.date_range('2022-01-01', periods=3, freq='h'))
+    assert list(external_factors.data[HEATING_SEASON_NAME]) == [False, True, True]
+
+    with pytest.raises(ValueError, match="freq should be given with start"):
+        ExternalFactors.from_csv(path, index_column=None, start='2022-01-01')
+
+# Test csv loading of the non regression weather data gives the hand-built external factors
+def test_from_csv_weatherdata():
+    path = './tests/non_regression/data/weatherdata.csv'
+    index = pd.date_range('2021', end='2022', freq='h', inclusive='left')
+    expected = pd.DataFrame({EXTERNAL_TEMPERATURE_NAME: pd.read_csv(path, sep=',')['T_ext'].to_numpy()}, index=index)
+    expected[HEATING_SEASON_NAME] = index.month != 7
+
+    external_factors = ExternalFactors.from_csv(path, columns={'T_ext': EXTERNAL_TEMPERATURE_NAME}, index_column=None,
+                                                start='2021', freq='h', heating_season=lambda index: index.month != 7)
+    pd.testing.assert_frame_equal(external_factors.data, expected, check_freq=False)
+
+# Test csv loading of a datetime column, parsed or rebuilt from its first datetime
+def test_from_csv_index(tmp_path, external_factors):
+    path = tmp_path / 'external_factors.csv'
+    data = external_factors.data.tz_localize(None)
+    data.to_csv(path)
+
+    parsed = ExternalFactors.from_csv(path)
+    rebuilt = ExternalFactors.from_csv(path, freq='h')
+    pd.testing.assert_frame_equal(parsed.data, data, check_freq=False)
+    pd.testing.assert_frame_equal(rebuilt.data, data, check_freq=False)
+    assert rebuilt.data.index.freq == "h"
+
+    data.drop(data.index[5]).to_csv(path)
+    with pytest.raises(ValueError, match="datetimes are not regular"):
+        ExternalFactors.from_csv(path, freq='h')
+
+# Test npz round trip, memory-mapped or not
+@pytest.mark.parametrize('compressed', [False, True])
+def test_npz(tmp_path, external_factors, compressed):
+    path = tmp_path / 'external_factors.npz'
+    external_factors.to_npz(path, compressed=compressed)
+
+    loaded = ExternalFactors.from_npz(path, mmap=True)
+    pd.testing.assert_frame_equal(loaded.data, external_factors.data)
+    # Uncompressed arrays are mapped, not read
+    assert loaded.data['wind'].to_numpy().flags.writeable == compressed
+
+    pruned = ExternalFactors.from_npz(path, columns={EXTERNAL_TEMPERATURE_NAME: EXTERNAL_TEMPERATURE_NAME},
+                                      heating_season=np.zeros(len(external_factors.data)))
+    assert list(pruned.data.columns) == [EXTERNAL_TEMPERATURE_NAME, HEATING_SEASON_NAME]
+
+# Test parquet loading (only with a parquet engine)
+def test_from_parquet(tmp_path, external_factors):
+    pytest.importorskip('pyarrow')
+    path = tmp_path / 'external_factors.parquet'
+    external_factors.data.to_parquet(path)
+
+    loaded = ExternalFactors.from_parquet(path, columns={EXTERNAL_TEMPERATURE_NAME: EXTERNAL_TEMPERATURE_NAME, HEATING_SEASON_NAME: HEATING_SEASON_NAME})
+    pd.testing.assert_frame_equal(loaded.data, external_factors.data.drop(columns='wind'), check_freq=False)
@@ -6,6 +6,7 @@ import pytest
 
 EPSILON = 1e-2
 
+from heatpro.dtype_policy import float_dtype
 from heatpro.external_factors import (
     ExternalFactors,
     EXTERNAL_TEMPERATURE_NAME,
@@ -17,8 +18,14 @@ from heatpro.external_factors import (
     kasuda_soil_temperature
 )
 
+@pytest.fixture(params=['float64', 'float32'])
+def dtype_policy(request):
+    # Every non regression result is checked with float64 and float32 outputs
+    with float_dtype(request.param):
+        yield request.param
+
 @pytest.fixture
-def setup_data() -> tuple[dict,ExternalFactors]:
+def setup_data(dtype_policy) -> tuple[dict,ExternalFactors]:
     year = "2021"
     parameters = json.load(open('./tests/non_regression/data/param_H1_2050_lowT.json'))
     df = pd.DataFrame(
@@ -232,6 +239,11 @@ def test_return_temperature_after_fitting(district_heating):
     absolute_gap = (district_heating.data[RETURN_TEMPERATURE_NAME] - district_heating_reference[RETURN_TEMPERATURE_NAME]).abs()
     assert (absolute_gap <= EPSILON * district_heating_reference[RETURN_TEMPERATURE_NAME].abs()).all() , f"The relative gap of return temperature after fitting is over {EPSILON}"
 
+def test_output_dtype(district_heating, dtype_policy):
+    for sector, hourly_load in district_heating.demands.items():
+        assert hourly_load[ENERGY_FEATURE_NAME].dtype == dtype_policy, f"'{sector}' hourly demand is not {dtype_policy}"
+    assert district_heating.data[RETURN_TEMPERATURE_NAME].dtype == dtype_policy
+
 if __name__ == "__main__":
     district_heating_reference = pd.read_csv("./tests/non_regression/data/district_heating.csv",index_col=0,parse_dates=True)
     print(district_heating_reference.columns)
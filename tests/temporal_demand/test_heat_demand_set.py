@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+from heatpro.check import ENERGY_FEATURE_NAME
+from heatpro.temporal_demand import HeatDemandSet, HourlyHeatDemand, DailyHeatDemand
+
+# Fixture for a set of hourly demands with sector metadata
+@pytest.fixture
+def demand_set():
+    index = pd.date_range('2022-01-01', periods=48, freq='h')
+    demands = [HourlyHeatDemand.from_arrays(f"building_{i}", index, np.full(48, i + 1.)) for i in range(4)]
+    metadata = pd.DataFrame({'sector': ['residential', 'industry', 'residential', 'tertiary']},
+                            index=[demand.name for demand in demands])
+    return HeatDemandSet.from_demands(demands, metadata)
+
+# Test set construction and access to its demands
+def test_heat_demand_set(demand_set):
+    assert len(demand_set) == 4
+    assert demand_set.energy.shape == (48, 4) and demand_set.energy.flags.f_contiguous
+
+    demand = demand_set.demand('building_2')
+    assert isinstance(demand, HourlyHeatDemand)
+    assert np.shares_memory(demand.energy, demand_set.energy)
+    assert (demand.energy == 3).all()
+    assert np.shares_memory(demand_set.to_frame().to_numpy(), demand_set.energy)
+
+    with pytest.raises(ValueError, match="names of the demands should be unique"):
+        HeatDemandSet(demand_set.index, demand_set.energy, ['a', 'a', 'b', 'c'])
+    with pytest.raises(ValueError, match="energy should be of shape"):
+        HeatDemandSet(demand_set.index, demand_set.energy, ['a', 'b'])
+    with pytest.raises(ValueError, match="have multiple occurrences"):
+        HeatDemandSet(demand_set.index[[0] * 48], demand_set.energy, demand_set.names)
+    with pytest.raises(ValueError, match="can only be combined"):
+        HeatDemandSet.from_demands([demand, DailyHeatDemand('daily', pd.DataFrame({ENERGY_FEATURE_NAME: [1.]},
+                                                                                 index=pd.date_range('2022-01-01', periods=1)))])
+
+# Test totals, group sums and time slices
+def test_heat_demand_set_aggregations(demand_set):
+    total = demand_set.total()
+    assert (total.energy == 10).all()
+
+    sectors = demand_set.group_sum('sector')
+    assert sectors.names == ['industry', 'residential', 'tertiary']
+    assert (sectors.energy[0] == [2, 4, 4]).all()
+
+    # Demands without group
+    with pytest.raises(ValueError, match="demands building_1 have no group"):
+        demand_set.group_sum(['residential', None, 'residential', 'tertiary'])
+    with pytest.raises(ValueError, match="demands building_3 have no group"):
+        demand_set.group_sum(pd.Series(['a', 'b', 'c'], index=['building_0', 'building_1', 'building_2']))
+
+    day = demand_set.between('2022-01-02', '2022-01-02 23:00')
+    assert len(day.index) == 24 and day.index[0] == pd.Timestamp('2022-01-02')
+    assert np.shares_memory(day.energy, demand_set.energy)
+
+    selection = demand_set.select(['building_3', 'building_0'])
+    assert selection.names == ['building_3', 'building_0']
+    assert (selection.energy[0] == [4, 1]).all()
+    assert list(selection.metadata.sector) == ['tertiary', 'residential']
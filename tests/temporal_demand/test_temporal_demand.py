@@ -1,8 +1,12 @@
+import numpy as np
 import pandas as pd
 import pytest
 from matplotlib.axes import Axes
+from heatpro.temporal_demand import (LazyContext, SubHourlyHeatDemand, HourlyHeatDemand, DailyHeatDemand, MonthlyHeatDemand,
+                                     YearlyHeatDemand)
 from heatpro.temporal_demand.temporal_heat_demand import TemporalHeatDemand
 from heatpro.check import ENERGY_FEATURE_NAME
+from heatpro.period_codes import YEAR, MONTH, DAY, period_codes
 
 # Sample data for testing
 sample_data = pd.DataFrame({
@@ -35,3 +39,119 @@ def test_temporal_heat_demand_plot():
 
     assert isinstance(plot_axes, Axes)
     # Add more specific assertions related to the plot if needed
+
+def test_temporal_heat_demand_plot_decimated():
+    index = pd.date_range('2022-01-01', periods=24 * 365, freq='h')
+    energy = np.random.default_rng(0).random(len(index))
+    energy[4321] = 5
+    hourly_heat_demand = HourlyHeatDemand.from_arrays('SampleDemand', index, energy)
+
+    plot_axes = hourly_heat_demand.plot(max_points=100)
+    x, y = plot_axes.get_lines()[-1].get_data()
+    assert len(y) <= 100 and max(y) == 5
+
+def test_temporal_heat_demand_context():
+    # Without context
+    temporal_heat_demand = TemporalHeatDemand('SampleDemand', sample_data)
+    assert len(temporal_heat_demand.context) == 0
+    assert temporal_heat_demand.with_context().equals(sample_data)
+
+    # With a monthly context column, expanded on read
+    monthly_index = pd.date_range('2022-01-01', periods=1, freq='MS')
+    context = LazyContext(sample_data.index, {'monthly_total': (MONTH, period_codes(monthly_index, MONTH), [750])})
+    temporal_heat_demand = TemporalHeatDemand('SampleDemand', sample_data, context)
+    assert list(temporal_heat_demand.data.columns) == [ENERGY_FEATURE_NAME]
+    assert (temporal_heat_demand.context['monthly_total'] == 750).all()
+    assert list(temporal_heat_demand.with_context().columns) == ['monthly_total', ENERGY_FEATURE_NAME]
+
+def test_sub_hourly_heat_demand():
+    quarter_hour_data = pd.DataFrame({ENERGY_FEATURE_NAME: range(8)}, index=pd.date_range('2022-01-01', periods=8, freq='15min'))
+    demand = SubHourlyHeatDemand('SampleDemand', quarter_hour_data)
+    assert demand.freq == pd.Timedelta('15min')
+
+    # Frequencies not dividing an hour
+    with pytest.raises(ValueError, match="freq should be shorter than an hour and divide it"):
+        SubHourlyHeatDemand('SampleDemand', quarter_hour_data, freq='7min')
+
+    # Two values in the same time step
+    with pytest.raises(ValueError, match="have multiple occurrences"):
+        SubHourlyHeatDemand('SampleDemand', pd.concat([quarter_hour_data, quarter_hour_data.iloc[:1]]), freq='15min')
+
+def test_temporal_heat_demand_arrays():
+    # data given to the constructor is the cached view
+    temporal_heat_demand = TemporalHeatDemand('SampleDemand', sample_data)
+    assert temporal_heat_demand.data is sample_data
+    assert temporal_heat_demand.energy.dtype == np.float64
+    assert len(temporal_heat_demand) == 5
+
+    # Built from arrays, data is only built on access
+    index = pd.date_range('2022-01-01', periods=48, freq='h', tz='Europe/Paris')
+    hourly_demand = HourlyHeatDemand.from_arrays('SampleDemand', index.asi8, np.arange(48.))
+    assert hourly_demand._data is None
+    assert hourly_demand.data[ENERGY_FEATURE_NAME].sum() == sum(range(48))
+    assert hourly_demand.index.tz is None
+
+    hourly_demand = HourlyHeatDemand.from_arrays('SampleDemand', index, np.arange(48.))
+    assert hourly_demand.index is index
+    with pytest.raises(ValueError, match="have multiple occurrences"):
+        HourlyHeatDemand.from_arrays('SampleDemand', index[[0, 0]], np.arange(2.))
+
+    # Slicing works on arrays and keeps the class
+    first_day = hourly_demand[:24]
+    assert isinstance(first_day, HourlyHeatDemand)
+    assert first_day.data.index.equals(index[:24])
+    assert np.array_equal(hourly_demand[hourly_demand.energy > 40].energy, np.arange(41., 48.))
+    with pytest.raises(ValueError, match="have multiple occurrences"):
+        hourly_demand[[1, 1]]
+
+# Test that energy follows modifications of data by the caller
+def test_temporal_heat_demand_data_edits():
+    daily_demand = DailyHeatDemand('SampleDemand', sample_data.copy())
+    daily_demand.data[ENERGY_FEATURE_NAME] = 0.
+    assert daily_demand.energy.sum() == 0.
+    assert daily_demand.to_monthly().energy.sum() == 0.
+    assert (daily_demand * 2).energy.sum() == 0.
+
+    daily_demand = DailyHeatDemand.from_arrays('SampleDemand', sample_data.index, np.ones(5))
+    daily_demand.data.loc[daily_demand.index[0], ENERGY_FEATURE_NAME] = 11.
+    assert np.array_equal(daily_demand.energy, [11., 1., 1., 1., 1.])
+    assert (daily_demand + daily_demand).energy.sum() == 30.
+
+def test_temporal_heat_demand_roll_up():
+    index = pd.date_range('2021-01-01', '2023-01-01', freq='h', inclusive='left')
+    hourly_demand = HourlyHeatDemand.from_arrays('SampleDemand', index, np.random.uniform(0, 1, len(index)))
+
+    monthly_demand = hourly_demand.to_monthly()
+    assert isinstance(monthly_demand, MonthlyHeatDemand)
+    assert np.allclose(monthly_demand.data[ENERGY_FEATURE_NAME], hourly_demand.data[ENERGY_FEATURE_NAME].resample('MS').sum())
+
+    # Several levels at once
+    yearly_demand, daily_demand = hourly_demand.roll_up([YEAR, DAY])
+    assert isinstance(yearly_demand, YearlyHeatDemand) and isinstance(daily_demand, DailyHeatDemand)
+    assert np.allclose(yearly_demand.energy, hourly_demand.data[ENERGY_FEATURE_NAME].resample('YS').sum())
+    assert daily_demand.to_yearly().index.equals(yearly_demand.index)
+
+    with pytest.raises(ValueError, match="day is not coarser than month"):
+        monthly_demand.to_daily()
+
+def test_temporal_heat_demand_arithmetic():
+    index = pd.date_range('2022-01-01', periods=12, freq='MS')
+    building = MonthlyHeatDemand.from_arrays('building', index, np.full(12, 100.))
+    hot_water = MonthlyHeatDemand.from_arrays('hot_water', index, np.full(12, 20.))
+
+    assert np.allclose((building - hot_water).energy, 80.)
+    assert np.allclose((building + hot_water * 2).energy, 140.)
+    assert (building - hot_water).name == 'building'
+    assert np.allclose(MonthlyHeatDemand.sum([building, hot_water, hot_water], name='total').energy, 140.)
+    assert np.allclose(sum([building, hot_water]).energy, 120.)
+
+    # Different indexes need an explicit realignment
+    first_half = MonthlyHeatDemand.from_arrays('first_half', index[:6], np.full(6, 10.))
+    with pytest.raises(ValueError, match="not on the same index"):
+        building - first_half
+    realigned = building.subtract(first_half, align=True)
+    assert np.allclose(realigned.energy, [90.] * 6 + [100.] * 6)
+
+    # Demands of different levels
+    with pytest.raises(ValueError, match="can only be combined with another MonthlyHeatDemand"):
+        building + YearlyHeatDemand.from_arrays('yearly', index[:1], np.ones(1))
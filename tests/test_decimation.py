@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+from heatpro.decimation import min_max_positions, decimate
+
+# Test that decimation keeps the peaks of each bucket
+def test_min_max_positions():
+    values = np.sin(np.arange(10_000) / 50)
+    values[1234] = 10
+    values[5678] = -10
+    values[42] = np.nan
+
+    positions = min_max_positions(values, 200)
+    assert len(positions) <= 200
+    assert (np.diff(positions) > 0).all()
+    assert {1234, 5678}.issubset(positions) and 42 not in positions
+    assert values[positions].max() == 10 and values[positions].min() == -10
+
+    # Short series are not decimated
+    assert (min_max_positions(values[:100], 200) == np.arange(100)).all()
+
+    with pytest.raises(ValueError, match="max_points should be at least 2"):
+        min_max_positions(values, 1)
+
+# Test decimation of several columns
+def test_decimate():
+    data = pd.DataFrame({'a': np.arange(1000.), 'b': -np.arange(1000.)}, index=pd.date_range('2022', periods=1000, freq='h'))
+    data.iloc[500, 1] = 1e6
+
+    decimated = decimate(data, 20)
+    assert len(decimated) <= 40
+    assert decimated['b'].max() == 1e6
+    assert decimate(data, None) is data
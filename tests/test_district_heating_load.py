@@ -1,7 +1,7 @@
 import pandas as pd
 import pytest
 from heatpro.district_heating_load import DistrictHeatingLoad, ENERGY_FEATURE_NAME
-from heatpro.temporal_demand import HourlyHeatDemand
+from heatpro.temporal_demand import HourlyHeatDemand, SubHourlyHeatDemand, HeatDemandSet
 from heatpro.external_factors import ExternalFactors, DEPARTURE_TEMPERATURE_NAME, RETURN_TEMPERATURE_NAME
 
 # Sample data for testing
@@ -68,3 +68,25 @@ def test_district_heating_load_fit():
     district_heating_load.fit()
 
     # Add more specific assertions based on the expected behavior of the fit method
+
+def test_district_heating_load_sub_hourly():
+    index = pd.date_range('2022-01-01', periods=5, freq='15min')
+    demand = SubHourlyHeatDemand('SampleDemand', sample_demand_data.set_axis(index))
+    external_factors = ExternalFactors(sample_external_factors_data.set_axis(index))
+    district_network_temperature = sample_district_network_temperature_data.set_axis(index)
+
+    district_heating_load = DistrictHeatingLoad([demand], external_factors, district_network_temperature, 5, 1.5)
+    district_heating_load.fit()
+    assert district_heating_load.data.index.equals(index)
+
+def test_district_heating_load_demand_set():
+    demands = [HourlyHeatDemand('SampleDemand', sample_demand_data), HourlyHeatDemand('OtherDemand', sample_demand_data * 2)]
+    external_factors = ExternalFactors(sample_external_factors_data)
+
+    from_list = DistrictHeatingLoad(demands, external_factors, sample_district_network_temperature_data.copy(), 5, 1.5)
+    from_list.fit()
+    from_set = DistrictHeatingLoad(HeatDemandSet.from_demands(demands), external_factors, sample_district_network_temperature_data.copy(), 5, 1.5)
+    from_set.fit()
+
+    assert list(from_set.demands) == ['SampleDemand', 'OtherDemand']
+    pd.testing.assert_frame_equal(from_set.data, from_list.data, check_dtype=False)
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+from heatpro.check import ENERGY_FEATURE_NAME
+from heatpro.dtype_policy import get_float_dtype, set_float_dtype, float_dtype, cast_float
+from heatpro.disaggregation import hourly_weighted_dissagregate
+from heatpro.external_factors import ExternalFactors, EXTERNAL_TEMPERATURE_NAME, HEATING_SEASON_NAME, basic_temperature_return
+from heatpro.temporal_demand import DailyHeatDemand, HourlyHeatDemand
+
+# Test the dtype switch
+def test_float_dtype():
+    assert get_float_dtype() == np.float64
+
+    with float_dtype('float32'):
+        assert get_float_dtype() == np.float32
+    assert get_float_dtype() == np.float64
+
+    with pytest.raises(ValueError, match="dtype should be one of"):
+        set_float_dtype('int64')
+
+# Test casts of arrays and DataFrames, other columns are left untouched
+def test_cast_float():
+    df = pd.DataFrame({'a': [1.5, 2.5], 'b': [True, False]})
+
+    assert cast_float(df) is df
+    cast_df = cast_float(df, np.float32)
+    assert cast_df['a'].dtype == np.float32 and cast_df['b'].dtype == bool
+
+    with float_dtype(np.float32):
+        assert cast_float(np.ones(3)).dtype == np.float32
+
+# Test float32 disaggregation and float64 accumulation of roll-ups and sums
+def test_float32_demands():
+    daily_demand = DailyHeatDemand('SampleDemand', pd.DataFrame({ENERGY_FEATURE_NAME: [24., 48.]},
+                                                                index=pd.date_range('2022-01-01', periods=2, freq='D')))
+    weights = pd.DataFrame({'weight': np.full(48, 1 / 24)}, index=pd.date_range('2022-01-01', periods=48, freq='h'))
+
+    with float_dtype('float32'):
+        hourly_demand = hourly_weighted_dissagregate(daily_demand, weights)
+
+    assert hourly_demand.energy.dtype == np.float32
+    assert hourly_demand.to_daily().energy.dtype == np.float32
+    np.testing.assert_allclose(hourly_demand.to_daily().energy, [24., 48.], rtol=1e-6)
+
+    total = HourlyHeatDemand.sum([hourly_demand] * 1000)
+    assert total.energy.dtype == np.float32
+    np.testing.assert_allclose(total.energy, 1000 * hourly_demand.energy.astype(np.float64), rtol=1e-6)
+
+# Test that integer temperatures give float columns following the policy
+def test_float_temperature_return():
+    index = pd.date_range('2022-01-01', periods=48, freq='h')
+    external_factors = ExternalFactors(pd.DataFrame({EXTERNAL_TEMPERATURE_NAME: np.full(48, 5.),
+                                                     HEATING_SEASON_NAME: np.arange(48) < 24}, index=index))
+
+    return_temperature = basic_temperature_return(external_factors, 40, 30)
+    assert return_temperature.dtypes.iloc[0] == np.float64
+    assert return_temperature.iloc[[0, -1], 0].tolist() == [40., 30.]
+
+    with float_dtype('float32'):
+        assert basic_temperature_return(external_factors, 40, 30).dtypes.iloc[0] == np.float32
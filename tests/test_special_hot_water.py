@@ -0,0 +1,43 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+from heatpro.check import ENERGY_FEATURE_NAME, WEIGHT_NAME_REQUIRED
+from heatpro.external_factors import ExternalFactors, EXTERNAL_TEMPERATURE_NAME, HEATING_SEASON_NAME
+from heatpro.special_hot_water import special_hot_water, DAY_PROFILE_RENORMALISE, DAY_PROFILE_WARN
+from heatpro.temporal_demand import MonthlyHeatDemand
+
+@pytest.fixture
+def hot_water_inputs():
+    hourly_index = pd.date_range('2021', '2022', freq='h', inclusive='left')
+    monthly_index = pd.date_range('2021', periods=12, freq='MS')
+    external_factors = ExternalFactors(pd.DataFrame({
+        EXTERNAL_TEMPERATURE_NAME: 10 - 8 * np.cos(2 * np.pi * hourly_index.dayofyear / 365),
+        HEATING_SEASON_NAME: (hourly_index.month < 5) | (hourly_index.month > 9),
+    }, index=hourly_index))
+    total_demand = MonthlyHeatDemand('total', pd.DataFrame({ENERGY_FEATURE_NAME: np.full(12, 100.)}, index=monthly_index))
+    monthly_profile = pd.DataFrame({WEIGHT_NAME_REQUIRED: np.full(12, 1 / 12)}, index=monthly_index)
+    day_profile = pd.DataFrame({WEIGHT_NAME_REQUIRED: np.full(len(hourly_index), 1 / 24)}, index=hourly_index)
+    return external_factors, total_demand, monthly_profile, 55., day_profile
+
+# Test the handling of a day profile that does not sum to 1 on each day
+def test_special_hot_water_day_profile_check(hot_water_inputs):
+    *inputs, day_profile = hot_water_inputs
+    expected = special_hot_water(*inputs, day_profile).energy
+    doubled_profile = day_profile * 2
+
+    # Kept as given by default, without warning
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        np.testing.assert_allclose(special_hot_water(*inputs, doubled_profile).energy, 2 * expected)
+
+    with pytest.warns(UserWarning, match="hourly_hot_water_day_profil : weights do not sum to 1"):
+        np.testing.assert_allclose(special_hot_water(*inputs, doubled_profile, day_profile_check=DAY_PROFILE_WARN).energy, 2 * expected)
+
+    # Renormalised profiles keep the daily energy and the input is not modified
+    np.testing.assert_allclose(special_hot_water(*inputs, doubled_profile, day_profile_check=DAY_PROFILE_RENORMALISE).energy, expected)
+    assert (doubled_profile[WEIGHT_NAME_REQUIRED] == 2 / 24).all()
+
+    with pytest.raises(ValueError, match="day_profile_check should be one of keep, warn, renormalise"):
+        special_hot_water(*inputs, day_profile, day_profile_check='ignore')